@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import contextlib
+import time
+
+from yt_dlp.aes import (
+    _ttable_cbc_decrypt,
+    _ttable_ctr_encrypt,
+    _ttable_gcm_decrypt_and_verify,
+    aes_cbc_decrypt,
+    aes_ctr_decrypt,
+    aes_gcm_decrypt_and_verify,
+)
+from yt_dlp.dependencies import Cryptodome
+from yt_dlp.utils import bytes_to_intlist, intlist_to_bytes
+
+
+def throughput(func, size, repeat=3):
+    best = min(_timed(func) for _ in range(repeat))
+    return size / best / 1024
+
+
+def _timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    """Compare the throughput of the native AES implementations (and pycryptodome, if available)"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--size', type=int, default=256, help='size of the data in KiB (default: %(default)s)')
+    parser.add_argument('--key-size', type=int, default=16, choices=(16, 24, 32), help='key size in bytes')
+    args = parser.parse_args()
+
+    size = args.size * 1024
+    data, key, iv, nonce = os.urandom(size), os.urandom(args.key_size), os.urandom(16), os.urandom(12)
+    data_list, key_list, iv_list, nonce_list = map(bytes_to_intlist, (data, key, iv, nonce))
+
+    def gcm_decrypt(decrypt, *args):
+        with contextlib.suppress(ValueError):  # The tag is random
+            decrypt(*args)
+
+    implementations = {
+        'CBC': {
+            'intlist': lambda: intlist_to_bytes(aes_cbc_decrypt(data_list, key_list, iv_list)),
+            'T-table': lambda: _ttable_cbc_decrypt(data, key, iv),
+        },
+        'CTR': {
+            'intlist': lambda: intlist_to_bytes(aes_ctr_decrypt(data_list, key_list, iv_list)),
+            'T-table': lambda: _ttable_ctr_encrypt(data, key, iv),
+        },
+        'GCM': {
+            'intlist': lambda: gcm_decrypt(aes_gcm_decrypt_and_verify, data_list, key_list, [0] * 16, nonce_list),
+            'T-table': lambda: gcm_decrypt(_ttable_gcm_decrypt_and_verify, data, key, bytes(16), nonce),
+        },
+    }
+    if Cryptodome.AES:
+        AES = Cryptodome.AES
+        implementations['CBC']['pycryptodome'] = lambda: AES.new(key, AES.MODE_CBC, iv).decrypt(data)
+        implementations['CTR']['pycryptodome'] = (
+            lambda: AES.new(key, AES.MODE_CTR, nonce=b'', initial_value=iv).decrypt(data))
+        implementations['GCM']['pycryptodome'] = (
+            lambda: gcm_decrypt(AES.new(key, AES.MODE_GCM, nonce).decrypt_and_verify, data, bytes(16)))
+
+    for mode, funcs in implementations.items():
+        speeds = {name: throughput(func, size) for name, func in funcs.items()}
+        print(f'{mode}: ' + ', '.join(
+            f'{name} {speed:.0f} KiB/s ({speed / speeds["intlist"]:.1f}x)' for name, speed in speeds.items()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import copy
+import itertools
+import time
+
+from yt_dlp import YoutubeDL
+from yt_dlp.utils import FormatSorter
+
+VIDEO_CODECS = ('avc1.4d401e', 'avc1.64001f', 'vp09.00.40.08', 'vp09.02.51.10.01.09.16.09.00', 'av01.0.08M.08')
+AUDIO_CODECS = ('mp4a.40.2', 'mp4a.40.5', 'opus', 'ac-3', 'ec-3')
+HEIGHTS = (144, 240, 360, 480, 720, 1080, 1440, 2160)
+
+
+def youtube_like_formats():
+    """About 100 formats, similar to what the YouTube extractor returns for a long 4K video"""
+    formats = []
+    for i, (height, vcodec) in enumerate(itertools.product(HEIGHTS, VIDEO_CODECS)):
+        for protocol, ext in (('https', 'mp4'), ('m3u8_native', 'mp4')):
+            formats.append({
+                'format_id': f'{protocol}-{i}', 'url': f'https://example.com/{protocol}/{i}', 'ext': ext,
+                'protocol': protocol, 'vcodec': vcodec, 'acodec': 'none' if protocol == 'https' else 'mp4a.40.2',
+                'height': height, 'width': height * 16 // 9, 'fps': 30 if height < 720 else 60,
+                'dynamic_range': 'HDR10' if vcodec.startswith('vp09.02') else 'SDR',
+                'tbr': height * 3.5, 'filesize': height * 35000,
+            })
+    for i, acodec in enumerate(itertools.chain(AUDIO_CODECS, AUDIO_CODECS)):
+        formats.append({
+            'format_id': f'audio-{i}', 'url': f'https://example.com/audio/{i}', 'ext': 'webm' if acodec == 'opus' else 'm4a',
+            'protocol': 'https', 'vcodec': 'none', 'acodec': acodec, 'abr': 48 + 16 * i, 'asr': 48000,
+            'audio_channels': 2, 'language': 'en', 'language_preference': 5 - i % 2,
+        })
+    formats.extend({
+        'format_id': f'sb{i}', 'url': f'https://example.com/sb/{i}', 'ext': 'mhtml', 'protocol': 'mhtml',
+        'vcodec': 'none', 'acodec': 'none', 'height': 45 * (i + 1), 'width': 80 * (i + 1),
+    } for i in range(4))
+    return formats
+
+
+def legacy_preference(sorter, format_):
+    """The sort key computed field by field, without the sort plan"""
+    sorter.calculate_preference(format_)  # Fill in the missing fields
+    return tuple(sorter._calculate_field_preference(format_, field) for field in sorter._order)
+
+
+def main():
+    """Compare computing the format sort keys with the precompiled sort plan and field by field"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--videos', type=int, default=200, help='number of format lists to sort (default: %(default)s)')
+    parser.add_argument('-S', '--format-sort', default='', help='sort order, as given to --format-sort')
+    args = parser.parse_args()
+
+    ydl = YoutubeDL({'quiet': True, 'format_sort': list(filter(None, args.format_sort.split(',')))})
+    template = youtube_like_formats()
+    timings = {}
+    for name, key in (('field by field', legacy_preference), ('sort plan', None)):
+        format_lists = [copy.deepcopy(template) for _ in range(args.videos)]
+        start = time.perf_counter()
+        for formats in format_lists:
+            sorter = FormatSorter(ydl, [])
+            formats.sort(key=sorter.calculate_preference if key is None else lambda f: key(sorter, f))
+        timings[name] = time.perf_counter() - start, [f['format_id'] for f in format_lists[0]]
+
+    (legacy, expected), (planned, result) = timings.values()
+    print(f'{args.videos} videos with {len(template)} formats: field by field {legacy * 1000:.0f}ms, '
+          f'sort plan {planned * 1000:.0f}ms ({legacy / planned:.1f}x faster)')
+    if result != expected:
+        print('The orders are different')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
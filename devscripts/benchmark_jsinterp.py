@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import time
+
+from test.helper import FakeYDL
+from yt_dlp.extractor import YoutubeIE
+from yt_dlp.jsinterp import JSInterpreter
+
+
+def _timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    """Compare the speed of the compiled and interpreted nsig functions of YouTube player files"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('players', nargs='+', metavar='PLAYER_JS', help='path of a base.js player file')
+    parser.add_argument('--calls', type=int, default=20, help='number of calls of each function (default: %(default)s)')
+    args = parser.parse_args()
+
+    with FakeYDL() as ydl:
+        ie = YoutubeIE(ydl)
+        for player in args.players:
+            with open(player, encoding='utf-8') as f:
+                jscode = f.read()
+            funcname = ie._extract_n_function_name(jscode)
+
+            timings = {}
+            for compile_statements in (False, True):
+                func = JSInterpreter(jscode, compile_statements=compile_statements).extract_function(funcname)
+                # The statements are compiled by the first call
+                first = _timed(lambda: func(['dIdB6sP_cKbVLX']))
+                rest = min(_timed(lambda: func(['dIdB6sP_cKbVLX'])) for _ in range(args.calls))
+                timings['compiled' if compile_statements else 'interpreted'] = first, rest
+            print(f'{os.path.basename(player)}: ' + ', '.join(
+                f'{name} {first * 1000:.1f} ms first call, {rest * 1000:.2f} ms per call'
+                for name, (first, rest) in timings.items())
+                + f' ({timings["interpreted"][1] / timings["compiled"][1]:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
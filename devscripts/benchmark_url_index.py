@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import time
+
+from test.helper import gettestcases
+from yt_dlp.extractor import gen_extractor_classes
+from yt_dlp.extractor._url_index import URLIndex, build_url_index
+
+
+def first_suitable(ies, url):
+    return next((ie.ie_key() for ie in ies if ie.suitable(url)), None)
+
+
+def main():
+    """Compare finding the extractor for the URLs of the extractor tests with and without the URL index"""
+    ie_classes = [getattr(ie, 'real_class', ie) for ie in gen_extractor_classes()]
+    urls = [tc['url'] for tc in gettestcases(include_onlymatching=True)]
+    for ie in ie_classes:  # Compile all the regexes beforehand
+        ie.suitable('')
+
+    start = time.perf_counter()
+    url_index = URLIndex(*build_url_index(ie_classes))
+    print(f'Built the index in {time.perf_counter() - start:.2f}s')
+
+    start = time.perf_counter()
+    expected = [first_suitable(ie_classes, url) for url in urls]
+    linear = time.perf_counter() - start
+
+    ies_by_key = {ie.ie_key(): ie for ie in ie_classes}
+    start = time.perf_counter()
+    results = [
+        first_suitable(map(ies_by_key.get, url_index.candidate_keys(url, ies_by_key)), url)
+        for url in urls]
+    indexed = time.perf_counter() - start
+
+    mismatches = sum(a != b for a, b in zip(expected, results))
+    print(f'{len(urls)} URLs: linear scan {linear:.2f}s, indexed {indexed:.2f}s '
+          f'({linear / indexed:.1f}x faster), {mismatches} mismatches')
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+from devscripts.utils import get_filename_args
+from yt_dlp.archive import open_download_archive
+
+
+def main():
+    """
+    Copy the IDs of one download archive to another, e.g. to import a text archive into
+    an SQLite archive or to export it back. The backend of each file is chosen as in --download-archive
+    """
+    infile, outfile = get_filename_args(has_infile=True)
+    with open_download_archive(infile) as source, open_download_archive(outfile) as dest:
+        dest.update(line for line in source if line)
+
+
+if __name__ == '__main__':
+    main()
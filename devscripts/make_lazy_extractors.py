@@ -41,6 +41,7 @@ def main():
     _ALL_CLASSES = get_all_ies()  # Must be before import
 
     import yt_dlp.plugins
+    from yt_dlp.extractor._url_index import build_url_index
     from yt_dlp.extractor.common import InfoExtractor, SearchInfoExtractor
 
     # Filter out plugins
@@ -53,6 +54,7 @@ def main():
         *extra_ie_code(DummyInfoExtractor),
         '\nclass LazyLoadSearchExtractor(LazyLoadExtractor):\n    pass\n',
         *build_ies(_ALL_CLASSES, (InfoExtractor, SearchInfoExtractor), DummyInfoExtractor),
+        *build_url_index_code(_ALL_CLASSES, build_url_index),
     ))
 
     write_file(lazy_extractors_filename, f'{module_src}\n')
@@ -95,6 +97,15 @@ def build_ies(ies, bases, attr_base):
     yield f'\n_ALL_CLASSES = [{", ".join(names)}]'
 
 
+def build_url_index_code(ies, build_url_index):
+    index, indexed_keys = build_url_index(ies)
+    yield '\n_URL_INDEX = {'
+    for token, keys in index.items():
+        yield f'    {token!r}: {tuple(keys)!r},'
+    yield '}'
+    yield f'\n_URL_INDEXED_IES = {sorted(indexed_keys)!r}'
+
+
 def sort_ies(ies, ignored_bases):
     """find the correct sorting and add the required base classes so that subclasses can be correctly created"""
     classes, returned_classes = ies[:-1], set()
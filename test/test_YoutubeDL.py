@@ -11,6 +11,10 @@
 import contextlib
 import copy
 import json
+import tempfile
+import threading
+import time
+import weakref
 
 from test.helper import FakeYDL, assertRegexpMatches, try_rm
 from yt_dlp import YoutubeDL
@@ -19,8 +23,12 @@
 from yt_dlp.extractor.common import InfoExtractor
 from yt_dlp.postprocessor.common import PostProcessor
 from yt_dlp.utils import (
+    ExistingVideoReached,
     ExtractorError,
+    FormatSorter,
     LazyList,
+    MaxDownloadsReached,
+    PostProcessingError,
     OnDemandPagedList,
     int_or_none,
     match_filter_func,
@@ -455,6 +463,26 @@ def assert_syntax_error(format_spec):
         assert_syntax_error('/')
         assert_syntax_error('[720<height]')
 
+    def test_compiled_format_spec(self):
+        format_spec = 'bv[height<=720][vcodec^=avc]+ba/b[ext=mp4]'
+        compiled = YoutubeDL.compile_format_spec(format_spec)
+        self.assertIs(YoutubeDL.compile_format_spec(format_spec), compiled)
+        self.assertEqual(compiled.format_spec, format_spec)
+
+        formats = [
+            {'format_id': 'low', 'ext': 'mp4', 'height': 480, 'vcodec': 'avc1', 'acodec': 'none', 'url': TEST_URL},
+            {'format_id': 'high', 'ext': 'mp4', 'height': 1080, 'vcodec': 'avc1', 'acodec': 'none', 'url': TEST_URL},
+            {'format_id': 'audio', 'ext': 'm4a', 'vcodec': 'none', 'acodec': 'aac', 'url': TEST_URL},
+        ]
+        # The same compiled spec can be used by several instances
+        for params in ({}, {'prefer_free_formats': True}):
+            ydl = YDL({**params, 'format': compiled})
+            ydl.process_ie_result(_make_result(copy.deepcopy(formats)))
+            self.assertEqual(ydl.downloaded_info_dicts[0]['format_id'], 'low+audio')
+            self.assertEqual(
+                [f['format_id'] for f in ydl._select_formats(formats, ydl.build_format_selector(format_spec))],
+                ['low+audio'])
+
     def test_format_filtering(self):
         formats = [
             {'format_id': 'A', 'filesize': 500, 'width': 1000},
@@ -537,6 +565,54 @@ def test_default_format_spec(self):
         self.assertEqual(ydl._default_format_spec({}, download=False), 'bestvideo*+bestaudio/best')
         self.assertEqual(ydl._default_format_spec({'is_live': True}), 'best/bestvideo+bestaudio')
 
+    def test_format_sort_plan(self):
+        formats = [
+            {'format_id': f_id, 'url': TEST_URL, 'vcodec': 'none' if 'height' not in info else None, **info}
+            for f_id, info in YoutubeIE._formats.items()]
+        for format_sort in ([], ['res:720', 'vcodec:h264', '+size'], ['+proto', 'ext', 'abr~128', 'hdr:10']):
+            for prefer_free_formats in (False, True):
+                ydl = YDL({'format_sort': format_sort, 'prefer_free_formats': prefer_free_formats})
+                sorter = FormatSorter(ydl, [])
+                for f in formats:
+                    # The precompiled plan gives the same key as evaluating each field separately
+                    self.assertEqual(sorter.calculate_preference(f), tuple(
+                        sorter._calculate_field_preference(f, field) for field in sorter._order))
+
+    def test_check_formats(self):
+        probed = []
+
+        class CheckYDL(YDL):
+            def _probe_format(self, f):
+                with self._lock:
+                    probed.append(f['format_id'])
+                return f['format_id'] != '9'
+
+        def make_formats():
+            return [{
+                'format_id': str(i), 'ext': 'mp4', 'preference': i,
+                'protocol': 'https', 'url': f'{TEST_URL}/{i}',
+            } for i in range(10)]
+
+        ydl = CheckYDL({'check_formats': True})
+        ydl.process_ie_result(_make_result(make_formats()))
+        self.assertEqual(ydl.downloaded_info_dicts[0]['format_id'], '8')
+        self.assertIn('[info] Unable to download format 9. Skipping...', ydl.msgs)
+        self.assertCountEqual(probed, map(str, range(10)))
+
+        # The results are reused for the same URLs
+        probed.clear()
+        ydl.process_ie_result(_make_result(make_formats()))
+        self.assertEqual(ydl.downloaded_info_dicts[1]['format_id'], '8')
+        self.assertEqual(probed, [])
+
+        # Only the formats that are needed and a few lookahead formats are tested
+        probed.clear()
+        ydl = CheckYDL({'check_formats': 'selected'})
+        ydl.process_ie_result(_make_result(make_formats()))
+        self.assertEqual(ydl.downloaded_info_dicts[0]['format_id'], '8')
+        self.assertIn('9', probed)
+        self.assertLessEqual(len(probed), 1 + CheckYDL._FORMAT_CHECK_WORKERS)
+
 
 class TestYoutubeDL(unittest.TestCase):
     def test_subtitles(self):
@@ -862,6 +938,27 @@ def gen():
         test('%(title3)s', ('foo/bar\\test', 'foo⧸bar⧹test'))
         test('folder/%(title3)s', ('folder/foo/bar\\test', f'folder{os.path.sep}foo⧸bar⧹test'))
 
+    def test_compile_outtmpl(self):
+        compiled = YoutubeDL.compile_outtmpl('%(title)s [%(id,display_id)s] %(duration+1)d.%(ext)s')
+        self.assertIs(YoutubeDL.compile_outtmpl('%(title)s [%(id,display_id)s] %(duration+1)d.%(ext)s'), compiled)
+        self.assertEqual(compiled.keys, {'title', 'id', 'display_id', 'duration', 'ext'})
+        self.assertEqual(len(compiled.fields), 4)
+        self.assertIsNone(YoutubeDL.compile_outtmpl('%()j').keys)
+        self.assertIsNone(YoutubeDL.compile_outtmpl('%(.{id,title})j').keys)
+
+        class NoCopyDict(dict):
+            def __iter__(self):
+                raise AssertionError('The info dict must not be copied')
+
+        ydl = FakeYDL()
+        info = NoCopyDict(id='1234', title='Test', duration=9, ext='mp4')
+        self.assertEqual(ydl.evaluate_outtmpl('%(title)s [%(id,display_id)s] %(duration+1)d.%(ext)s', info), 'Test [1234] 10.mp4')
+        self.assertEqual(ydl.evaluate_outtmpl('%(duration_string)s %(autonumber)s', info), '9 00000')
+        self.assertIn('epoch', info)
+
+        tmpl, tmpl_dict = ydl.prepare_outtmpl('echo %(title)q %%(id)s %(id)s', info)
+        self.assertEqual(ydl.escape_outtmpl(tmpl) % tmpl_dict, 'echo Test %(id)s 1234')
+
     def test_format_note(self):
         ydl = YoutubeDL()
         self.assertEqual(ydl._format_note({}), '')
@@ -1104,6 +1201,291 @@ def test_selection(params, expected_ids, evaluate_all=False):
         test_selection({'playlist_items': '-15::2'}, INDICES[1::2], True)
         test_selection({'playlist_items': '-15::15'}, [], True)
 
+    def test_stream_playlist(self):
+        class Entry(dict):
+            pass  # Unlike dict, it can be weakly referenced
+
+        entry_refs = []
+        max_live_entries = 0
+
+        def entries(n):
+            nonlocal max_live_entries
+            for i in range(1, n + 1):
+                entry = Entry(id=str(i), title=str(i), url=TEST_URL)
+                entry_refs.append(weakref.ref(entry))
+                max_live_entries = max(max_live_entries, sum(ref() is not None for ref in entry_refs))
+                yield entry
+
+        warnings = []
+
+        def process_playlist(params, n=10, window=None):
+            ydl = YDL({'lazy_playlist': 'stream', **params})
+            ydl.report_warning = lambda message, only_once=False: warnings.append(message)
+            if window:
+                ydl._PLAYLIST_STREAM_WINDOW = window
+            result = ydl.process_ie_result({
+                '_type': 'playlist',
+                'id': 'test',
+                'extractor': 'test:playlist',
+                'extractor_key': 'test:playlist',
+                'webpage_url': 'http://example.com',
+                'entries': entries(n),
+            })
+            self.assertIsNone(result['entries'])
+            return [int(info['id']) for info in ydl.downloaded_info_dicts]
+
+        self.assertEqual(process_playlist({}), list(range(1, 11)))
+        # The processed entries are not held in memory
+        self.assertLessEqual(max_live_entries, 2)
+        self.assertEqual(process_playlist({'playlist_items': '2:6:2,6'}), [2, 4, 6])
+        # Falls back to holding the entries if they are not requested in order
+        self.assertEqual(process_playlist({'playlist_items': '4,2'}), [4, 2])
+
+        warnings.clear()
+        self.assertEqual(process_playlist({'playlistreverse': True}, 7, window=3), [3, 2, 1, 6, 5, 4, 7])
+        # The user is told that the playlist is not entirely reversed
+        self.assertEqual(len(warnings), 1)
+        self.assertIn('only reversed within windows of 3 entries', warnings[0])
+        ids = process_playlist({'playlistrandom': True}, 20, window=3)
+        self.assertEqual(sorted(ids), list(range(1, 21)))
+        for position, video_id in enumerate(ids):
+            self.assertLess(video_id, position + 4)
+
+        # The playlist infojson is written without the entries, which are written as JSON Lines
+        infofn = 'test_stream_playlist.info.json'
+        try_rm(infofn)
+        try_rm(f'{infofn}l')
+        try:
+            process_playlist({
+                'allow_playlist_files': True,
+                'outtmpl': 'test_stream_playlist.%(ext)s',
+                'match_filter': match_filter_func('id != 2'),
+            }, 3)
+            with open(infofn, encoding='utf-8') as f:
+                self.assertNotIn('entries', json.load(f))
+            with open(f'{infofn}l', encoding='utf-8') as f:
+                self.assertEqual([json.loads(line)['id'] for line in f], ['1', '3'])
+        finally:
+            try_rm(infofn)
+            try_rm(f'{infofn}l')
+
+    def test_archived_pages(self):
+        class _YDL(YDL):
+            def in_download_archive(self, info_dict):
+                if info_dict.get('id'):
+                    self.checked_ids.append(int(info_dict['id']))
+                return super().in_download_archive(info_dict)
+
+        def process_playlist(params):
+            ydl = _YDL({'download_archive': {f'test {i}' for i in (1, 2, 3, 4, 5, 6, 8)}, **params})
+            ydl.checked_ids = []
+            with contextlib.suppress(ExistingVideoReached):
+                ydl.process_ie_result({
+                    '_type': 'playlist',
+                    'id': 'test',
+                    'extractor': 'test:playlist',
+                    'extractor_key': 'test:playlist',
+                    'webpage_url': 'http://example.com',
+                    'entries': OnDemandPagedList(lambda n: ({
+                        'id': str(i),
+                        'title': str(i),
+                        'url': TEST_URL,
+                        'extractor_key': 'Test',
+                    } for i in range(3 * n + 1, min(3 * n + 4, 11))), 3),
+                })
+            return ydl
+
+        for params in ({}, {'lazy_playlist': True}, {'lazy_playlist': 'stream'}, {'playliststart': 2}):
+            ydl = process_playlist(params)
+            self.assertEqual([int(info['id']) for info in ydl.downloaded_info_dicts], [7, 9, 10])
+            # The entries of the fully archived pages are not checked one by one
+            self.assertEqual(sorted(set(ydl.checked_ids)), [7, 8, 9, 10])
+            self.assertIn('[download] Skipping 3 entries of page 2 since they have already been recorded in the archive', ydl.msgs)
+
+        # Each entry is checked so that the download stops at the first archived entry
+        ydl = process_playlist({'break_on_existing': True})
+        self.assertEqual(set(ydl.checked_ids), {1})
+        self.assertEqual(ydl.downloaded_info_dicts, [])
+
+    def test_manifest_cache(self):
+        ydl = YDL()
+        ydl._cache_manifest({'http://a/1', 'http://a/redirected'}, 'abcd', 'http://a/redirected')
+        self.assertEqual(ydl._get_cached_manifest('http://a/1'), ('http://a/redirected', 'abcd'))
+        self.assertEqual(ydl._get_cached_manifest('http://a/redirected'), ('http://a/redirected', 'abcd'))
+        self.assertIsNone(ydl._get_cached_manifest('http://a/2'))
+
+        # The oldest manifests are evicted when the cache is full
+        ydl = YDL()
+        ydl._MANIFEST_CACHE_SIZE = 10
+        for i, content in enumerate(('abcd', 'efgh', 'ijkl')):
+            ydl._cache_manifest({f'http://a/{i}'}, content, f'http://a/{i}')
+        self.assertIsNone(ydl._get_cached_manifest('http://a/0'))
+        self.assertEqual(ydl._get_cached_manifest('http://a/1'), ('http://a/1', 'efgh'))
+        self.assertEqual(ydl._get_cached_manifest('http://a/2'), ('http://a/2', 'ijkl'))
+
+        ydl._MANIFEST_CACHE_TTL = -1
+        ydl._cache_manifest({'http://a/3'}, 'mnop', 'http://a/3')
+        self.assertIsNone(ydl._get_cached_manifest('http://a/3'))
+
+    def test_concurrent_entries(self):
+        lock = threading.Lock()
+
+        class _YDL(YDL):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.running = self.max_running = self.started = 0
+                self.filenames = {}
+
+            def process_video_result(self, info_dict, download=True):
+                with lock:
+                    self.running += 1
+                    self.started += 1
+                    self.max_running = max(self.max_running, self.running)
+                try:
+                    # Finish the entries out of order
+                    time.sleep(0.01 * (10 - int(info_dict['id'])))
+                    if self.params.get('_fail'):
+                        raise ExtractorError('Failing entry', expected=True)
+                    return super().process_video_result(info_dict, download)
+                finally:
+                    with lock:
+                        self.running -= 1
+
+            def process_info(self, info_dict):
+                YoutubeDL.process_info(self, info_dict)
+                self.downloaded_info_dicts.append(info_dict.copy())
+                self.filenames[info_dict['id']] = self.prepare_filename(info_dict)
+
+            def trouble(self, *args, **kwargs):
+                pass
+
+        def process_playlist(params):
+            ydl = _YDL({
+                'simulate': True,
+                'concurrent_entries': 3,
+                'outtmpl': '%(autonumber)s-%(id)s',
+                'ignoreerrors': True,
+                **params,
+            })
+            try:
+                return ydl, ydl.process_ie_result({
+                    '_type': 'playlist',
+                    'id': 'test',
+                    'extractor': 'test:playlist',
+                    'extractor_key': 'test:playlist',
+                    'webpage_url': 'http://example.com',
+                    'entries': [{
+                        'id': str(i),
+                        'title': str(i),
+                        'url': TEST_URL,
+                        'extractor': 'test',
+                        'extractor_key': 'Test',
+                    } for i in range(1, 11)],
+                })
+            except (ExistingVideoReached, MaxDownloadsReached):
+                return ydl, None
+
+        archive = set()
+        ydl, result = process_playlist({'download_archive': archive, 'force_write_download_archive': True})
+        self.assertEqual([entry['id'] for entry in result['entries']], [str(i) for i in range(1, 11)])
+        self.assertEqual([entry['playlist_index'] for entry in result['entries']], list(range(1, 11)))
+        self.assertTrue(1 < ydl.max_running <= 3)
+        self.assertEqual(archive, {f'test {i}' for i in range(1, 11)})
+        # Each entry gets its own autonumber
+        self.assertEqual(
+            sorted(int(filename.split('-')[0]) for filename in ydl.filenames.values()), list(range(1, 11)))
+
+        ydl, result = process_playlist({'_fail': True, 'skip_playlist_after_errors': 2})
+        # Only the entries that were already running are finished
+        self.assertLessEqual(ydl.started, 2 + 2)
+
+        ydl, result = process_playlist({'download_archive': {'test 4'}, 'break_on_existing': True})
+        self.assertIsNone(result)
+        # The entries that were started before are finished
+        self.assertEqual(sorted(info['id'] for info in ydl.downloaded_info_dicts), ['1', '2', '3'])
+
+        ydl, result = process_playlist({'max_downloads': 4})
+        self.assertIsNone(result)
+        # The entry that reaches the limit raises after it is processed, and no further entries are processed
+        self.assertEqual(len(ydl.downloaded_info_dicts), 3)
+        self.assertEqual(ydl._num_downloads, 4)
+
+    def test_concurrent_postprocessing(self):
+        lock = threading.Lock()
+        events = []
+
+        class SlowPP(PostProcessor):
+            def run(self, info):
+                # The earlier videos take longer to post-process
+                time.sleep(0.05 * (4 - int(info['id'])))
+                if info['id'] == self._downloader.params.get('_fail'):
+                    raise PostProcessingError('Failing postprocessor')
+                with lock:
+                    events.append(('post_process', info['id']))
+                return [], info
+
+        class AfterMovePP(PostProcessor):
+            def run(self, info):
+                with lock:
+                    events.append(('after_move', info['id']))
+                return [], info
+
+        class _YDL(FakeYDL):
+            def dl(self, name, info, *args, **kwargs):
+                with lock:
+                    events.append(('download', info['id']))
+                with open(name, 'w') as f:
+                    f.write(info['id'])
+                return True, True
+
+        def process_playlist(params):
+            events.clear()
+            ydl = _YDL({'outtmpl': os.path.join(tmpdir, '%(id)s.%(ext)s'), **params})
+            ydl.add_post_processor(SlowPP(), 'post_process')
+            ydl.add_post_processor(AfterMovePP(), 'after_move')
+            return ydl.process_ie_result({
+                '_type': 'playlist',
+                'id': 'test',
+                'extractor': 'test:playlist',
+                'extractor_key': 'test:playlist',
+                'webpage_url': 'http://example.com',
+                'entries': [{
+                    'id': str(i),
+                    'title': str(i),
+                    'url': TEST_URL,
+                    'ext': 'mp4',
+                    'extractor': 'test',
+                    'extractor_key': 'Test',
+                } for i in range(1, 4)],
+            })
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            archive = set()
+            result = process_playlist({'concurrent_postprocessing': 2, 'download_archive': archive})
+            # The next videos are downloaded while the first ones are post-processed
+            self.assertLess(events.index(('download', '2')), events.index(('post_process', '1')))
+            # The files are moved in the order the videos were downloaded
+            self.assertEqual([video_id for event, video_id in events if event == 'after_move'], ['1', '2', '3'])
+            self.assertEqual(archive, {'test 1', 'test 2', 'test 3'})
+            # The entries are finished before the playlist is
+            self.assertEqual(
+                [entry['requested_downloads'][0]['filepath'] for entry in result['entries']],
+                [os.path.join(tmpdir, f'{i}.mp4') for i in range(1, 4)])
+            self.assertEqual([entry['format_id'] for entry in result['entries']], ['0'] * 3)
+
+            archive = set()
+            with self.assertRaisesRegex(Exception, 'Postprocessing: Failing postprocessor'):
+                process_playlist({'concurrent_postprocessing': 2, 'download_archive': archive, '_fail': '2'})
+            self.assertNotIn('test 2', archive)
+            self.assertNotIn(('after_move', '2'), events)
+
+            # The failed video does not let the video after it be finished before the one before it
+            archive = set()
+            with self.assertRaisesRegex(Exception, 'Postprocessing: Failing postprocessor'):
+                process_playlist({'concurrent_postprocessing': 3, 'download_archive': archive, '_fail': '2'})
+            self.assertEqual([video_id for event, video_id in events if event == 'after_move'], ['1', '3'])
+            self.assertEqual(archive, {'test 1', 'test 3'})
+
     def test_do_not_override_ie_key_in_url_transparent(self):
         ydl = YDL()
 
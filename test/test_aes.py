@@ -9,8 +9,12 @@
 
 
 import base64
+import random
 
 from yt_dlp.aes import (
+    _ttable_cbc_decrypt,
+    _ttable_ctr_encrypt,
+    _ttable_gcm_decrypt_and_verify,
     aes_cbc_decrypt,
     aes_cbc_decrypt_bytes,
     aes_cbc_encrypt,
@@ -26,7 +30,6 @@
     key_expansion,
     pad_block,
 )
-from yt_dlp.dependencies import Cryptodome
 from yt_dlp.utils import bytes_to_intlist, intlist_to_bytes
 
 # the encrypted data can be generate with 'devscripts/generate_aes_testdata.py'
@@ -48,9 +51,8 @@ def test_cbc_decrypt(self):
         data = b'\x97\x92+\xe5\x0b\xc3\x18\x91ky9m&\xb3\xb5@\xe6\x27\xc2\x96.\xc8u\x88\xab9-[\x9e|\xf1\xcd'
         decrypted = intlist_to_bytes(aes_cbc_decrypt(bytes_to_intlist(data), self.key, self.iv))
         self.assertEqual(decrypted.rstrip(b'\x08'), self.secret_msg)
-        if Cryptodome.AES:
-            decrypted = aes_cbc_decrypt_bytes(data, intlist_to_bytes(self.key), intlist_to_bytes(self.iv))
-            self.assertEqual(decrypted.rstrip(b'\x08'), self.secret_msg)
+        decrypted = aes_cbc_decrypt_bytes(data, intlist_to_bytes(self.key), intlist_to_bytes(self.iv))
+        self.assertEqual(decrypted.rstrip(b'\x08'), self.secret_msg)
 
     def test_cbc_encrypt(self):
         data = bytes_to_intlist(self.secret_msg)
@@ -78,10 +80,45 @@ def test_gcm_decrypt(self):
         decrypted = intlist_to_bytes(aes_gcm_decrypt_and_verify(
             bytes_to_intlist(data), self.key, bytes_to_intlist(authentication_tag), self.iv[:12]))
         self.assertEqual(decrypted.rstrip(b'\x08'), self.secret_msg)
-        if Cryptodome.AES:
-            decrypted = aes_gcm_decrypt_and_verify_bytes(
-                data, intlist_to_bytes(self.key), authentication_tag, intlist_to_bytes(self.iv[:12]))
-            self.assertEqual(decrypted.rstrip(b'\x08'), self.secret_msg)
+        decrypted = aes_gcm_decrypt_and_verify_bytes(
+            data, intlist_to_bytes(self.key), authentication_tag, intlist_to_bytes(self.iv[:12]))
+        self.assertEqual(decrypted.rstrip(b'\x08'), self.secret_msg)
+
+        # NIST GCM test case 3, with a multiple of the block size
+        key = bytes.fromhex('feffe9928665731c6d6a8f9467308308')
+        nonce = bytes.fromhex('cafebabefacedbaddecaf888')
+        data = bytes.fromhex(
+            '42831ec2217774244b7221b784d0d49ce3aa212f2c02a4e035c17e2329aca12e'
+            '21d514b25466931c7d8f6a5aac84aa051ba30b396a0aac973d58e091473f5985')
+        authentication_tag = bytes.fromhex('4d5c2af327cd64a62cf35abd2ba6fab4')
+        expected = bytes.fromhex(
+            'd9313225f88406e5a55909c5aff5269a86a7a9531534f7da2e4c303d8a318a72'
+            '1c3c0c95956809532fcf0e2449a6b525b16aedf5aa0de657ba637b391aafd255')
+        self.assertEqual(intlist_to_bytes(aes_gcm_decrypt_and_verify(
+            *map(bytes_to_intlist, (data, key, authentication_tag, nonce)))), expected)
+        self.assertEqual(aes_gcm_decrypt_and_verify_bytes(data, key, authentication_tag, nonce), expected)
+        self.assertEqual(_ttable_gcm_decrypt_and_verify(data, key, authentication_tag, nonce), expected)
+        with self.assertRaisesRegex(ValueError, 'Mismatching authentication tag'):
+            _ttable_gcm_decrypt_and_verify(data, key, authentication_tag[::-1], nonce)
+
+    def test_ttable(self):
+        rng = random.Random(42)
+        for key_size in (16, 24, 32):
+            for size in (0, 1, 15, 16, 17, 100, 160):
+                key, iv, data = (bytes(rng.randrange(256) for _ in range(n)) for n in (key_size, 16, size))
+                key_list, iv_list, data_list = map(bytes_to_intlist, (key, iv, data))
+                self.assertEqual(
+                    _ttable_cbc_decrypt(data, key, iv), intlist_to_bytes(aes_cbc_decrypt(data_list, key_list, iv_list)))
+                self.assertEqual(
+                    _ttable_ctr_encrypt(data, key, iv), intlist_to_bytes(aes_ctr_encrypt(data_list, key_list, iv_list)))
+
+        # The counter wraps around
+        key, iv, data = bytes(range(16)), b'\xff' * 16, bytes(range(40))
+        self.assertEqual(_ttable_ctr_encrypt(data, key, iv), intlist_to_bytes(aes_ctr_encrypt(
+            *map(bytes_to_intlist, (data, key, iv)))))
+        # Any bytes-like arguments are accepted
+        self.assertEqual(_ttable_cbc_decrypt(bytearray(data), memoryview(key), list(iv)), intlist_to_bytes(
+            aes_cbc_decrypt(*map(bytes_to_intlist, (data, key, iv)))))
 
     def test_decrypt_text(self):
         password = intlist_to_bytes(self.key).decode()
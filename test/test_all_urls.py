@@ -11,7 +11,13 @@
 import collections
 
 from test.helper import gettestcases
-from yt_dlp.extractor import FacebookIE, YoutubeIE, gen_extractors
+from yt_dlp.extractor import (
+    FacebookIE,
+    YoutubeIE,
+    gen_extractor_classes,
+    gen_extractors,
+)
+from yt_dlp.extractor._url_index import URLIndex, build_url_index, url_tokens
 
 
 class TestAllURLsMatching(unittest.TestCase):
@@ -108,6 +114,22 @@ def test_pbs(self):
         self.assertMatch('http://video.pbs.org/viralplayer/2365173446/', ['pbs'])
         self.assertMatch('http://video.pbs.org/widget/partnerplayer/980042464/', ['pbs'])
 
+    def test_url_index(self):
+        ie_classes = [getattr(ie, 'real_class', ie) for ie in gen_extractor_classes()]
+        url_index = URLIndex(*build_url_index(ie_classes))
+        ie_keys = [ie.ie_key() for ie in ie_classes]
+        # test_no_duplicates ensures that no other extractor matches these URLs
+        for tc in gettestcases(include_onlymatching=True):
+            self.assertIn(
+                tc['name'], url_index.candidate_keys(tc['url'], ie_keys),
+                f'{tc["name"]}IE should be a candidate for URL {tc["url"]!r}')
+        self.assertLess(len(url_index.candidate_keys('https://www.youtube.com/watch?v=BaW_jenozKc', ie_keys)), 200)
+
+    def test_url_tokens(self):
+        self.assertEqual(url_tokens('https://www.YouTube.com/watch?v=BaW_jenozKc'), {
+            'https', 'www', 'youtube', 'com', 'watch', 'v', 'baw', 'jenozkc'})
+        self.assertIsNone(url_tokens('https://ｙoutube.com/'))
+
     def test_no_duplicated_ie_names(self):
         name_accu = collections.defaultdict(list)
         for ie in self.ies:
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+from test.helper import FakeYDL, try_rm
+from yt_dlp.archive import (
+    SQLiteDownloadArchive,
+    TextDownloadArchive,
+    open_download_archive,
+)
+from yt_dlp.dependencies import sqlite3
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+TEXT_ARCHIVE = os.path.join(TEST_DIR, 'testdata', 'archive_test.txt')
+SQLITE_ARCHIVE = os.path.join(TEST_DIR, 'testdata', 'archive_test.sqlite')
+
+
+class TestDownloadArchive(unittest.TestCase):
+    def setUp(self):
+        self.tearDown()
+
+    def tearDown(self):
+        try_rm(TEXT_ARCHIVE)
+        try_rm(SQLITE_ARCHIVE)
+
+    def _test_archive(self, filename, archive_class):
+        with open_download_archive(filename) as archive:
+            self.assertIsInstance(archive, archive_class)
+            self.assertFalse(archive)
+            archive.add('youtube abc')
+            self.assertIn('youtube abc', archive)
+            self.assertNotIn('youtube def', archive)
+            archive.update(['youtube def', 'vimeo 123'])
+            self.assertEqual(archive.intersection(['youtube def', 'youtube ghi', 'youtube abc']), {'youtube abc', 'youtube def'})
+        with open_download_archive(filename) as archive:
+            self.assertTrue(archive)
+            self.assertEqual(sorted(archive), ['vimeo 123', 'youtube abc', 'youtube def'])
+
+    def test_text_archive(self):
+        self._test_archive(TEXT_ARCHIVE, TextDownloadArchive)
+        with open(TEXT_ARCHIVE, encoding='utf-8') as f:
+            self.assertEqual(f.read().splitlines(), ['youtube abc', 'youtube def', 'vimeo 123'])
+
+    @unittest.skipUnless(sqlite3, 'sqlite3 is not available')
+    def test_sqlite_archive(self):
+        self._test_archive(SQLITE_ARCHIVE, SQLiteDownloadArchive)
+        # The backend is detected from the file header regardless of the extension
+        os.replace(SQLITE_ARCHIVE, TEXT_ARCHIVE)
+        with open_download_archive(TEXT_ARCHIVE) as archive:
+            self.assertIsInstance(archive, SQLiteDownloadArchive)
+            self.assertIn('vimeo 123', archive)
+
+    @unittest.skipUnless(sqlite3, 'sqlite3 is not available')
+    def test_sqlite_archive_durability(self):
+        archive = SQLiteDownloadArchive(SQLITE_ARCHIVE)
+        other = SQLiteDownloadArchive(SQLITE_ARCHIVE)
+        # Added IDs are committed without closing the archive, as if the process was killed
+        archive.add('youtube abc')
+        self.assertIn('youtube abc', other)
+        archive.update(['youtube def', 'youtube ghi'])
+        self.assertEqual(other.intersection(['youtube def', 'youtube ghi', 'youtube jkl']), {'youtube def', 'youtube ghi'})
+        archive.close()
+        other.close()
+
+    def test_ydl_archive(self):
+        ydl = FakeYDL({'download_archive': TEXT_ARCHIVE})
+        info = {'id': 'abc', 'extractor_key': 'Youtube'}
+        self.assertFalse(ydl.in_download_archive(info))
+        ydl.record_download_archive(info)
+        self.assertTrue(ydl.in_download_archive(info))
+        ydl.close()
+        self.assertTrue(FakeYDL({'download_archive': TEXT_ARCHIVE}).in_download_archive(info))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,12 @@
 import datetime as dt
+import os
+import sys
+import tempfile
 import unittest
 
+from test.helper import FakeYDL
 from yt_dlp import cookies
+from yt_dlp.aes import aes_cbc_encrypt_bytes
 from yt_dlp.cookies import (
     LenientSimpleCookie,
     LinuxChromeCookieDecryptor,
@@ -9,9 +14,11 @@
     WindowsChromeCookieDecryptor,
     _get_linux_desktop_environment,
     _LinuxDesktopEnvironment,
+    extract_cookies_from_browser,
     parse_safari_cookies,
     pbkdf2_sha1,
 )
+from yt_dlp.dependencies import sqlite3
 
 
 class Logger:
@@ -120,6 +127,69 @@ def test_chrome_cookie_decryptor_mac_v10(self):
             decryptor = MacChromeCookieDecryptor('', Logger())
             self.assertEqual(decryptor.decrypt(encrypted_value), value)
 
+    @unittest.skipUnless(sqlite3 and sys.platform == 'linux', 'Needs sqlite3 and the Linux decryptor')
+    def test_chrome_cookie_cache(self):
+        key = LinuxChromeCookieDecryptor.derive_key(b'password')
+
+        def add_cookie(database, host_key, name, value):
+            encrypted_value = b'v11' + aes_cbc_encrypt_bytes(value.encode(), key, b' ' * 16)
+            with sqlite3.connect(database) as conn:
+                conn.execute('INSERT INTO cookies VALUES (?, ?, ?, ?, ?, ?, ?)', (
+                    host_key, name, '', encrypted_value, '/', 0, 1))
+            conn.close()
+
+        class CollectingLogger(Logger):
+            def debug(self, message, *args, **kwargs):
+                self.messages.append(message)
+
+            info = debug
+
+        with tempfile.TemporaryDirectory() as tmpdir, MonkeyPatch(cookies, {
+            '_get_linux_keyring_password': lambda *args, **kwargs: b'password',
+        }):
+            profile = os.path.join(tmpdir, 'Default')
+            os.mkdir(profile)
+            database = os.path.join(profile, 'Cookies')
+            with sqlite3.connect(database) as conn:
+                conn.execute(
+                    'CREATE TABLE cookies (host_key TEXT, name TEXT, value TEXT, encrypted_value BLOB, '
+                    'path TEXT, expires_utc INTEGER, is_secure INTEGER)')
+            conn.close()
+            add_cookie(database, '.example.com', 'a', 'value a')
+            add_cookie(database, 'www.example.org', 'b', 'value b')
+            cache = FakeYDL({'cachedir': os.path.join(tmpdir, 'cache')}).cache
+
+            def extract(**kwargs):
+                logger = CollectingLogger()
+                logger.messages = []
+                jar = extract_cookies_from_browser('chrome', profile, logger, cache=cache, **kwargs)
+                return {cookie.name: cookie.value for cookie in jar}, logger.messages
+
+            expected = {'a': 'value a', 'b': 'value b'}
+            self.assertEqual(extract()[0], expected)
+
+            # Nothing is read from the database while it does not change
+            with MonkeyPatch(cookies, {'_open_database_copy': None}):
+                jar, messages = extract()
+                self.assertEqual(jar, expected)
+                self.assertIn('Extracted 2 cookies from chrome (cached)', messages)
+                self.assertEqual(extract(domains=['example.com'])[0], {'a': 'value a'})
+
+            # Only the new values are decrypted
+            add_cookie(database, 'example.com', 'c', 'value c')
+            jar, messages = extract()
+            self.assertEqual(jar, {**expected, 'c': 'value c'})
+            self.assertIn("cookie version breakdown: {'v10': 0, 'v11': 1, 'other': 0, 'unencrypted': 0, 'cached': 2}", messages)
+
+            self.assertEqual(extract(domains=['example.org'])[0], {'b': 'value b'})
+            self.assertEqual(extract(domains=['www.example.org', 'example.net'])[0], {'b': 'value b'})
+
+            # The cache is not usable without the key
+            with MonkeyPatch(cookies, {'_get_linux_keyring_password': lambda *args, **kwargs: b'other'}):
+                jar, messages = extract()
+            self.assertNotEqual(jar, {**expected, 'c': 'value c'})
+            self.assertIn('Ignoring the cached cookies: ValueError: MAC check failed', messages)
+
     def test_safari_cookie_parsing(self):
         cookies = (
             b'cook\x00\x00\x00\x01\x00\x00\x00i\x00\x00\x01\x00\x01\x00\x00\x00\x10\x00\x00\x00\x00\x00\x00\x00Y'
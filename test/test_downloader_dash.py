@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import http.server
+import re
+import threading
+import time
+
+from test.helper import http_server_port, try_rm
+from yt_dlp import YoutubeDL
+from yt_dlp.downloader.dash import DashSegmentsFD
+from yt_dlp.extractor.common import InfoExtractor
+from yt_dlp.utils import encodeFilename
+from yt_dlp.utils._utils import _YDLLogger as FakeLogger
+
+# Seconds of the stream that are available when the test starts
+START_OFFSET = 5
+# The manifest becomes static after this many requests
+REFRESHES = 3
+
+MPD_TEMPLATE = '''<?xml version="1.0" encoding="UTF-8"?>
+<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" {attributes} minBufferTime="PT2S" profiles="urn:mpeg:dash:profile:isoff-live:2011">
+  <Period id="0" start="PT0S">
+    <AdaptationSet mimeType="video/mp4" contentType="video">
+      <SegmentTemplate timescale="1000" duration="1000" startNumber="1" initialization="$RepresentationID$/init.mp4" media="$RepresentationID$/$Number$.m4s"/>
+      <Representation id="video" bandwidth="100000" codecs="avc1.42c01e" width="320" height="240"/>
+    </AdaptationSet>
+    <AdaptationSet mimeType="audio/mp4" contentType="audio">
+      <SegmentTemplate timescale="1000" duration="1000" startNumber="1" initialization="$RepresentationID$/init.mp4" media="$RepresentationID$/$Number$.m4s"/>
+      <Representation id="audio" bandwidth="64000" codecs="mp4a.40.2" audioSamplingRate="44100"/>
+    </AdaptationSet>
+  </Period>
+</MPD>
+'''
+
+
+def segment_content(representation, n):
+    return f'{representation} {n:>4}\n'.encode() * 50
+
+
+class HTTPTestRequestHandler(http.server.BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def send_content(self, content, content_type='video/mp4'):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self):
+        server = self.server
+        if self.path in ('/live.mpd', '/vanishing.mpd'):
+            with server.lock:
+                server.refreshes += 1
+                if self.path == '/vanishing.mpd' and server.refreshes > REFRESHES:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                if server.refreshes > REFRESHES and server.duration is None:
+                    server.duration = int(time.time() - server.availability_start_time)
+            if server.duration is None:
+                attributes = 'type="dynamic" minimumUpdatePeriod="PT1S" availabilityStartTime="{}"'.format(
+                    time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(server.availability_start_time)))
+            else:
+                attributes = f'type="static" mediaPresentationDuration="PT{server.duration}S"'
+            self.send_content(MPD_TEMPLATE.format(attributes=attributes).encode(), 'application/dash+xml')
+        elif mobj := re.fullmatch(r'/(video|audio)/(init|\d+)\.(?:mp4|m4s)', self.path):
+            self.send_content(segment_content(*mobj.groups()))
+        else:
+            assert False
+
+
+class TestDashSegmentsFD(unittest.TestCase):
+    def setUp(self):
+        self.httpd = http.server.ThreadingHTTPServer(
+            ('127.0.0.1', 0), HTTPTestRequestHandler)
+        self.httpd.lock = threading.Lock()
+        self.httpd.refreshes = 0
+        self.httpd.duration = None
+        self.httpd.availability_start_time = int(time.time()) - START_OFFSET
+        self.port = http_server_port(self.httpd)
+        self.server_thread = threading.Thread(target=self.httpd.serve_forever)
+        self.server_thread.daemon = True
+        self.server_thread.start()
+
+    def tearDown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _extract_formats(self, ydl, path):
+        return InfoExtractor(ydl)._extract_mpd_formats(f'http://127.0.0.1:{self.port}/{path}', 'live', mpd_id='dash')
+
+    def test_live(self):
+        params = {'logger': FakeLogger(), 'concurrent_fragment_downloads': 2}
+        ydl = YoutubeDL(params)
+        formats = self._extract_formats(ydl, 'live.mpd')
+        self.assertEqual([f['format_id'] for f in formats], ['dash-video', 'dash-audio'])
+        # Only the completed segments are listed, after the initialization fragment
+        self.assertIn(len(formats[0]['fragments']), (START_OFFSET + 1, START_OFFSET + 2))
+
+        filenames = {f['format_id']: f'testfile.{f["format_id"]}.mp4' for f in formats}
+        for filename in filenames.values():
+            try_rm(encodeFilename(filename))
+        downloader = DashSegmentsFD(ydl, params)
+        self.assertTrue(downloader.real_download('testfile.mp4', {
+            'url': formats[0]['url'],
+            'ext': 'mp4',
+            'protocol': 'http_dash_segments+http_dash_segments',
+            'is_live': True,
+            'requested_formats': [{**f, 'filepath': filenames[f['format_id']]} for f in formats],
+        }))
+        self.assertGreater(self.httpd.refreshes, REFRESHES)
+
+        for representation in ('video', 'audio'):
+            filename = filenames[f'dash-{representation}']
+            with open(encodeFilename(filename), 'rb') as f:
+                content = f.read()
+            try_rm(encodeFilename(filename))
+            # The download starts a few segments before the live edge, and continues until the end
+            first = self.httpd.duration - len(content) // len(segment_content(representation, 1)) + 2
+            self.assertLess(first, self.httpd.duration - DashSegmentsFD._LIVE_EDGE_FRAGMENTS)
+            self.assertEqual(content, b''.join((
+                segment_content(representation, 'init'),
+                *(segment_content(representation, n) for n in range(first, self.httpd.duration + 1)))))
+
+    def test_live_vanishing(self):
+        # The manifest can no longer be refreshed, and the segments downloaded so far are kept
+        params = {'logger': FakeLogger(), 'fragment_retries': 1}
+        ydl = YoutubeDL(params)
+        formats = self._extract_formats(ydl, 'vanishing.mpd')
+        filename = 'testfile.mp4'
+        try_rm(encodeFilename(filename))
+        self.assertTrue(DashSegmentsFD(ydl, params).real_download(filename, {
+            **formats[0],
+            'ext': 'mp4',
+            'is_live': True,
+        }))
+        # The manifest is requested again once before the download is stopped
+        self.assertEqual(self.httpd.refreshes, REFRESHES + 2)
+
+        with open(encodeFilename(filename), 'rb') as f:
+            content = f.read()
+        try_rm(encodeFilename(filename))
+        segments = [content[i:i + len(segment_content('video', 1))]
+                    for i in range(0, len(content), len(segment_content('video', 1)))]
+        self.assertEqual(segments[0], segment_content('video', 'init'))
+        first = int(segments[1].split()[1])
+        self.assertEqual(segments[1:], [segment_content('video', n) for n in range(first, first + len(segments) - 1)])
+
+
+if __name__ == '__main__':
+    unittest.main()
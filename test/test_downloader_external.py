@@ -8,10 +8,14 @@
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import http.cookiejar
+import http.server
+import json
+import threading
 
-from test.helper import FakeYDL
+from test.helper import FakeYDL, http_server_port, try_rm
 from yt_dlp.downloader.external import (
     Aria2cFD,
+    Aria2cRPCServer,
     AxelFD,
     CurlFD,
     FFmpegFD,
@@ -39,6 +43,76 @@
 }
 
 TEST_INFO = {'url': 'http://www.example.com/'}
+TEST_SECRET = 'ytdlp'
+
+
+class FakeAria2cRPCHandler(http.server.BaseHTTPRequestHandler):
+    """A JSON-RPC server that makes the downloads as soon as they are added"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        try:
+            response = {'result': self._call(request['method'], request['params'])}
+            status = 200
+        except KeyError as e:
+            response = {'error': {'code': 1, 'message': e.args[0]}}
+            status = 400
+        content = json.dumps({'jsonrpc': '2.0', 'id': request['id'], **response}).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _call(self, method, params):
+        server = self.server
+        server.calls.append(method)
+        if method == 'system.multicall':
+            results = []
+            for call in params[0]:
+                try:
+                    results.append([self._call(call['methodName'], call['params'])])
+                except KeyError as e:
+                    results.append({'code': 1, 'message': e.args[0]})
+            return results
+        if params[:1] != [f'token:{TEST_SECRET}']:
+            raise KeyError('Unauthorized')
+        params = params[1:]
+        if method == 'aria2.getVersion':
+            return {'version': '1.37.0'}
+        elif method == 'aria2.addUri':
+            (uri,), options = params
+            gid = f'{len(server.downloads):016x}'
+            server.downloads[gid] = uri, options
+            if uri.endswith('/missing'):
+                status = {'status': 'error', 'errorCode': '3', 'errorMessage': f'Resource not found: {uri}'}
+            else:
+                with open(os.path.join(options['dir'], options['out']), 'wb') as f:
+                    f.write(uri.encode())
+                status = {'status': 'complete', 'totalLength': str(len(uri)), 'completedLength': str(len(uri))}
+            # The results of lost downloads are not on the server, e.g. if they were evicted
+            if not uri.endswith('/lost'):
+                server.stopped.append({'gid': gid, 'downloadSpeed': '0', **status})
+            return gid
+        elif method == 'aria2.tellStatus':
+            status = next((status for status in server.stopped if status['gid'] == params[0]), None)
+            if not status:
+                raise KeyError(f'GID {params[0]} is not found')
+            return status
+        elif method == 'aria2.getGlobalOption':
+            return {'max-concurrent-downloads': '2'}
+        elif method == 'aria2.tellActive':
+            return []
+        elif method == 'aria2.tellStopped':
+            offset, num, _ = params
+            return server.stopped[offset:offset + num]
+        elif method == 'aria2.removeDownloadResult':
+            server.stopped[:] = [status for status in server.stopped if status['gid'] != params[0]]
+            return 'OK'
+        raise KeyError(f'Unknown method {method}')
 
 
 class TestHttpieFD(unittest.TestCase):
@@ -105,6 +179,65 @@ def test_make_cmd(self):
             self.assertIn(f'--load-cookies={downloader._cookies_tempfile}', cmd)
 
 
+class TestAria2cRPCServer(unittest.TestCase):
+    def setUp(self):
+        self.httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), FakeAria2cRPCHandler)
+        self.httpd.calls, self.httpd.downloads, self.httpd.stopped = [], {}, []
+        self.url = f'http://127.0.0.1:{http_server_port(self.httpd)}/jsonrpc'
+        self.server_thread = threading.Thread(target=self.httpd.serve_forever)
+        self.server_thread.daemon = True
+        self.server_thread.start()
+
+    def tearDown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def test_connect(self):
+        with FakeYDL() as ydl:
+            with self.assertRaisesRegex(Exception, 'Unauthorized'):
+                Aria2cRPCServer.connect(ydl, self.url)
+            Aria2cRPCServer.connect(ydl, self.url.replace('//', f'//token:{TEST_SECRET}@'))
+
+    def test_download(self):
+        with FakeYDL({'aria2c_rpc': self.url.replace('//', f'//token:{TEST_SECRET}@')}) as ydl:
+            downloader = Aria2cFD(ydl, ydl.params)
+            ydl.cookiejar.set_cookie(http.cookiejar.Cookie(**TEST_COOKIE))
+            try_rm('testfile.mp4')
+            self.assertTrue(downloader.real_download('testfile.mp4', TEST_INFO))
+            with open('testfile.mp4', 'rb') as f:
+                self.assertEqual(f.read(), TEST_INFO['url'].encode())
+            try_rm('testfile.mp4')
+            ((_, options),) = self.httpd.downloads.values()
+            self.assertEqual(options['out'], './testfile.mp4.part')
+            self.assertIn('Cookie: test=ytdlp', options['header'])
+
+            fragments = [{'url': f'http://www.example.com/{i}'} for i in range(5)]
+            self.assertTrue(downloader.real_download('testfile.mp4', {**TEST_INFO, 'fragments': fragments}))
+            with open('testfile.mp4', 'rb') as f:
+                self.assertEqual(f.read(), b''.join(fragment['url'].encode() for fragment in fragments))
+            try_rm('testfile.mp4')
+            # The fragments are added in a single request, and their results are removed from the server
+            self.assertEqual(self.httpd.calls.count('aria2.addUri'), 6)
+            self.assertIn(['system.multicall', *['aria2.addUri'] * 5], [
+                self.httpd.calls[i:i + 6] for i in range(len(self.httpd.calls))])
+            self.assertEqual(self.httpd.stopped, [])
+
+            self.assertEqual(downloader._call_downloader('testfile.mp4', {'url': 'http://www.example.com/missing'}), 3)
+            self.assertEqual(self.httpd.stopped, [])
+            # A download that is no longer on the server fails instead of being waited for forever
+            self.assertEqual(downloader._call_downloader('testfile.mp4', {'url': 'http://www.example.com/lost'}), 1)
+
+    def test_download_ratelimit(self):
+        with FakeYDL({'aria2c_rpc': self.url.replace('//', f'//token:{TEST_SECRET}@'), 'ratelimit': 1000}) as ydl:
+            downloader = Aria2cFD(ydl, ydl.params)
+            try_rm('testfile.mp4')
+            fragments = [{'url': f'http://www.example.com/{i}'} for i in range(5)]
+            self.assertTrue(downloader.real_download('testfile.mp4', {**TEST_INFO, 'fragments': fragments}))
+            try_rm('testfile.mp4')
+            # The limit is shared by the fragments that are downloaded concurrently
+            self.assertEqual({options['max-download-limit'] for _, options in self.httpd.downloads.values()}, {'500'})
+
+
 @unittest.skipUnless(FFmpegFD.available(), 'ffmpeg not found')
 class TestFFmpegFD(unittest.TestCase):
     _args = []
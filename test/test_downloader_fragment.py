@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import threading
+import time
+
+from test.helper import try_rm
+from yt_dlp import YoutubeDL
+from yt_dlp.downloader.fragment import FragmentFD
+from yt_dlp.utils import DownloadError, encodeFilename
+from yt_dlp.utils._utils import _YDLLogger as FakeLogger
+
+FRAGMENT_COUNT = 20
+TEST_FILE = 'testfile.fragments'
+
+
+def fragment_content(n):
+    return f'fragment {n:>3}\n'.encode() * 10
+
+
+class FakeFragmentFD(FragmentFD):
+    """Downloads the fragments from memory, each after its delay"""
+
+    FD_NAME = 'fakefragment'
+
+    def __init__(self, ydl, params, delays=None, missing=()):
+        super().__init__(ydl, params)
+        self.delays, self.missing = delays or {}, missing
+        self.lock = threading.Lock()
+        self.events = []
+
+    def _download_fragment(self, ctx, frag_url, info_dict, headers=None, request_data=None):
+        n = int(frag_url.rpartition(':')[2])
+        with self.lock:
+            self.events.append(('start', n))
+        time.sleep(self.delays.get(n, 0))
+        with self.lock:
+            self.events.append(('finish', n))
+        if n in self.missing:
+            return False
+        fragment_filename = '%s-Frag%d' % (ctx['tmpfilename'], ctx['fragment_index'])
+        with open(encodeFilename(fragment_filename), 'wb') as f:
+            f.write(fragment_content(n))
+        ctx['fragment_filename_sanitized'] = fragment_filename
+        return True
+
+    def real_download(self, filename, info_dict):
+        self.ctx = ctx = {'filename': filename, 'total_frags': len(info_dict['fragments'])}
+        self._prepare_and_start_frag_download(ctx, info_dict)
+        fragments = [fragment for fragment in info_dict['fragments'] if fragment['frag_index'] > ctx['fragment_index']]
+        return self.download_and_append_fragments(ctx, fragments, info_dict)
+
+
+class TestFragmentFD(unittest.TestCase):
+    INFO = {
+        'url': 'fragment:0',
+        'fragments': [{'url': f'fragment:{n}', 'frag_index': n} for n in range(1, FRAGMENT_COUNT + 1)],
+    }
+
+    def setUp(self):
+        self.tearDown()
+
+    def tearDown(self):
+        for filename in (TEST_FILE, f'{TEST_FILE}.part', f'{TEST_FILE}.ytdl'):
+            try_rm(encodeFilename(filename))
+        for n in range(1, FRAGMENT_COUNT + 1):
+            try_rm(encodeFilename(f'{TEST_FILE}.part-Frag{n}'))
+
+    def download(self, params, **kwargs):
+        params = {'logger': FakeLogger(), 'concurrent_fragment_downloads': 4, **params}
+        downloader = FakeFragmentFD(YoutubeDL(params), params, **kwargs)
+        result = downloader.real_download(TEST_FILE, self.INFO)
+        return downloader, result
+
+    def read(self, filename=TEST_FILE):
+        with open(encodeFilename(filename), 'rb') as f:
+            return f.read()
+
+    def test_out_of_order(self):
+        # The later fragments of each group finish first
+        downloader, result = self.download({}, delays={n: 0.01 * (4 - n % 4) for n in range(1, FRAGMENT_COUNT + 1)})
+        self.assertTrue(result)
+        self.assertEqual(self.read(), b''.join(map(fragment_content, range(1, FRAGMENT_COUNT + 1))))
+        finished = [n for event, n in downloader.events if event == 'finish']
+        self.assertNotEqual(finished, sorted(finished))
+        self.assertGreater(downloader.ctx['max_reorder_backlog'], 0)
+        self.assertEqual(sorted(downloader.ctx['fragment_latencies']), list(range(1, FRAGMENT_COUNT + 1)))
+
+    def test_stalled_head(self):
+        # The first fragment is slow, so that the window fills up behind it
+        params = {'concurrent_fragment_downloads': 2}
+        downloader, result = self.download(params, delays={1: 0.5})
+        self.assertTrue(result)
+        self.assertEqual(self.read(), b''.join(map(fragment_content, range(1, FRAGMENT_COUNT + 1))))
+        window = 2 * FakeFragmentFD._FRAGMENT_REORDER_WINDOW
+        started = [n for event, n in downloader.events[:downloader.events.index(('finish', 1))] if event == 'start']
+        self.assertEqual(started, list(range(1, window + 1)))
+        self.assertEqual(downloader.ctx['max_reorder_backlog'], window - 1)
+
+    def test_skipped_fragments(self):
+        # Fragments that fail inside the window are skipped, and the others are still appended in order
+        downloader, result = self.download({}, delays={3: 0.2, 4: 0.1}, missing={4, 6})
+        self.assertTrue(result)
+        self.assertEqual(self.read(), b''.join(
+            fragment_content(n) for n in range(1, FRAGMENT_COUNT + 1) if n not in (4, 6)))
+
+    def test_resume(self):
+        # A fatal fragment stops the download after the fragments before it are appended
+        with self.assertRaises(DownloadError):
+            self.download({'skip_unavailable_fragments': False}, delays={5: 0.2}, missing={8})
+        self.assertEqual(self.read(f'{TEST_FILE}.part'), b''.join(map(fragment_content, range(1, 8))))
+
+        # The download is resumed after the last appended fragment
+        downloader, result = self.download({})
+        self.assertTrue(result)
+        self.assertEqual(self.read(), b''.join(map(fragment_content, range(1, FRAGMENT_COUNT + 1))))
+        self.assertEqual(min(n for event, n in downloader.events if event == 'start'), 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
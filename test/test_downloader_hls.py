@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import http.server
+import re
+import threading
+
+from test.helper import http_server_port, try_rm
+from yt_dlp import YoutubeDL
+from yt_dlp.aes import aes_cbc_encrypt_bytes
+from yt_dlp.downloader.hls import HlsFD
+from yt_dlp.extractor.common import InfoExtractor
+from yt_dlp.utils import encodeFilename
+from yt_dlp.utils._utils import _YDLLogger as FakeLogger
+
+TEST_KEY = b'0123456789abcdef'
+# The live playlist shows a window of this many segments, moving by one segment per refresh
+WINDOW_SIZE = 3
+REFRESHES = 3
+# The vanishing live playlist is not found after this many requests
+VANISHED_AFTER = 2
+
+
+def segment_content(n):
+    return f'segment {n}\n'.encode() * 100
+
+
+class HTTPTestRequestHandler(http.server.BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def send_content(self, content, content_type='video/mp2t'):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self):
+        server = self.server
+        if self.path.startswith('/live.m3u8'):
+            with server.lock:
+                first = server.refreshes
+                server.refreshes += 1
+            if 'vanishing' in self.path and first >= VANISHED_AFTER:
+                self.send_response(404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            lines = [
+                '#EXTM3U',
+                '#EXT-X-TARGETDURATION:1',
+                f'#EXT-X-MEDIA-SEQUENCE:{first}',
+            ]
+            if 'encrypted' in self.path:
+                lines.append('#EXT-X-KEY:METHOD=AES-128,URI="/key"')
+            for n in range(first, first + WINDOW_SIZE):
+                lines.extend(('#EXTINF:1.0,', f'/segment/{n}.ts'))
+            if first == REFRESHES:
+                lines.append('#EXT-X-ENDLIST')
+            self.send_content('\n'.join(lines).encode(), 'application/vnd.apple.mpegurl')
+        elif self.path == '/vod.m3u8':
+            with server.lock:
+                server.vod_requests += 1
+            lines = ['#EXTM3U', '#EXT-X-TARGETDURATION:1']
+            for n in range(WINDOW_SIZE):
+                lines.extend(('#EXTINF:1.0,', f'/segment/{n}.ts'))
+            lines.append('#EXT-X-ENDLIST')
+            self.send_content('\n'.join(lines).encode(), 'application/vnd.apple.mpegurl')
+        elif self.path == '/key':
+            self.send_content(TEST_KEY, 'application/octet-stream')
+        elif mobj := re.fullmatch(r'/segment/(\d+)\.ts', self.path):
+            n = int(mobj.group(1))
+            content = segment_content(n)
+            if server.encrypted:
+                # The IV is the media sequence number if it is not in the playlist
+                content = aes_cbc_encrypt_bytes(content, TEST_KEY, n.to_bytes(16, 'big'))
+            self.send_content(content)
+        else:
+            assert False
+
+
+class TestHlsFD(unittest.TestCase):
+    def setUp(self):
+        self.httpd = http.server.ThreadingHTTPServer(
+            ('127.0.0.1', 0), HTTPTestRequestHandler)
+        self.httpd.lock = threading.Lock()
+        self.port = http_server_port(self.httpd)
+        self.server_thread = threading.Thread(target=self.httpd.serve_forever)
+        self.server_thread.daemon = True
+        self.server_thread.start()
+
+    def tearDown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def download_live(self, params, encrypted=False):
+        self.httpd.refreshes = 0
+        self.httpd.encrypted = encrypted
+        params['logger'] = FakeLogger()
+        ydl = YoutubeDL(params)
+        downloader = HlsFD(ydl, params)
+        filename = 'testfile.ts'
+        try_rm(encodeFilename(filename))
+        path = 'live.m3u8?encrypted' if encrypted else 'live.m3u8'
+        self.assertTrue(downloader.real_download(filename, {
+            'url': f'http://127.0.0.1:{self.port}/{path}',
+            'ext': 'ts',
+            'is_live': True,
+        }))
+        with open(encodeFilename(filename), 'rb') as f:
+            self.assertEqual(f.read(), b''.join(map(segment_content, range(REFRESHES + WINDOW_SIZE))))
+        self.assertEqual(self.httpd.refreshes, REFRESHES + 1)
+        try_rm(encodeFilename(filename))
+
+    def test_live(self):
+        self.download_live({})
+
+    def test_cached_manifest(self):
+        self.httpd.vod_requests = 0
+        self.httpd.encrypted = False
+        params = {'logger': FakeLogger()}
+        ydl = YoutubeDL(params)
+        formats = InfoExtractor(ydl)._extract_m3u8_formats(f'http://127.0.0.1:{self.port}/vod.m3u8', 'vod')
+        filename = 'testfile.ts'
+        try_rm(encodeFilename(filename))
+        self.assertTrue(HlsFD(ydl, params).real_download(filename, {**formats[0], 'ext': 'ts'}))
+        with open(encodeFilename(filename), 'rb') as f:
+            self.assertEqual(f.read(), b''.join(map(segment_content, range(WINDOW_SIZE))))
+        try_rm(encodeFilename(filename))
+        # The manifest downloaded by the extractor is reused
+        self.assertEqual(self.httpd.vod_requests, 1)
+
+    def test_live_vanishing(self):
+        # The live stream ends without #EXT-X-ENDLIST, and the fragments downloaded so far are kept
+        self.httpd.refreshes = 0
+        self.httpd.encrypted = False
+        params = {'logger': FakeLogger(), 'fragment_retries': 1}
+        downloader = HlsFD(YoutubeDL(params), params)
+        filename = 'testfile.ts'
+        try_rm(encodeFilename(filename))
+        self.assertTrue(downloader.real_download(filename, {
+            'url': f'http://127.0.0.1:{self.port}/live.m3u8?vanishing',
+            'ext': 'ts',
+            'is_live': True,
+        }))
+        with open(encodeFilename(filename), 'rb') as f:
+            self.assertEqual(f.read(), b''.join(map(segment_content, range(VANISHED_AFTER + WINDOW_SIZE - 1))))
+        # The playlist is requested again once before the download is stopped
+        self.assertEqual(self.httpd.refreshes, VANISHED_AFTER + 2)
+        try_rm(encodeFilename(filename))
+
+    def test_live_concurrent_encrypted(self):
+        self.download_live({'concurrent_fragment_downloads': 4}, encrypted=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,11 +9,13 @@
 
 
 import http.server
+import json
 import re
 import threading
 
 from test.helper import http_server_port, try_rm
 from yt_dlp import YoutubeDL
+from yt_dlp.downloader.fragment import HttpBufferedDownloader
 from yt_dlp.downloader.http import HttpFD
 from yt_dlp.utils import encodeFilename
 from yt_dlp.utils._utils import _YDLLogger as FakeLogger
@@ -22,6 +24,7 @@
 
 
 TEST_SIZE = 10 * 1024
+LARGE_DATA = (bytes(range(251)) * (3 * 1024 * 1024 // 251 + 1))[:3 * 1024 * 1024 + 7]
 
 
 class HTTPTestRequestHandler(http.server.BaseHTTPRequestHandler):
@@ -55,8 +58,25 @@ def serve(self, range=True, content_length=True):
         self.end_headers()
         self.wfile.write(b'#' * size)
 
+    def serve_large(self):
+        mobj = re.search(r'^bytes=(\d+)-(\d+)?', self.headers.get('Range') or '')
+        if not mobj:
+            self.send_response(200)
+            start, end = 0, len(LARGE_DATA) - 1
+        else:
+            self.send_response(206)
+            start = int(mobj.group(1))
+            end = min(int(mobj.group(2) or len(LARGE_DATA) - 1), len(LARGE_DATA) - 1)
+            self.send_header('Content-Range', f'bytes {start}-{end}/{len(LARGE_DATA)}')
+        self.send_header('Content-Type', 'video/mp4')
+        self.send_header('Content-Length', end - start + 1)
+        self.end_headers()
+        self.wfile.write(LARGE_DATA[start:end + 1])
+
     def do_GET(self):
-        if self.path == '/regular':
+        if self.path == '/large':
+            self.serve_large()
+        elif self.path == '/regular':
             self.serve()
         elif self.path == '/no-content-length':
             self.serve(content_length=False)
@@ -70,7 +90,7 @@ def do_GET(self):
 
 class TestHttpFD(unittest.TestCase):
     def setUp(self):
-        self.httpd = http.server.HTTPServer(
+        self.httpd = http.server.ThreadingHTTPServer(
             ('127.0.0.1', 0), HTTPTestRequestHandler)
         self.port = http_server_port(self.httpd)
         self.server_thread = threading.Thread(target=self.httpd.serve_forever)
@@ -101,6 +121,59 @@ def test_chunked(self):
             'http_chunk_size': 1000,
         })
 
+    def download_segmented(self, params):
+        params['logger'] = FakeLogger()
+        ydl = YoutubeDL(params)
+        downloader = HttpFD(ydl, params)
+        filename = 'testfile.mp4'
+        self.assertTrue(downloader.real_download(filename, {
+            'url': f'http://127.0.0.1:{self.port}/large',
+        }))
+        with open(encodeFilename(filename), 'rb') as f:
+            self.assertEqual(f.read(), LARGE_DATA)
+        self.assertFalse(os.path.exists(encodeFilename(downloader.ytdl_filename(filename))))
+        try_rm(encodeFilename(filename))
+
+    def test_segmented(self):
+        try_rm(encodeFilename('testfile.mp4'))
+        self.download_segmented({})
+        self.download_segmented({'http_connections': 4})
+        self.download_segmented({'http_connections': 3, 'http_chunk_size': 500000})
+
+    def test_segmented_resume(self):
+        half = len(LARGE_DATA) // 2
+        with open(encodeFilename('testfile.mp4.part'), 'wb') as f:
+            f.write(LARGE_DATA[:1000])
+            f.write(b'\0' * (half - 1000))
+            f.write(LARGE_DATA[half:half + 5000])
+            f.write(b'\0' * (len(LARGE_DATA) - half - 5000))
+        with open(encodeFilename('testfile.mp4.ytdl'), 'w') as f:
+            json.dump({'downloader': {
+                'total_bytes': len(LARGE_DATA),
+                'http_segments': [[0, half - 1, 1000], [half, len(LARGE_DATA) - 1, half + 5000]],
+            }}, f)
+        self.download_segmented({'http_connections': 2})
+
+    def download_buffered(self, params, ep, max_size):
+        params['logger'] = FakeLogger()
+        ydl = YoutubeDL(params)
+        downloader = HttpBufferedDownloader(ydl, params, max_size)
+        filename = 'testfile.mp4-Frag0'
+        try_rm(encodeFilename(filename))
+        self.assertTrue(downloader.real_download(filename, {
+            'url': f'http://127.0.0.1:{self.port}/{ep}',
+        }), ep)
+        self.assertFalse(os.path.exists(encodeFilename(filename)), ep)
+        buffer = downloader.pop_buffer(filename)
+        self.assertEqual(buffer.read(), b'#' * TEST_SIZE, ep)
+        buffer.discard()
+
+    def test_buffered(self):
+        for ep in ('regular', 'no-content-length', 'no-range', 'no-range-no-content-length'):
+            self.download_buffered({}, ep, TEST_SIZE * 2)
+            self.download_buffered({'http_chunk_size': 1000}, ep, TEST_SIZE * 2)
+            self.download_buffered({}, ep, 1024)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -7,6 +7,7 @@
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import json
 import math
 
 from yt_dlp.jsinterp import JS_Undefined, JSInterpreter
@@ -206,6 +207,10 @@ def test_switch(self):
         self._test(jsi, 6, args=[3])
         self._test(jsi, 0, args=[5])
 
+        jsi = JSInterpreter('function f(x) { switch(x){ case 1: return 5; default: return x * 3 } return 0 }')
+        self._test(jsi, 5, args=[1])
+        self._test(jsi, 6, args=[2])
+
     def test_switch_default(self):
         jsi = JSInterpreter('''
             function f(x) { switch(x){
@@ -370,6 +375,38 @@ def test_negative(self):
         self._test('function f(){return 2    -    + + - -2;}', 0)
         self._test('function f(){return 2    +    - + - -2;}', 0)
 
+    def test_compiled_function(self):
+        compiled = JSInterpreter('').compile_function_code(
+            ['a'], 'var b = [function(c){return c + 1}, function(c){return [function(d){return d * c}][0](2)}];'
+                   'return b[0](a) + b[1](a)')
+        self.assertEqual(len(compiled[2]), 2)
+        self.assertNotIn('function', compiled[1])
+
+        func = JSInterpreter('').build_compiled_function(json.loads(json.dumps(compiled)))
+        self.assertEqual(func([3]), 10)
+        self.assertEqual(func([5]), 16)
+
+    def test_compiled_statements(self):
+        # Similar to the nsig functions of the YouTube player
+        code = '''function f(a){var b=a.split(""),c=[function(d,e){e=(e%d.length+d.length)%d.length;d.splice(-e).reverse().forEach(function(f){d.unshift(f)})},
+            -1836295484,function(d,e){for(e=(e%d.length+d.length)%d.length;e--;)d.unshift(d.pop())},function(d){d.reverse()},null,"pop",
+            function(d,e){e=(e%d.length+d.length)%d.length;var f=d[0];d[0]=d[e];d[e]=f},function(d,e){d.push(e)},
+            function(d,e){for(var f=64,h=[];++f-h.length-32;){switch(f){case 58:f-=14;case 91:case 92:case 93:continue;case 123:f=47;case 94:case 95:case 96:continue;case 46:f=95;default:h.push(String.fromCharCode(f))}}d.forEach(function(l,m,n){n[m]=h[(h.indexOf(l)-h.indexOf(e[m])+m-32+f--)%h.length]})},
+            function(d,e){e=(e%d.length+d.length)%d.length;d.splice(e,1)},"qfHS6bQ5KxvT0aBcDeFgHiJkLmNoPqRsTuVwXyZ",
+            function(d,e){e=(e%d.length+d.length)%d.length;d.splice(0,1,d.splice(e,1,d[0])[0])},b,-1193491224,
+            function(d){for(var e=d.length;e;)d.push(d.splice(--e,1)[0])},1226468553];c[4]=c;
+            try{c[0](c[12],c[1]),c[2](c[12],c[13]),c[3](c[12]),c[6](c[12],c[13]),c[8](c[12],c[10]),c[9](c[12],c[15]),
+            c[11](c[12],c[1]),c[14](c[12]),c[7](c[12],c[5]),c[0](c[12],c[15]),c[6](c[12],c[1])}catch(d){return"enhanced_except_"+a}
+            return b.join("")}'''
+
+        results = {}
+        for compile_statements in (False, True):
+            func = JSInterpreter(code, compile_statements=compile_statements).extract_function('f')
+            results[compile_statements] = [func([n]) for n in ('dIdB6sP_cKbVLX', 'abcdefghijklmnop', 'A1b2C3d4E5f6G7')]
+
+        self.assertEqual(results[True], results[False])
+        self.assertFalse(any(res.startswith('enhanced_except_') for res in results[True]))
+
     @unittest.skip('Not implemented')
     def test_packed(self):
         jsi = JSInterpreter('''function f(p,a,c,k,e,d){while(c--)if(k[c])p=p.replace(new RegExp('\\b'+c.toString(a)+'\\b','g'),k[c]);return p}''')
@@ -474,6 +474,27 @@ def test_incompleteread(self, handler):
             with pytest.raises(IncompleteRead, match='13 bytes read, 234221 more expected'):
                 validate_and_send(rh, Request(f'http://127.0.0.1:{self.http_port}/incompleteread')).read()
 
+    def test_readinto(self, handler):
+        with handler() as rh:
+            for encoding in ('', 'gzip'):
+                res = validate_and_send(
+                    rh, Request(
+                        f'http://127.0.0.1:{self.http_port}/content-encoding',
+                        headers={'ytdl-encoding': encoding}))
+                buffer, data = bytearray(8), b''
+                while True:
+                    n = res.readinto(buffer)
+                    if not n:
+                        break
+                    data += buffer[:n]
+                assert data == b'<html><video src="/vid.mp4" /></html>'
+
+        with handler(timeout=2) as rh:
+            res = validate_and_send(rh, Request(f'http://127.0.0.1:{self.http_port}/incompleteread'))
+            with pytest.raises(IncompleteRead):
+                while res.readinto(bytearray(1024)):
+                    pass
+
     def test_cookies(self, handler):
         cookiejar = YoutubeDLCookieJar()
         cookiejar.set_cookie(http.cookiejar.Cookie(
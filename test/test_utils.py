@@ -26,6 +26,7 @@
     Config,
     DateRange,
     ExtractorError,
+    FragmentSequence,
     InAdvancePagedList,
     LazyList,
     NO_DEFAULT,
@@ -327,6 +328,8 @@ def test_ordered_set(self):
         self.assertEqual(orderedSet([1]), [1])
         # keep the list ordered
         self.assertEqual(orderedSet([135, 1, 1, 1]), [135, 1])
+        self.assertEqual(orderedSet([(1, {}), (2, []), (1, [])], key=lambda x: x[0]), [(1, {}), (2, [])])
+        self.assertEqual(list(orderedSet(iter([3, 1, 3]), lazy=True, key=str)), [3, 1])
 
     def test_unescape_html(self):
         self.assertEqual(unescapeHTML('%20;'), '%20;')
@@ -1895,6 +1898,45 @@ def test(ll, idx, val, cache):
         ll = reversed(ll)
         test(ll, -15, 14, range(15))
 
+    def test_FragmentSequence(self):
+        expected = [{'url': 'init.mp4'}]
+        expected.extend({'path': f'seg-{n}-500.m4s', 'duration': 2.0} for n in range(5, 15))
+        expected.extend({'path': f'seg-{n}-{t}-500.m4s', 'duration': d}
+                        for n, t, d in ((15, 100, 3), (16, 103, 3), (17, 200, 1)))
+
+        fragments = FragmentSequence([{'url': 'init.mp4'}])
+        fragments.extend_template('path', 'seg-%(Number)d-%(Bandwidth)d.m4s', {'Bandwidth': 500}, 10, 2.0, number=5)
+        timeline = FragmentSequence()
+        timeline.extend_template(
+            'path', 'seg-%(Number)d-%(Time)d-%(Bandwidth)d.m4s', {'Bandwidth': 500}, 2, 3, number=15, time=100, time_step=3)
+        timeline.extend_template(
+            'path', 'seg-%(Number)d-%(Time)d-%(Bandwidth)d.m4s', {'Bandwidth': 500}, 1, 1, number=17, time=200)
+        fragments.extend(timeline)
+
+        self.assertEqual(len(fragments), len(expected))
+        self.assertEqual(list(fragments), expected)
+        self.assertEqual(fragments, expected)
+        for idx in (0, 1, 10, 11, 13, -1, -3):
+            self.assertEqual(fragments[idx], expected[idx])
+        self.assertEqual(fragments[:2], expected[:2])
+        self.assertEqual(fragments[9:13], expected[9:13])
+        self.assertEqual(fragments[::-4], expected[::-4])
+        with self.assertRaises(IndexError):
+            fragments[len(expected)]
+
+        # Lists of explicit fragments are copied when extending
+        copy = FragmentSequence(fragments)
+        copy.append({'url': 'last.mp4'})
+        fragments.extend([{'url': 'other.mp4'}])
+        self.assertEqual(copy[-1], {'url': 'last.mp4'})
+        self.assertEqual(fragments[-1], {'url': 'other.mp4'})
+        self.assertEqual(len(copy), len(fragments))
+        copy = FragmentSequence(timeline)
+        copy.extend(FragmentSequence([{'url': 'init.mp4'}]))
+        copy.append({'url': 'last.mp4'})
+        self.assertEqual(len(copy), len(timeline) + 2)
+        self.assertFalse(FragmentSequence())
+
     def test_format_bytes(self):
         self.assertEqual(format_bytes(0), '0.00B')
         self.assertEqual(format_bytes(1000), '1000.00B')
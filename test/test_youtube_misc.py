@@ -8,6 +8,11 @@
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
+import tempfile
+import threading
+import time
+
+from test.helper import FakeYDL
 from yt_dlp.extractor import YoutubeIE
 
 
@@ -21,6 +26,71 @@ def test_youtube_extract(self):
         assertExtractId('http://www.youtube.com/watch?v=BaW_jenozKcsharePLED17F32AD9753930', 'BaW_jenozKc')
         assertExtractId('BaW_jenozKc', 'BaW_jenozKc')
 
+    def test_player_responses(self):
+        lock = threading.Lock()
+        running, concurrency = 0, 0
+        # The later clients respond first
+        delays = {'ios': 0.3, 'tv_embedded': 0.2, 'mweb': 0.1, 'android': 0}
+
+        class _YoutubeIE(YoutubeIE):
+            def _download_ytcfg(self, client, video_id):
+                return {}
+
+            def _download_player_url(self, video_id, fatal=False):
+                return None
+
+            def _extract_player_response(self, client, video_id, *args):
+                nonlocal running, concurrency
+                with lock:
+                    running += 1
+                    concurrency = max(concurrency, running)
+                time.sleep(delays[client])
+                with lock:
+                    running -= 1
+                return {
+                    'videoDetails': {'videoId': video_id},
+                    'playabilityStatus': {'reason': 'Sign in to confirm your age'} if client == 'ios' else {'status': 'OK'},
+                    'streamingData': {'formats': [{'itag': 18}]},
+                }
+
+        ie = _YoutubeIE(FakeYDL())
+        prs, _ = ie._extract_player_responses(['ios', 'mweb', 'android'], 'BaW_jenozKc', None, {}, {})
+        # The age-gate fallback of ios is ordered right after it
+        self.assertEqual(
+            [pr['streamingData']['__yt_dlp_client'] for pr in prs], ['IOS', 'TV-E', 'MWEB', 'ANDR'])
+        self.assertGreater(concurrency, 1)
+
+    def test_shared_data(self):
+        downloads = []
+
+        class _YoutubeIE(YoutubeIE):
+            def _download_webpage(self, url, video_id, *args, **kwargs):
+                downloads.append(url)
+                return 'ytcfg.set({"INNERTUBE_API_KEY": "key"});'
+
+            def _load_player(self, video_id, player_url, fatal=True):
+                downloads.append(player_url)
+                return 'signatureTimestamp:19876'
+
+        player_url = 'https://www.youtube.com/s/player/12345678/player_ias.vflset/en_US/base.js'
+        with tempfile.TemporaryDirectory() as tmpdir:
+            try:
+                for _ in range(2):
+                    # The data is shared by the extractors, and is kept in the cache dir
+                    YoutubeIE._shared_data.clear()
+                    for _ in range(2):
+                        ie = _YoutubeIE(FakeYDL({'cachedir': tmpdir}))
+                        self.assertEqual(ie._download_ytcfg('web_music', 'BaW_jenozKc'), {'INNERTUBE_API_KEY': 'key'})
+                        self.assertEqual(ie._extract_signature_timestamp('BaW_jenozKc', player_url), 19876)
+                self.assertEqual(downloads, ['https://music.youtube.com', player_url])
+
+                # Expired data is downloaded again
+                YoutubeIE._shared_data['ytcfg-web_music'][0] -= YoutubeIE._SHARED_DATA_TTL + 1
+                ie._download_ytcfg('web_music', 'BaW_jenozKc')
+                self.assertEqual(len(downloads), 3)
+            finally:
+                YoutubeIE._shared_data.clear()
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -8,8 +8,10 @@
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
+import concurrent.futures
 import contextlib
 import re
+import shutil
 import string
 import urllib.request
 
@@ -190,6 +192,74 @@ def test_youtube_extract_player_info(self):
             self.assertEqual(player_id, expected_player_id)
 
 
+class TestNsigCache(unittest.TestCase):
+    PLAYER_URL = 'https://www.youtube.com/s/player/0123abcd/player_ias.vflset/en_US/base.js'
+    PLAYER_CODE = '''
+        var Xy=function(a){var b=a.split(""),c=[function(d){d.reverse()},function(d,e){d.push(e)}];
+        if(c){c[0](b);c[1](b,"-")}return b.join("")};
+        foo=function(a){a.get("n"))&&(b=Xy(b),a.set("n",b))};
+    '''
+
+    def setUp(self):
+        self.test_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'testdata', 'nsig_cache_test')
+        self.tearDown()
+
+    def tearDown(self):
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def _make_ie(self, player_code=None):
+        ie = YoutubeIE(FakeYDL({'cachedir': self.test_dir}))
+        if player_code:
+            ie._code_cache['0123abcd'] = player_code
+        else:
+            ie._load_player = lambda *args, **kwargs: None
+        return ie
+
+    def test_nsig_cache(self):
+        ie = self._make_ie(self.PLAYER_CODE)
+        self.assertEqual(ie._decrypt_nsig('abc', None, self.PLAYER_URL), 'cba-')
+        self.assertEqual(ie.cache.load('youtube-nsig-results', '0123abcd'), {'abc': 'cba-'})
+        func_code = ie.cache.load('youtube-nsig', '0123abcd')
+        compiled = ie.cache.load('youtube-nsig-compiled', '0123abcd')
+        self.assertEqual(compiled[1][0], ['a'])
+        self.assertEqual(len(compiled[1][2]), 2)
+
+        # Neither the player nor the function code is needed for known values
+        ie = self._make_ie()
+        ie.cache.store('youtube-nsig', '0123abcd', None)
+        ie.cache.store('youtube-nsig-compiled', '0123abcd', None)
+        self.assertEqual(ie._decrypt_nsig('abc', None, self.PLAYER_URL), 'cba-')
+
+        # New values are decrypted with the compiled function
+        ie = self._make_ie()
+        ie.cache.store('youtube-nsig', '0123abcd', func_code)
+        ie.cache.store('youtube-nsig-compiled', '0123abcd', [compiled[0], [['a'], 'return a', []]])
+        self.assertEqual(ie._decrypt_nsig('xyz', None, self.PLAYER_URL), 'xyz')
+        self.assertEqual(ie.cache.load('youtube-nsig-results', '0123abcd'), {'abc': 'cba-', 'xyz': 'xyz'})
+
+        # The compiled function is rebuilt when the function code changes
+        ie = self._make_ie()
+        ie.cache.store('youtube-nsig', '0123abcd', [['a'], 'return a+"!"'])
+        self.assertEqual(ie._decrypt_nsig('uvw', None, self.PLAYER_URL), 'uvw!')
+        self.assertEqual(ie.cache.load('youtube-nsig-compiled', '0123abcd')[1][1], 'return a+"!"')
+
+    def test_nsig_concurrent(self):
+        # e.g. with --concurrent-entries, the videos share the extracted nsig function
+        ie = self._make_ie(self.PLAYER_CODE)
+        values = [f'n{i:03d}' for i in range(400)]
+        with concurrent.futures.ThreadPoolExecutor(40) as executor:
+            results = list(executor.map(lambda s: ie._decrypt_nsig(s, None, self.PLAYER_URL), values))
+        self.assertEqual(results, [f'{s[::-1]}-' for s in values])
+
+    def test_nsig_cache_size(self):
+        ie = self._make_ie()
+        ie._NSIG_RESULTS_CACHE_SIZE = 2
+        for s in ('a', 'b', 'c'):
+            ie._store_nsig_result(self.PLAYER_URL, s, s.upper())
+        self.assertEqual(ie.cache.load('youtube-nsig-results', '0123abcd'), {'b': 'B', 'c': 'C'})
+
+
 @is_download_test
 class TestSignature(unittest.TestCase):
     def setUp(self):
@@ -235,7 +305,12 @@ def signature(jscode, sig_input):
 
 def n_sig(jscode, sig_input):
     funcname = YoutubeIE(FakeYDL())._extract_n_function_name(jscode)
-    return JSInterpreter(jscode).call_function(funcname, sig_input)
+    results = {
+        compile_statements: JSInterpreter(jscode, compile_statements=compile_statements).call_function(funcname, sig_input)
+        for compile_statements in (False, True)}
+
+    assert results[True] == results[False], f'Compiled result {results[True]!r} != interpreted {results[False]!r}'
+    return results[True]
 
 
 make_sig_test = t_factory(
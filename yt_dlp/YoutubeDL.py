@@ -1,4 +1,5 @@
 import collections
+import concurrent.futures
 import contextlib
 import copy
 import datetime as dt
@@ -18,18 +19,20 @@
 import subprocess
 import sys
 import tempfile
+import threading
 import time
 import tokenize
 import traceback
 import unicodedata
 
+from .archive import DownloadArchive, open_download_archive
 from .cache import Cache
 from .compat import functools, urllib  # isort: split
 from .compat import compat_os_name, urllib_req_to_req
 from .cookies import LenientSimpleCookie, load_cookies
 from .downloader import FFmpegFD, get_suitable_downloader, shorten_protocol_name
 from .downloader.rtmp import rtmpdump_version
-from .extractor import gen_extractor_classes, get_info_extractor
+from .extractor import gen_extractor_classes, get_info_extractor, get_url_index
 from .extractor.common import UnsupportedURLIE
 from .extractor.openload import PhantomJSwrapper
 from .minicurses import format_text
@@ -86,6 +89,7 @@
     ExistingVideoReached,
     ExtractorError,
     FormatSorter,
+    FragmentSequence,
     GeoRestrictedError,
     ISO3166Utils,
     LazyList,
@@ -124,7 +128,6 @@
     iri_to_uri,
     is_path_like,
     join_nonempty,
-    locked_file,
     make_archive_id,
     make_dir,
     number_of_digits,
@@ -226,7 +229,9 @@ class YoutubeDL:
     format:            Video format code. see "FORMAT SELECTION" for more details.
                        You can also pass a function. The function takes 'ctx' as
                        argument and returns the formats to download.
-                       See "build_format_selector" for an implementation
+                       See "build_format_selector" for an implementation.
+                       A format spec that is used by many YoutubeDL instances can
+                       be parsed once with "compile_format_spec" and passed instead
     allow_unplayable_formats:   Allow unplayable formats to be extracted and downloaded.
     ignore_no_formats_error: Ignore "No video formats" error. Usefull for
                        extracting metadata even if the video is not actually
@@ -266,6 +271,19 @@ class YoutubeDL:
     playlist_items:    Specific indices of playlist to download.
     playlistrandom:    Download playlist items in random order.
     lazy_playlist:     Process playlist entries as they are received.
+                       If 'stream', the entries are also not held in memory.
+                       The processed entries are then written to a JSON Lines file
+                       next to the playlist infojson, and playlistreverse/playlistrandom
+                       only reorder the entries within windows of 1000 entries,
+                       i.e. playlistreverse yields 1000..1, then 2000..1001, etc.
+    concurrent_entries: Number of playlist entries to process concurrently.
+                       The entries are processed in threads that share this object,
+                       so the hooks and postprocessors must be thread-safe
+    concurrent_postprocessing: Number of videos of a playlist (or of the URLs given to
+                       download) that can be post-processed in background threads
+                       while the next ones are downloaded. The files are moved, and the
+                       after_move/after_video postprocessors and the archive are run
+                       in download order. The hooks and postprocessors must be thread-safe
     matchtitle:        Download only matching titles.
     rejecttitle:       Reject downloads for matching titles.
     logger:            Log messages to a logging.Logger instance.
@@ -313,6 +331,8 @@ class YoutubeDL:
                        downloaded. None for no limit.
     download_archive:  A set, or the name of a file where all downloads are recorded.
                        Videos already present in the file are not downloaded again.
+                       Files with a .db, .sqlite or .sqlite3 extension (or an SQLite
+                       header) are used as an indexed database instead of a text file
     break_on_existing: Stop the download process after attempting to download a
                        file that is in the archive.
     break_per_url:     Whether break_on_reject and break_on_existing
@@ -321,7 +341,9 @@ class YoutubeDL:
     cookiesfrombrowser:  A tuple containing the name of the browser, the profile
                        name/path from where cookies are loaded, the name of the keyring,
                        and the container name, e.g. ('chrome', ) or
-                       ('vivaldi', 'default', 'BASICTEXT') or ('firefox', 'default', None, 'Meta')
+                       ('vivaldi', 'default', 'BASICTEXT') or ('firefox', 'default', None, 'Meta').
+                       A list of domains can be given as a fifth item to only load
+                       the cookies of these domains and their subdomains
     legacyserverconnect: Explicitly allow HTTPS connection to servers that do not
                        support RFC 5746 secure renegotiation
     nocheckcertificate:  Do not verify SSL certificates
@@ -480,7 +502,8 @@ class YoutubeDL:
     nopart, updatetime, buffersize, ratelimit, throttledratelimit, min_filesize,
     max_filesize, test, noresizebuffer, retries, file_access_retries, fragment_retries,
     continuedl, xattr_set_filesize, hls_use_mpegts, http_chunk_size,
-    external_downloader_args, concurrent_fragment_downloads, progress_delta.
+    http_connections, external_downloader_args, aria2c_rpc, concurrent_fragment_downloads,
+    fragment_buffer_size, progress_delta.
 
     The following options are used by the post processors:
     ffmpeg_location:   Location of the ffmpeg/avconv binary; either the path
@@ -597,6 +620,19 @@ class YoutubeDL:
         'video': {*MEDIA_EXTENSIONS.common_video, '3gp'},
         'storyboards': set(MEDIA_EXTENSIONS.storyboards),
     }
+    # Number of formats that are tested concurrently by --check-formats
+    _FORMAT_CHECK_WORKERS = 4
+    # Manifests downloaded by the extractors are reused by the downloaders for this many seconds,
+    # as long as the total length of the cached manifests is within _MANIFEST_CACHE_SIZE
+    _MANIFEST_CACHE_TTL = 60
+    _MANIFEST_CACHE_SIZE = 8 * 1024 * 1024
+    # Streamed playlists are reversed/shuffled within windows of this many entries
+    _PLAYLIST_STREAM_WINDOW = 1000
+
+    _FORMAT_SELECTOR_TYPES = ('PICKFIRST', 'MERGE', 'SINGLE', 'GROUP')
+    _FormatSelector = collections.namedtuple('FormatSelector', ['type', 'selector', 'filters'])
+    # The parsed format spec, with the filters compiled into functions. See compile_format_spec
+    CompiledFormatSpec = collections.namedtuple('CompiledFormatSpec', ['format_spec', 'selectors'])
 
     def __init__(self, params=None, auto_init=True):
         """Create a FileDownloader object with the given options.
@@ -619,6 +655,12 @@ def __init__(self, params=None, auto_init=True):
         self._num_videos = 0
         self._playlist_level = 0
         self._playlist_urls = set()
+        self._lock = threading.Lock()
+        self._thread_local = threading.local()
+        self._post_processing = None
+        self._aria2c_rpc_server = None
+        self._format_checks = {}
+        self._manifests = collections.OrderedDict()
         self.cache = Cache(self)
         self.__header_cookies = []
 
@@ -791,21 +833,13 @@ def check_deprecated(param, option, suggestion):
 
         def preload_download_archive(fn):
             """Preload the archive, if any is specified"""
-            archive = set()
             if fn is None:
-                return archive
+                return set()
             elif not is_path_like(fn):
                 return fn
 
             self.write_debug(f'Loading archive file {fn!r}')
-            try:
-                with locked_file(fn, 'r', encoding='utf-8') as archive_file:
-                    for line in archive_file:
-                        archive.add(line.strip())
-            except OSError as ioe:
-                if ioe.errno != errno.ENOENT:
-                    raise
-            return archive
+            return open_download_archive(fn)
 
         self.archive = preload_download_archive(self.params.get('download_archive'))
 
@@ -832,6 +866,13 @@ def add_info_extractor(self, ie):
             self._ies_instances[ie_key] = ie
             ie.set_downloader(self)
 
+    def _get_candidate_ies(self, url):
+        """Extractors that may be suitable for the URL, in order of priority"""
+        url_index = get_url_index()
+        if url_index is None:
+            return self._ies.items()
+        return [(key, self._ies[key]) for key in url_index.candidate_keys(url, self._ies)]
+
     def get_info_extractor(self, ie_key):
         """
         Get an instance of an IE with name ie_key, it will try to get one from
@@ -973,6 +1014,11 @@ def __exit__(self, *args):
 
     def close(self):
         self.save_cookies()
+        if self._aria2c_rpc_server:
+            self._aria2c_rpc_server.close()
+            self._aria2c_rpc_server = None
+        if isinstance(self.archive, DownloadArchive):
+            self.archive.close()
         if '_request_director' in self.__dict__:
             self._request_director.close()
             del self._request_director
@@ -1172,58 +1218,59 @@ def _copy_infodict(info_dict):
         info_dict.pop('__pending_error', None)
         return info_dict
 
-    def prepare_outtmpl(self, outtmpl, info_dict, sanitize=False):
-        """ Make the outtmpl and info_dict suitable for substitution: ydl.escape_outtmpl(outtmpl) % info_dict
-        @param sanitize    Whether to sanitize the output as a filename.
-                           For backward compatibility, a function can also be passed
-        """
-
-        info_dict.setdefault('epoch', int(time.time()))  # keep epoch consistent once set
+    _OUTTMPL_MATH_FUNCTIONS = {
+        '+': float.__add__,
+        '-': float.__sub__,
+        '*': float.__mul__,
+    }
+    # Field is of the form key1.key2...
+    # where keys (except first) can be string, int, slice or "{field, ...}"
+    _OUTTMPL_FIELD_INNER_RE = r'(?:\w+|%(num)s|%(num)s?(?::%(num)s?){1,2})' % {'num': r'(?:-?\d+)'}  # noqa: UP031
+    _OUTTMPL_FIELD_RE = r'\w*(?:\.(?:%(inner)s|{%(field)s(?:,%(field)s)*}))*' % {  # noqa: UP031
+        'inner': _OUTTMPL_FIELD_INNER_RE,
+        'field': rf'\w*(?:\.{_OUTTMPL_FIELD_INNER_RE})*',
+    }
+    _OUTTMPL_MATH_FIELD_RE = re.compile(rf'(?:{_OUTTMPL_FIELD_RE}|-?{NUMBER_RE})')
+    _OUTTMPL_MATH_OPERATORS_RE = re.compile(r'(?:{})'.format('|'.join(map(re.escape, _OUTTMPL_MATH_FUNCTIONS.keys()))))
+    _OUTTMPL_EXTERNAL_FORMAT_RE = re.compile(STR_FORMAT_RE_TMPL.format('[^)]*', f'[{STR_FORMAT_TYPES}ljhqBUDS]'))
+    _OUTTMPL_INTERNAL_FORMAT_RE = re.compile(rf'''(?xs)
+        (?P<negate>-)?
+        (?P<fields>{_OUTTMPL_FIELD_RE})
+        (?P<maths>(?:{_OUTTMPL_MATH_OPERATORS_RE.pattern}{_OUTTMPL_MATH_FIELD_RE.pattern})*)
+        (?:>(?P<strf_format>.+?))?
+        (?P<remaining>
+            (?P<alternate>(?<!\\),[^|&)]+)?
+            (?:&(?P<replacement>.*?))?
+            (?:\|(?P<default>.*?))?
+        )$''')
+    # For fields playlist_index, playlist_autonumber and autonumber convert all occurrences
+    # of %(field)s to %(field)0Nd for backward compatibility
+    _OUTTMPL_FIELD_SIZE_COMPAT = ('playlist_index', 'playlist_autonumber', 'autonumber')
+
+    # A field of a compiled output template, and each of its alternatives ("field1,field2...")
+    # with the traversal path and maths already parsed. See compile_outtmpl
+    _OuttmplField = collections.namedtuple('OuttmplField', ['key', 'format', 'conversion', 'alternatives'])
+    _OuttmplAlternative = collections.namedtuple('OuttmplAlternative', [
+        'fields', 'path', 'negate', 'maths', 'strf_format', 'alternate', 'replacement', 'default'])
+    # The output template with its fields replaced by "%(\0N)s", and the names of the top-level
+    # fields it uses, or None if it uses the whole info dict
+    CompiledOuttmpl = collections.namedtuple('CompiledOuttmpl', ['template', 'escaped', 'fields', 'keys'])
+
+    class _OuttmplReplacementFormatter(string.Formatter):
+        def get_field(self, field_name, args, kwargs):
+            if field_name.isdigit():
+                return args[0], -1
+            raise ValueError('Unsupported field')
 
-        info_dict = self._copy_infodict(info_dict)
-        info_dict['duration_string'] = (  # %(duration>%H-%M-%S)s is wrong if duration > 24hrs
-            formatSeconds(info_dict['duration'], '-' if sanitize else ':')
-            if info_dict.get('duration', None) is not None
-            else None)
-        info_dict['autonumber'] = int(self.params.get('autonumber_start', 1) - 1 + self._num_downloads)
-        info_dict['video_autonumber'] = self._num_videos
-        if info_dict.get('resolution') is None:
-            info_dict['resolution'] = self.format_resolution(info_dict, default=None)
-
-        # For fields playlist_index, playlist_autonumber and autonumber convert all occurrences
-        # of %(field)s to %(field)0Nd for backward compatibility
-        field_size_compat_map = {
-            'playlist_index': number_of_digits(info_dict.get('__last_playlist_index') or 0),
-            'playlist_autonumber': number_of_digits(info_dict.get('n_entries') or 0),
-            'autonumber': self.params.get('autonumber_size') or 5,
-        }
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def compile_outtmpl(outtmpl):
+        """Parse an output template into a CompiledOuttmpl
 
-        TMPL_DICT = {}
-        EXTERNAL_FORMAT_RE = re.compile(STR_FORMAT_RE_TMPL.format('[^)]*', f'[{STR_FORMAT_TYPES}ljhqBUDS]'))
-        MATH_FUNCTIONS = {
-            '+': float.__add__,
-            '-': float.__sub__,
-            '*': float.__mul__,
-        }
-        # Field is of the form key1.key2...
-        # where keys (except first) can be string, int, slice or "{field, ...}"
-        FIELD_INNER_RE = r'(?:\w+|%(num)s|%(num)s?(?::%(num)s?){1,2})' % {'num': r'(?:-?\d+)'}  # noqa: UP031
-        FIELD_RE = r'\w*(?:\.(?:%(inner)s|{%(field)s(?:,%(field)s)*}))*' % {  # noqa: UP031
-            'inner': FIELD_INNER_RE,
-            'field': rf'\w*(?:\.{FIELD_INNER_RE})*',
-        }
-        MATH_FIELD_RE = rf'(?:{FIELD_RE}|-?{NUMBER_RE})'
-        MATH_OPERATORS_RE = r'(?:{})'.format('|'.join(map(re.escape, MATH_FUNCTIONS.keys())))
-        INTERNAL_FORMAT_RE = re.compile(rf'''(?xs)
-            (?P<negate>-)?
-            (?P<fields>{FIELD_RE})
-            (?P<maths>(?:{MATH_OPERATORS_RE}{MATH_FIELD_RE})*)
-            (?:>(?P<strf_format>.+?))?
-            (?P<remaining>
-                (?P<alternate>(?<!\\),[^|&)]+)?
-                (?:&(?P<replacement>.*?))?
-                (?:\|(?P<default>.*?))?
-            )$''')
+        The result does not depend on the YoutubeDL instance, and is used by
+        prepare_outtmpl and evaluate_outtmpl to only resolve the fields the template uses
+        """
+        fields, keys = [], set()
 
         def _from_user_input(field):
             if field == ':':
@@ -1234,55 +1281,126 @@ def _from_user_input(field):
                 return int(field)
             return field
 
-        def _traverse_infodict(fields):
-            fields = [f for x in re.split(r'\.({.+?})\.?', fields)
-                      for f in ([x] if x.startswith('{') else x.split('.'))]
+        def parse_path(fields_str):
+            nonlocal keys
+            path = [f for x in re.split(r'\.({.+?})\.?', fields_str)
+                    for f in ([x] if x.startswith('{') else x.split('.'))]
             for i in (0, -1):
-                if fields and not fields[i]:
-                    fields.pop(i)
+                if path and not path[i]:
+                    path.pop(i)
 
-            for i, f in enumerate(fields):
+            for i, f in enumerate(path):
                 if not f.startswith('{'):
-                    fields[i] = _from_user_input(f)
+                    path[i] = _from_user_input(f)
+                    continue
+                assert f.endswith('}'), f'No closing brace for {f} in {path}'
+                path[i] = {k: list(map(_from_user_input, k.split('.'))) for k in f[1:-1].split(',')}
+
+            if keys is not None and path and isinstance(path[0], str):
+                keys.add(path[0])
+            else:
+                keys = None
+            return path
+
+        def parse_alternative(mobj):
+            # Maths are a list of (operator, multiplier, offset or traversal path)
+            maths, offset_key, operator = [], mobj['maths'], None
+            while offset_key:
+                item = (YoutubeDL._OUTTMPL_MATH_FIELD_RE if operator else YoutubeDL._OUTTMPL_MATH_OPERATORS_RE).match(
+                    offset_key).group(0)
+                offset_key = offset_key[len(item):]
+                if operator is None:
+                    operator = YoutubeDL._OUTTMPL_MATH_FUNCTIONS[item]
                     continue
-                assert f.endswith('}'), f'No closing brace for {f} in {fields}'
-                fields[i] = {k: list(map(_from_user_input, k.split('.'))) for k in f[1:-1].split(',')}
+                item, multiplier = (item[1:], -1) if item[0] == '-' else (item, 1)
+                offset = float_or_none(item)
+                maths.append((operator, multiplier, parse_path(item) if offset is None else offset))
+                operator = None
+
+            return YoutubeDL._OuttmplAlternative(
+                mobj['fields'], parse_path(mobj['fields']), bool(mobj['negate']), maths,
+                mobj['strf_format'] and mobj['strf_format'].replace('\\,', ','),
+                mobj['alternate'], mobj['replacement'], mobj['default'])
+
+        def create_key(outer_mobj):
+            if not outer_mobj.group('has_key'):
+                return outer_mobj.group(0)
+            key = outer_mobj.group('key')
+            alternatives = []
+            mobj = YoutubeDL._OUTTMPL_INTERNAL_FORMAT_RE.match(key)
+            while mobj:
+                mobj = mobj.groupdict()
+                alternatives.append(parse_alternative(mobj))
+                if not mobj['alternate']:
+                    break
+                mobj = YoutubeDL._OUTTMPL_INTERNAL_FORMAT_RE.match(mobj['remaining'][1:])
 
-            return traverse_obj(info_dict, fields, traverse_string=True)
+            fields.append(YoutubeDL._OuttmplField(
+                key, outer_mobj.group('format'), outer_mobj.group('conversion') or '', alternatives))
+            return '{prefix}%(\0{n})s'.format(n=len(fields) - 1, prefix=outer_mobj.group('prefix'))
 
-        def get_value(mdict):
+        template = YoutubeDL._OUTTMPL_EXTERNAL_FORMAT_RE.sub(create_key, outtmpl)
+        return YoutubeDL.CompiledOuttmpl(
+            template, YoutubeDL.escape_outtmpl(template), tuple(fields), keys and frozenset(keys))
+
+    def _outtmpl_values(self, compiled, info_dict, sanitize=False):
+        """ Evaluate the fields of the CompiledOuttmpl, as the dict to substitute into its template """
+        info_dict.setdefault('epoch', int(time.time()))  # keep epoch consistent once set
+
+        # Only the auto-generated fields that are used are added, over the info dict
+        # The whole info dict is copied only if it is used, e.g. by %()j
+        if compiled.keys is None:
+            info_dict = extra = self._copy_infodict(info_dict)
+        else:
+            extra = dict.fromkeys(compiled.keys & {'__postprocessors', '__pending_error'})
+        is_used = lambda key: compiled.keys is None or key in compiled.keys
+
+        if is_used('duration_string'):
+            extra['duration_string'] = (  # %(duration>%H-%M-%S)s is wrong if duration > 24hrs
+                formatSeconds(info_dict['duration'], '-' if sanitize else ':')
+                if info_dict.get('duration', None) is not None
+                else None)
+        # The counts at the time the video was processed, since other entries may be processed concurrently
+        if is_used('autonumber'):
+            extra['autonumber'] = int(
+                self.params.get('autonumber_start', 1) - 1 + info_dict.get('__num_downloads', self._num_downloads))
+        if is_used('video_autonumber'):
+            extra['video_autonumber'] = info_dict.get('__num_videos', self._num_videos)
+        if is_used('resolution') and info_dict.get('resolution') is None:
+            extra['resolution'] = self.format_resolution(info_dict, default=None)
+        if extra and compiled.keys is not None:
+            info_dict = collections.ChainMap(extra, info_dict)
+
+        def traverse(path):
+            # Same as traverse_obj, but faster for the usual paths of string keys into dicts
+            obj = info_dict
+            for i, key in enumerate(path):
+                if not isinstance(key, str) or type(obj) not in (dict, collections.ChainMap):
+                    return traverse_obj(obj, path[i:], traverse_string=True)
+                obj = obj.get(key)
+            return None if obj in (None, {}) else obj
+
+        def get_value(alternative):
             # Object traversal
-            value = _traverse_infodict(mdict['fields'])
+            value = traverse(alternative.path)
             # Negative
-            if mdict['negate']:
+            if alternative.negate:
                 value = float_or_none(value)
                 if value is not None:
                     value *= -1
             # Do maths
-            offset_key = mdict['maths']
-            if offset_key:
+            if alternative.maths:
                 value = float_or_none(value)
-                operator = None
-                while offset_key:
-                    item = re.match(
-                        MATH_FIELD_RE if operator else MATH_OPERATORS_RE,
-                        offset_key).group(0)
-                    offset_key = offset_key[len(item):]
-                    if operator is None:
-                        operator = MATH_FUNCTIONS[item]
-                        continue
-                    item, multiplier = (item[1:], -1) if item[0] == '-' else (item, 1)
-                    offset = float_or_none(item)
-                    if offset is None:
-                        offset = float_or_none(_traverse_infodict(item))
+                for operator, multiplier, offset in alternative.maths:
+                    if not isinstance(offset, float):
+                        offset = float_or_none(traverse(offset))
                     try:
                         value = operator(value, multiplier * offset)
                     except (TypeError, ZeroDivisionError):
                         return None
-                    operator = None
             # Datetime formatting
-            if mdict['strf_format']:
-                value = strftime_or_none(value, mdict['strf_format'].replace('\\,', ','))
+            if alternative.strf_format:
+                value = strftime_or_none(value, alternative.strf_format)
 
             # XXX: Workaround for https://github.com/yt-dlp/yt-dlp/issues/4485
             if sanitize and value == '':
@@ -1301,45 +1419,36 @@ def filename_sanitizer(key, value, restricted=self.params.get('restrictfilenames
         sanitize = bool(sanitize)
 
         def _dumpjson_default(obj):
-            if isinstance(obj, (set, LazyList)):
+            if isinstance(obj, (set, LazyList, FragmentSequence)):
                 return list(obj)
             return repr(obj)
 
-        class _ReplacementFormatter(string.Formatter):
-            def get_field(self, field_name, args, kwargs):
-                if field_name.isdigit():
-                    return args[0], -1
-                raise ValueError('Unsupported field')
+        def field_size(field):
+            return {
+                'playlist_index': lambda: number_of_digits(info_dict.get('__last_playlist_index') or 0),
+                'playlist_autonumber': lambda: number_of_digits(info_dict.get('n_entries') or 0),
+                'autonumber': lambda: self.params.get('autonumber_size') or 5,
+            }[field]()
 
-        replacement_formatter = _ReplacementFormatter()
-
-        def create_key(outer_mobj):
-            if not outer_mobj.group('has_key'):
-                return outer_mobj.group(0)
-            key = outer_mobj.group('key')
-            mobj = re.match(INTERNAL_FORMAT_RE, key)
+        def evaluate_field(field):
             value, replacement, default, last_field = None, None, na, ''
-            while mobj:
-                mobj = mobj.groupdict()
-                default = mobj['default'] if mobj['default'] is not None else default
-                value = get_value(mobj)
-                last_field, replacement = mobj['fields'], mobj['replacement']
-                if value is None and mobj['alternate']:
-                    mobj = re.match(INTERNAL_FORMAT_RE, mobj['remaining'][1:])
-                else:
+            for alternative in field.alternatives:
+                default = alternative.default if alternative.default is not None else default
+                value = get_value(alternative)
+                last_field, replacement = alternative.fields, alternative.replacement
+                if value is not None or not alternative.alternate:
                     break
 
             if None not in (value, replacement):
                 try:
-                    value = replacement_formatter.format(replacement, value)
+                    value = self._OuttmplReplacementFormatter().format(replacement, value)
                 except ValueError:
                     value, default = None, na
 
-            fmt = outer_mobj.group('format')
-            if fmt == 's' and last_field in field_size_compat_map and isinstance(value, int):
-                fmt = f'0{field_size_compat_map[last_field]:d}d'
+            fmt, flags = field.format, field.conversion
+            if fmt == 's' and last_field in self._OUTTMPL_FIELD_SIZE_COMPAT and isinstance(value, int):
+                fmt = f'0{field_size(last_field):d}d'
 
-            flags = outer_mobj.group('conversion') or ''
             str_fmt = f'{fmt[:-1]}s'
             if value is None:
                 value, fmt = default, 's'
@@ -1389,15 +1498,21 @@ def create_key(outer_mobj):
                 if fmt[-1] in 'csra':
                     value = sanitizer(last_field, value)
 
-            key = '{}\0{}'.format(key.replace('%', '%\0'), outer_mobj.group('format'))
-            TMPL_DICT[key] = value
-            return '{prefix}%({key}){fmt}'.format(key=key, fmt=fmt, prefix=outer_mobj.group('prefix'))
+            return f'%{fmt}' % (value,)
 
-        return EXTERNAL_FORMAT_RE.sub(create_key, outtmpl), TMPL_DICT
+        return {f'\0{n}': evaluate_field(field) for n, field in enumerate(compiled.fields)}
+
+    def prepare_outtmpl(self, outtmpl, info_dict, sanitize=False):
+        """ Make the outtmpl and info_dict suitable for substitution: ydl.escape_outtmpl(outtmpl) % info_dict
+        @param sanitize    Whether to sanitize the output as a filename.
+                           For backward compatibility, a function can also be passed
+        """
+        compiled = self.compile_outtmpl(outtmpl)
+        return compiled.template, self._outtmpl_values(compiled, info_dict, sanitize)
 
     def evaluate_outtmpl(self, outtmpl, info_dict, *args, **kwargs):
-        outtmpl, info_dict = self.prepare_outtmpl(outtmpl, info_dict, *args, **kwargs)
-        return self.escape_outtmpl(outtmpl) % info_dict
+        compiled = self.compile_outtmpl(outtmpl)
+        return compiled.escaped % self._outtmpl_values(compiled, info_dict, *args, **kwargs)
 
     def _prepare_filename(self, info_dict, *, outtmpl=None, tmpl_type=None):
         assert None in (outtmpl, tmpl_type), 'outtmpl and tmpl_type are mutually exclusive'
@@ -1572,11 +1687,11 @@ def extract_info(self, url, download=True, ie_key=None, extra_info=None,
             ie_key = 'Generic'
 
         if ie_key:
-            ies = {ie_key: self._ies[ie_key]} if ie_key in self._ies else {}
+            ies = [(ie_key, self._ies[ie_key])] if ie_key in self._ies else []
         else:
-            ies = self._ies
+            ies = self._get_candidate_ies(url)
 
-        for key, ie in ies.items():
+        for key, ie in ies:
             if not ie.suitable(url):
                 continue
 
@@ -1882,16 +1997,18 @@ def process_ie_result(self, ie_result, download=True, extra_info=None):
                         ie_result.get('title')) or ie_result.get('id'))
                 return
 
-            self._playlist_level += 1
-            self._playlist_urls.add(webpage_url)
+            with self._lock:
+                self._playlist_level += 1
+                self._playlist_urls.add(webpage_url)
             self._fill_common_fields(ie_result, False)
             self._sanitize_thumbnails(ie_result)
             try:
                 return self.__process_playlist(ie_result, download)
             finally:
-                self._playlist_level -= 1
-                if not self._playlist_level:
-                    self._playlist_urls.clear()
+                with self._lock:
+                    self._playlist_level -= 1
+                    if not self._playlist_level:
+                        self._playlist_urls.clear()
         elif result_type == 'compat_list':
             self.report_warning(
                 'Extractor {} returned a compat_list result. '
@@ -1955,9 +2072,14 @@ def __process_playlist(self, ie_result, download):
         self.to_screen(f'[download] Downloading {ie_result["_type"]}: {title}')
 
         all_entries = PlaylistEntries(self, ie_result)
-        entries = orderedSet(all_entries.get_requested_items(), lazy=True)
+        entries = orderedSet(all_entries.get_requested_items(), lazy=True, key=operator.itemgetter(0))
+
+        archived_indices = set()
+        if all_entries.page_size and self.archive and not self.params.get('break_on_existing'):
+            entries = self.__find_archived_pages(entries, all_entries.page_size, archived_indices)
 
         lazy = self.params.get('lazy_playlist')
+        stream = lazy == 'stream'
         if lazy:
             resolved_entries, n_entries = [], 'N/A'
             ie_result['requested_entries'], ie_result['entries'] = None, None
@@ -1987,7 +2109,22 @@ def __process_playlist(self, ie_result, download):
             # TODO: This should be passed to ThumbnailsConvertor if necessary
             self._write_thumbnails('playlist', ie_result, self.prepare_filename(ie_copy, 'pl_thumbnail'))
 
-        if lazy:
+        entries_infofn = None
+        if stream and _infojson_written is True:
+            # The entries are written as they are processed, instead of with the updated playlist
+            entries_infofn = replace_extension(self.prepare_filename(ie_copy, 'pl_infojson'), 'jsonl', 'json')
+            if self._write_info_jsonl('playlist entries', None, entries_infofn) is None:
+                return
+
+        if stream:
+            if self.params.get('playlistreverse'):
+                self.report_warning(
+                    f'The entries of a streamed playlist are only reversed within windows of '
+                    f'{self._PLAYLIST_STREAM_WINDOW} entries, e.g. {self._PLAYLIST_STREAM_WINDOW}..1 '
+                    f'then {2 * self._PLAYLIST_STREAM_WINDOW}..{self._PLAYLIST_STREAM_WINDOW + 1}', only_once=True)
+            if self.params.get('playlistreverse') or self.params.get('playlistrandom'):
+                entries = self.__reorder_playlist_stream(entries, reverse=bool(self.params.get('playlistreverse')))
+        elif lazy:
             if self.params.get('playlistreverse') or self.params.get('playlistrandom'):
                 self.report_warning('playlistreverse and playlistrandom are not supported with lazy_playlist', only_once=True)
         elif self.params.get('playlistreverse'):
@@ -2001,56 +2138,77 @@ def __process_playlist(self, ie_result, download):
         keep_resolved_entries = self.params.get('extract_flat') != 'discard'
         if self.params.get('extract_flat') == 'discard_in_playlist':
             keep_resolved_entries = ie_result['_type'] != 'playlist'
-        if keep_resolved_entries:
+        if keep_resolved_entries and not stream:
             self.write_debug('The information of all playlist entries will be held in memory')
 
-        failures = 0
-        max_failures = self.params.get('skip_playlist_after_errors') or float('inf')
-        for i, (playlist_index, entry) in enumerate(entries):
-            if lazy:
-                resolved_entries.append((playlist_index, entry))
-            if not entry:
-                continue
+        def requested_entries():
+            for i, (playlist_index, entry) in enumerate(entries):
+                if lazy and not stream:
+                    resolved_entries.append((playlist_index, entry))
+                if not entry:
+                    continue
+                elif playlist_index in archived_indices:
+                    archived_indices.remove(playlist_index)
+                    if not stream:
+                        resolved_entries[i] = (playlist_index, NO_DEFAULT)
+                    continue
 
-            entry['__x_forwarded_for_ip'] = ie_result.get('__x_forwarded_for_ip')
-            if not lazy and 'playlist-index' in self.params['compat_opts']:
-                playlist_index = ie_result['requested_entries'][i]
+                entry['__x_forwarded_for_ip'] = ie_result.get('__x_forwarded_for_ip')
+                if not lazy and 'playlist-index' in self.params['compat_opts']:
+                    playlist_index = ie_result['requested_entries'][i]
 
-            entry_copy = collections.ChainMap(entry, {
-                **common_info,
-                'n_entries': int_or_none(n_entries),
-                'playlist_index': playlist_index,
-                'playlist_autonumber': i + 1,
-            })
+                entry_copy = collections.ChainMap(entry, {
+                    **common_info,
+                    'n_entries': int_or_none(n_entries),
+                    'playlist_index': playlist_index,
+                    'playlist_autonumber': i + 1,
+                })
 
-            if self._match_entry(entry_copy, incomplete=True) is not None:
-                # For compatabilty with youtube-dl. See https://github.com/yt-dlp/yt-dlp/issues/4369
-                resolved_entries[i] = (playlist_index, NO_DEFAULT)
-                continue
+                if self._match_entry(entry_copy, incomplete=True) is not None:
+                    # For compatabilty with youtube-dl. See https://github.com/yt-dlp/yt-dlp/issues/4369
+                    if not stream:
+                        resolved_entries[i] = (playlist_index, NO_DEFAULT)
+                    continue
 
-            self.to_screen(
-                f'[download] Downloading item {self._format_screen(i + 1, self.Styles.ID)} '
-                f'of {self._format_screen(n_entries, self.Styles.EMPHASIS)}')
-
-            entry_result = self.__process_iterable_entry(entry, download, collections.ChainMap({
-                'playlist_index': playlist_index,
-                'playlist_autonumber': i + 1,
-            }, extra))
-            if not entry_result:
-                failures += 1
-            if failures >= max_failures:
-                self.report_error(
-                    f'Skipping the remaining entries in playlist "{title}" since {failures} items failed extraction')
-                break
-            if keep_resolved_entries:
-                resolved_entries[i] = (playlist_index, entry_result)
+                self.to_screen(
+                    f'[download] Downloading item {self._format_screen(i + 1, self.Styles.ID)} '
+                    f'of {self._format_screen(n_entries, self.Styles.EMPHASIS)}')
+
+                yield i, playlist_index, entry, collections.ChainMap({
+                    'playlist_index': playlist_index,
+                    'playlist_autonumber': i + 1,
+                }, extra)
+
+        failures = 0
+        max_failures = self.params.get('skip_playlist_after_errors') or float('inf')
+        # The entries of a streamed playlist are written when they are processed, so they must be post-processed by then
+        with contextlib.nullcontext() if entries_infofn else self._post_processing_pipeline():
+            for i, playlist_index, entry_result in self.__process_entries(requested_entries(), download):
+                if not entry_result:
+                    failures += 1
+                if failures >= max_failures:
+                    self.report_error(
+                        f'Skipping the remaining entries in playlist "{title}" since {failures} items failed extraction')
+                    break
+                if not keep_resolved_entries:
+                    continue
+                elif not stream:
+                    resolved_entries[i] = (playlist_index, entry_result)
+                elif entry_result and entries_infofn and self._write_info_jsonl(
+                        'playlist entries', entry_result, entries_infofn) is None:
+                    return
 
         # Update with processed data
-        ie_result['entries'] = [e for _, e in resolved_entries if e is not NO_DEFAULT]
-        ie_result['requested_entries'] = [i for i, e in resolved_entries if e is not NO_DEFAULT]
-        if ie_result['requested_entries'] == try_call(lambda: list(range(1, ie_result['playlist_count'] + 1))):
-            # Do not set for full playlist
+        if stream:
+            # The entries are not held in memory
+            ie_result['entries'] = None
             ie_result.pop('requested_entries')
+        else:
+            ie_result['entries'] = [e for _, e in resolved_entries if e is not NO_DEFAULT]
+            ie_result['requested_entries'] = [i for i, e in resolved_entries if e is not NO_DEFAULT]
+            if ie_result['requested_entries'] == try_call(lambda: list(range(1, ie_result['playlist_count'] + 1))):
+                # Do not set for full playlist
+                ie_result.pop('requested_entries')
 
         # Write the updated info to json
         if _infojson_written is True and self._write_info_json(
@@ -2062,12 +2220,152 @@ def __process_playlist(self, ie_result, download):
         self.to_screen(f'[download] Finished downloading playlist: {title}')
         return ie_result
 
+    def __find_archived_pages(self, entries, page_size, archived_indices):
+        """
+        Check the entries against the download archive a page at a time
+
+        The playlist indices of the pages whose entries have all been recorded
+        in the archive are added to archived_indices, so that they are skipped
+        """
+        for pagenum, page in itertools.groupby(entries, lambda item: (item[0] - 1) // page_size):
+            page = list(page)
+            if all(isinstance(entry, dict) for _, entry in page) and all(
+                    self._in_download_archive_bulk([entry for _, entry in page])):
+                self.to_screen(
+                    f'[download] Skipping {len(page)} entries of page {pagenum + 1} '
+                    'since they have already been recorded in the archive')
+                archived_indices.update(playlist_index for playlist_index, _ in page)
+            yield from page
+
+    def __reorder_playlist_stream(self, entries, reverse=False):
+        """Reverse or shuffle the entries of a streamed playlist, holding at most _PLAYLIST_STREAM_WINDOW of them"""
+        if reverse:
+            while window := list(itertools.islice(entries, self._PLAYLIST_STREAM_WINDOW)):
+                yield from reversed(window)
+            return
+        # Each new entry takes the place of a random entry of the window, which is yielded
+        window = list(itertools.islice(entries, self._PLAYLIST_STREAM_WINDOW))
+        for entry in entries:
+            i = random.randrange(len(window))
+            yield window[i]
+            window[i] = entry
+        random.shuffle(window)
+        yield from window
+
+    def __process_entries(self, entries, download):
+        """
+        Process the playlist entries, using a pool of concurrent_entries threads if requested
+
+        @param entries    Iterable of (index, playlist_index, entry, extra_info)
+        @returns          Iterator of (index, playlist_index, result), in the order the entries finish.
+                          The pending entries are finished before any exception is propagated
+        """
+        max_workers = self.params.get('concurrent_entries') or 1
+        # Entries of nested playlists are processed in the worker thread of the outer entry
+        if max_workers <= 1 or getattr(self._thread_local, 'is_entry_worker', False):
+            for i, playlist_index, entry, extra_info in entries:
+                yield i, playlist_index, self.__process_iterable_entry(entry, download, extra_info)
+            return
+
+        def process_entry(entry, extra_info):
+            self._thread_local.is_entry_worker = True
+            return self.__process_iterable_entry(entry, download, extra_info)
+
+        entries, running = iter(entries), {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers, thread_name_prefix='yt-dlp-entry') as executor:
+            while True:
+                # Only take as many entries as can be run, so that lazy playlists are not exhausted beforehand
+                for i, playlist_index, entry, extra_info in itertools.islice(entries, max_workers - len(running)):
+                    running[executor.submit(process_entry, entry, extra_info)] = i, playlist_index
+                if not running:
+                    break
+                done, _ = concurrent.futures.wait(
+                    running, timeout=0.1 if compat_os_name == 'nt' else None,  # Allow KeyboardInterrupt on Windows
+                    return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in sorted(done, key=running.get):
+                    i, playlist_index = running.pop(future)
+                    yield i, playlist_index, future.result()
+
+    @contextlib.contextmanager
+    def _post_processing_pipeline(self):
+        """
+        Post-process the videos downloaded in the context in up to concurrent_postprocessing
+        background threads, while the next videos are downloaded
+
+        All of them are finished when the context exits. The first error of the background
+        threads is raised by the next video that is post-processed, or when the context exits
+        """
+        max_workers = self.params.get('concurrent_postprocessing') or 0
+        if max_workers <= 0 or self.params.get('simulate'):
+            yield
+            return
+        elif pipeline := self._post_processing:
+            # e.g. A playlist among the URLs given to download. Its videos are post-processed in the
+            # outer pipeline, but they must be finished when the context exits all the same
+            yield
+            if pipeline.last_done:
+                pipeline.last_done.wait()
+            self.__raise_post_processing_error(pipeline)
+            return
+
+        self._post_processing = pipeline = Namespace(
+            executor=concurrent.futures.ThreadPoolExecutor(max_workers, thread_name_prefix='yt-dlp-postprocess'),
+            # Every video that is being post-processed has a thread, so that it can wait for the previous one
+            slots=threading.BoundedSemaphore(max_workers),
+            last_done=None, error=None)
+        try:
+            yield
+        finally:
+            self._post_processing = None
+            pipeline.executor.shutdown()
+        self.__raise_post_processing_error(pipeline)
+
+    def __raise_post_processing_error(self, pipeline):
+        error, pipeline.error = pipeline.error, None
+        if error:
+            raise error
+
+    def __post_process_in_background(self, func):
+        pipeline = self._post_processing
+        self.__raise_post_processing_error(pipeline)
+        pipeline.slots.acquire()
+        done = threading.Event()
+        with self._lock:
+            previous, pipeline.last_done = pipeline.last_done, done
+
+        def run():
+            self._thread_local.previous_post_processing = previous
+            try:
+                func()
+            except Exception as err:
+                if self.params.get('ignoreerrors') and not isinstance(err, DownloadCancelled):
+                    self.report_error(str(err), tb=encode_compat_str(traceback.format_exc()))
+                else:
+                    with self._lock:
+                        pipeline.error = pipeline.error or err
+            finally:
+                self._thread_local.previous_post_processing = None
+                # Even if func failed before waiting, the next video must not be finished before the previous one
+                if previous:
+                    previous.wait()
+                done.set()
+                pipeline.slots.release()
+
+        pipeline.executor.submit(run)
+
+    def __wait_for_previous_post_processing(self):
+        """In a background thread, wait until the video downloaded before has been post-processed"""
+        previous = getattr(self._thread_local, 'previous_post_processing', None)
+        if previous:
+            previous.wait()
+
     @_handle_extraction_exceptions
     def __process_iterable_entry(self, entry, download, extra_info):
         return self.process_ie_result(
             entry, download=download, extra_info=extra_info)
 
-    def _build_format_filter(self, filter_spec):
+    @staticmethod
+    def _build_format_filter(filter_spec):
         " Returns a function to filter the formats according to the filter_spec "
 
         OPERATORS = {
@@ -2127,41 +2425,110 @@ def _build_format_filter(self, filter_spec):
         if not m:
             raise SyntaxError(f'Invalid filter specification {filter_spec!r}')
 
+        key, none_inclusive = m.group('key', 'none_inclusive')
+
         def _filter(f):
-            actual_value = f.get(m.group('key'))
+            actual_value = f.get(key)
             if actual_value is None:
-                return m.group('none_inclusive')
+                return none_inclusive
             return op(actual_value, comparison_value)
         return _filter
 
-    def _check_formats(self, formats):
-        for f in formats:
-            working = f.get('__working')
-            if working is not None:
-                if working:
-                    yield f
-                continue
-            self.to_screen('[info] Testing format {}'.format(f['format_id']))
+    def _cache_manifest(self, urls, content, final_url):
+        """Remember a manifest downloaded from any of the urls, for _get_cached_manifest"""
+        expires = time.monotonic() + self._MANIFEST_CACHE_TTL
+        with self._lock:
+            for url in urls:
+                self._manifests.pop(url, None)
+                self._manifests[url] = expires, content, final_url
+            size = sum(len(content) for _, content, _ in self._manifests.values())
+            while size > self._MANIFEST_CACHE_SIZE:
+                _, (_, content, _) = self._manifests.popitem(last=False)
+                size -= len(content)
+
+    def _get_cached_manifest(self, url):
+        """Return the final URL and the content of a recently downloaded manifest, or None"""
+        with self._lock:
+            expires, content, final_url = self._manifests.get(url) or (0, None, None)
+            if expires and expires < time.monotonic():
+                del self._manifests[url]
+                return None
+        return content and (final_url, content)
+
+    def _probe_format(self, f):
+        """Check whether the format can be downloaded by requesting only its first byte"""
+        headers = HTTPHeaderDict({'Accept-Encoding': 'identity'}, f.get('http_headers'), {'Range': 'bytes=0-0'})
+        try:
+            with self.urlopen(Request(f['url'], headers=headers)) as response:
+                response.read(1)
+        except network_exceptions as err:
+            self.write_debug(f'Format {f["format_id"]} is not available: {err}')
+            return False
+        return True
+
+    def _check_format(self, f):
+        url = f.get('url')
+        with self._lock:
+            working = self._format_checks.get(url)
+        if working is not None:
+            return working
+
+        self.to_screen('[info] Testing format {}'.format(f['format_id']))
+        if (f.get('protocol') in ('http', 'https') and url and not f.get('has_drm')
+                and not f.get('request_data') and not f.get('fragments')):
+            working = self._probe_format(f)
+        else:
             path = self.get_output_path('temp')
             if not self._ensure_dir_exists(f'{path}/'):
-                continue
+                return False
             temp_file = tempfile.NamedTemporaryFile(suffix='.tmp', delete=False, dir=path or None)
             temp_file.close()
             try:
-                success, _ = self.dl(temp_file.name, f, test=True)
+                working, _ = self.dl(temp_file.name, f, test=True)
             except (DownloadError, OSError, ValueError, *network_exceptions):
-                success = False
+                working = False
             finally:
                 if os.path.exists(temp_file.name):
                     try:
                         os.remove(temp_file.name)
                     except OSError:
                         self.report_warning(f'Unable to delete temporary file "{temp_file.name}"')
-            f['__working'] = success
-            if success:
-                yield f
-            else:
-                self.to_screen('[info] Unable to download format {}. Skipping...'.format(f['format_id']))
+        if url:
+            with self._lock:
+                self._format_checks[url] = working
+        return working
+
+    def _check_formats(self, formats):
+        """Yield the working formats, in order
+
+        Up to _FORMAT_CHECK_WORKERS formats are tested ahead of the one being yielded,
+        so that a lazy consumer stops testing once it has found the format it needs
+        """
+        formats = iter(formats)
+        pending = collections.deque()
+        with concurrent.futures.ThreadPoolExecutor(
+                self._FORMAT_CHECK_WORKERS, thread_name_prefix='yt-dlp-check') as pool:
+            try:
+                while True:
+                    while len(pending) < self._FORMAT_CHECK_WORKERS:
+                        f = next(formats, None)
+                        if f is None:
+                            break
+                        working = f.get('__working')
+                        pending.append((f, None if working is not None else pool.submit(self._check_format, f)))
+                    if not pending:
+                        return
+                    f, future = pending.popleft()
+                    if future is not None:
+                        f['__working'] = future.result()
+                        if not f['__working']:
+                            self.to_screen('[info] Unable to download format {}. Skipping...'.format(f['format_id']))
+                    if f['__working']:
+                        yield f
+            finally:
+                for _, future in pending:
+                    if future is not None:
+                        future.cancel()
 
     def _select_formats(self, formats, selector):
         return list(selector({
@@ -2196,21 +2563,22 @@ def can_merge():
                 else 'bestvideo+bestaudio/best' if compat
                 else 'bestvideo*+bestaudio/best')
 
-    def build_format_selector(self, format_spec):
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def compile_format_spec(format_spec):
+        """Parse a format spec into a CompiledFormatSpec
+
+        The result does not depend on the YoutubeDL instance, and can be passed to
+        build_format_selector or as the "format" parameter of any YoutubeDL instance
+        """
         def syntax_error(note, start):
             message = (
                 'Invalid format specification: '
                 '{}\n\t{}\n\t{}^'.format(note, format_spec, ' ' * start[1]))
             return SyntaxError(message)
 
-        PICKFIRST = 'PICKFIRST'
-        MERGE = 'MERGE'
-        SINGLE = 'SINGLE'
-        GROUP = 'GROUP'
-        FormatSelector = collections.namedtuple('FormatSelector', ['type', 'selector', 'filters'])
-
-        allow_multiple_streams = {'audio': self.params.get('allow_multiple_audio_streams', False),
-                                  'video': self.params.get('allow_multiple_video_streams', False)}
+        PICKFIRST, MERGE, SINGLE, GROUP = YoutubeDL._FORMAT_SELECTOR_TYPES
+        FormatSelector = YoutubeDL._FormatSelector
 
         def _parse_filter(tokens):
             filter_parts = []
@@ -2287,7 +2655,7 @@ def _parse_format_selection(tokens, inside_merge=False, inside_choice=False, ins
                         if not current_selector:
                             current_selector = FormatSelector(SINGLE, 'best', [])
                         format_filter = _parse_filter(tokens)
-                        current_selector.filters.append(format_filter)
+                        current_selector.filters.append(YoutubeDL._build_format_filter(format_filter))
                     elif string_ == '(':
                         if current_selector:
                             raise syntax_error('Unexpected "("', start)
@@ -2309,6 +2677,54 @@ def _parse_format_selection(tokens, inside_merge=False, inside_choice=False, ins
                 selectors.append(current_selector)
             return selectors
 
+        # HACK: Python 3.12 changed the underlying parser, rendering '7_a' invalid
+        #       Prefix numbers with random letters to avoid it being classified as a number
+        #       See: https://github.com/yt-dlp/yt-dlp/pulls/8797
+        # TODO: Implement parser not reliant on tokenize.tokenize
+        prefix = ''.join(random.choices(string.ascii_letters, k=32))
+        stream = io.BytesIO(re.sub(r'\d[_\d]*', rf'{prefix}\g<0>', format_spec).encode())
+        try:
+            tokens = list(_remove_unused_ops(
+                token._replace(string=token.string.replace(prefix, ''))
+                for token in tokenize.tokenize(stream.readline)))
+        except tokenize.TokenError:
+            raise syntax_error('Missing closing/opening brackets or parenthesis', (0, len(format_spec)))
+
+        class TokenIterator:
+            def __init__(self, tokens):
+                self.tokens = tokens
+                self.counter = 0
+
+            def __iter__(self):
+                return self
+
+            def __next__(self):
+                if self.counter >= len(self.tokens):
+                    raise StopIteration
+                value = self.tokens[self.counter]
+                self.counter += 1
+                return value
+
+            next = __next__
+
+            def restore_last_token(self):
+                self.counter -= 1
+
+        return YoutubeDL.CompiledFormatSpec(format_spec, _parse_format_selection(iter(TokenIterator(tokens))))
+
+    def build_format_selector(self, format_spec):
+        """Return a function selecting the formats to download, for the given format spec
+
+        @param format_spec  The format spec as a string, or a CompiledFormatSpec
+        """
+        if not isinstance(format_spec, YoutubeDL.CompiledFormatSpec):
+            format_spec = self.compile_format_spec(format_spec)
+
+        PICKFIRST, MERGE, SINGLE, GROUP = self._FORMAT_SELECTOR_TYPES
+
+        allow_multiple_streams = {'audio': self.params.get('allow_multiple_audio_streams', False),
+                                  'video': self.params.get('allow_multiple_video_streams', False)}
+
         def _merge(formats_pair):
             format_1, format_2 = formats_pair
 
@@ -2497,7 +2913,9 @@ def selector_function(ctx):
                         except LazyList.IndexError:
                             return
 
-            filters = [self._build_format_filter(f) for f in selector.filters]
+            filters = selector.filters
+            if not filters:
+                return selector_function
 
             def final_selector(ctx):
                 ctx_copy = dict(ctx)
@@ -2506,41 +2924,7 @@ def final_selector(ctx):
                 return selector_function(ctx_copy)
             return final_selector
 
-        # HACK: Python 3.12 changed the underlying parser, rendering '7_a' invalid
-        #       Prefix numbers with random letters to avoid it being classified as a number
-        #       See: https://github.com/yt-dlp/yt-dlp/pulls/8797
-        # TODO: Implement parser not reliant on tokenize.tokenize
-        prefix = ''.join(random.choices(string.ascii_letters, k=32))
-        stream = io.BytesIO(re.sub(r'\d[_\d]*', rf'{prefix}\g<0>', format_spec).encode())
-        try:
-            tokens = list(_remove_unused_ops(
-                token._replace(string=token.string.replace(prefix, ''))
-                for token in tokenize.tokenize(stream.readline)))
-        except tokenize.TokenError:
-            raise syntax_error('Missing closing/opening brackets or parenthesis', (0, len(format_spec)))
-
-        class TokenIterator:
-            def __init__(self, tokens):
-                self.tokens = tokens
-                self.counter = 0
-
-            def __iter__(self):
-                return self
-
-            def __next__(self):
-                if self.counter >= len(self.tokens):
-                    raise StopIteration
-                value = self.tokens[self.counter]
-                self.counter += 1
-                return value
-
-            next = __next__
-
-            def restore_last_token(self):
-                self.counter -= 1
-
-        parsed_selector = _parse_format_selection(iter(TokenIterator(tokens)))
-        return _build_selector_function(parsed_selector)
+        return _build_selector_function(format_spec.selectors)
 
     def _calc_headers(self, info_dict, load_cookies=False):
         res = HTTPHeaderDict(self.params['http_headers'], info_dict.get('http_headers'))
@@ -2697,7 +3081,9 @@ def sort_formats(self, info_dict):
 
     def process_video_result(self, info_dict, download=True):
         assert info_dict.get('_type', 'video') == 'video'
-        self._num_videos += 1
+        with self._lock:
+            self._num_videos += 1
+            info_dict['__num_videos'] = self._num_videos
 
         if 'id' not in info_dict:
             raise ExtractorError('Missing "id" field in extractor result', ie=info_dict['extractor'])
@@ -2972,44 +3358,70 @@ def to_screen(*msg):
                     to_screen(f'Downloading {len(requested_ranges)} time ranges:',
                               (f'{c["start_time"]:.1f}-{c["end_time"]:.1f}' for c in requested_ranges))
             max_downloads_reached = False
+            # In a post-processing pipeline, process_info leaves the post-processing to this list
+            post_processing = self._thread_local.post_processing = [] if self._post_processing else None
 
-            for fmt, chapter in itertools.product(formats_to_download, requested_ranges):
-                new_info = self._copy_infodict(info_dict)
-                new_info.update(fmt)
-                offset, duration = info_dict.get('section_start') or 0, info_dict.get('duration') or float('inf')
-                end_time = offset + min(chapter.get('end_time', duration), duration)
-                # duration may not be accurate. So allow deviations <1sec
-                if end_time == float('inf') or end_time > offset + duration + 1:
-                    end_time = None
-                if chapter or offset:
-                    new_info.update({
-                        'section_start': offset + chapter.get('start_time', 0),
-                        'section_end': end_time,
-                        'section_title': chapter.get('title'),
-                        'section_number': chapter.get('index'),
-                    })
-                downloaded_formats.append(new_info)
-                try:
-                    self.process_info(new_info)
-                except MaxDownloadsReached:
-                    max_downloads_reached = True
-                self._raise_pending_errors(new_info)
-                # Remove copied info
-                for key, val in tuple(new_info.items()):
-                    if info_dict.get(key) == val:
-                        new_info.pop(key)
-                if max_downloads_reached:
-                    break
-
-            write_archive = {f.get('__write_download_archive', False) for f in downloaded_formats}
-            assert write_archive.issubset({True, False, 'ignore'})
-            if True in write_archive and False not in write_archive:
-                self.record_download_archive(info_dict)
+            try:
+                for fmt, chapter in itertools.product(formats_to_download, requested_ranges):
+                    new_info = self._copy_infodict(info_dict)
+                    new_info.update(fmt)
+                    offset, duration = info_dict.get('section_start') or 0, info_dict.get('duration') or float('inf')
+                    end_time = offset + min(chapter.get('end_time', duration), duration)
+                    # duration may not be accurate. So allow deviations <1sec
+                    if end_time == float('inf') or end_time > offset + duration + 1:
+                        end_time = None
+                    if chapter or offset:
+                        new_info.update({
+                            'section_start': offset + chapter.get('start_time', 0),
+                            'section_end': end_time,
+                            'section_title': chapter.get('title'),
+                            'section_number': chapter.get('index'),
+                        })
+                    downloaded_formats.append(new_info)
+                    try:
+                        self.process_info(new_info)
+                    except MaxDownloadsReached:
+                        max_downloads_reached = True
+                    self._raise_pending_errors(new_info)
+                    if max_downloads_reached:
+                        break
+            finally:
+                self._thread_local.post_processing = None
 
-            info_dict['requested_downloads'] = downloaded_formats
-            info_dict = self.run_all_pps('after_video', info_dict)
+            def finish_processing():
+                for post_process in post_processing or ():
+                    post_process()
+                # Remove copied info
+                for new_info in downloaded_formats:
+                    for key, val in tuple(new_info.items()):
+                        if info_dict.get(key) == val:
+                            new_info.pop(key)
+
+                self.__wait_for_previous_post_processing()
+                write_archive = {f.get('__write_download_archive', False) for f in downloaded_formats}
+                assert write_archive.issubset({True, False, 'ignore'})
+                if True in write_archive and False not in write_archive:
+                    self.record_download_archive(info_dict)
+
+                info_dict['requested_downloads'] = downloaded_formats
+                return self.run_all_pps('after_video', info_dict)
+
+            if post_processing is None:
+                info_dict = finish_processing()
+            else:
+                # The info_dict must not be modified by this thread once it is handed over
+                def finish_processing_in_background():
+                    new_info = finish_processing()
+                    new_info.update(best_format)
+                    if new_info is not info_dict:
+                        info_dict.clear()
+                        info_dict.update(new_info)
+
+                self.__post_process_in_background(finish_processing_in_background)
             if max_downloads_reached:
                 raise MaxDownloadsReached
+            if post_processing is not None:
+                return info_dict
 
         # We update the info dict with the selected best quality format (backwards compatibility)
         info_dict.update(best_format)
@@ -3214,7 +3626,12 @@ def replace_info_dict(new_info):
 
         new_info, _ = self.pre_process(info_dict, 'video')
         replace_info_dict(new_info)
-        self._num_downloads += 1
+        with self._lock:
+            if self._num_downloads >= float(self.params.get('max_downloads') or 'inf'):
+                # Another entry that is processed concurrently has reached the limit
+                raise MaxDownloadsReached
+            self._num_downloads += 1
+            info_dict['__num_downloads'] = self._num_downloads
 
         # info_dict['_filename'] needs to be set for backward compatibility
         info_dict['_filename'] = full_filename = self.prepare_filename(info_dict, warn=True)
@@ -3533,18 +3950,30 @@ def ffmpeg_fixup(cndn, msg, cls):
                     ffmpeg_fixup(downloader == 'web_socket_fragment', 'Malformed duration detected', FFmpegFixupDurationPP)
 
                 fixup()
-                try:
-                    replace_info_dict(self.post_process(dl_filename, info_dict, files_to_move))
-                except PostProcessingError as err:
-                    self.report_error(f'Postprocessing: {err}')
+
+                def post_process():
+                    try:
+                        replace_info_dict(self.post_process(dl_filename, info_dict, files_to_move))
+                    except PostProcessingError as err:
+                        self.report_error(f'Postprocessing: {err}')
+                        return False
+                    try:
+                        for ph in self._post_hooks:
+                            ph(info_dict['filepath'])
+                    except Exception as err:
+                        self.report_error(f'post hooks: {err}')
+                        return False
+                    info_dict['__write_download_archive'] = True
+                    return True
+
+                # See process_video_result
+                post_processing = getattr(self._thread_local, 'post_processing', None)
+                if post_processing is not None:
+                    post_processing.append(post_process)
+                    check_max_downloads()
                     return
-                try:
-                    for ph in self._post_hooks:
-                        ph(info_dict['filepath'])
-                except Exception as err:
-                    self.report_error(f'post hooks: {err}')
+                elif not post_process():
                     return
-                info_dict['__write_download_archive'] = True
 
         assert info_dict is original_infodict  # Make sure the info_dict was modified in-place
         if self.params.get('force_write_download_archive'):
@@ -3579,9 +4008,11 @@ def download(self, url_list):
                 and self.params.get('max_downloads') != 1):
             raise SameFileError(outtmpl)
 
-        for url in url_list:
-            self.__download_wrapper(self.extract_info)(
-                url, force_generic_extractor=self.params.get('force_generic_extractor', False))
+        # The info of each URL is printed when it has been processed
+        with contextlib.nullcontext() if self.params.get('dump_single_json') else self._post_processing_pipeline():
+            for url in url_list:
+                self.__download_wrapper(self.extract_info)(
+                    url, force_generic_extractor=self.params.get('force_generic_extractor', False))
 
         return self._download_retcode
 
@@ -3633,7 +4064,7 @@ def sanitize_info(info_dict, remove_private_keys=False):
         def filter_fn(obj):
             if isinstance(obj, dict):
                 return {k: filter_fn(v) for k, v in obj.items() if not reject(k, v)}
-            elif isinstance(obj, (list, tuple, set, LazyList)):
+            elif isinstance(obj, (list, tuple, set, LazyList, FragmentSequence)):
                 return list(map(filter_fn, obj))
             elif obj is None or isinstance(obj, (str, int, float, bool)):
                 return obj
@@ -3717,6 +4148,7 @@ def post_process(self, filename, info, files_to_move=None):
         info['filepath'] = filename
         info['__files_to_move'] = files_to_move or {}
         info = self.run_all_pps('post_process', info, additional_pps=info.get('__postprocessors'))
+        self.__wait_for_previous_post_processing()
         info = self.run_pp(MoveFilesAfterDownloadPP(self), info)
         del info['__files_to_move']
         return self.run_all_pps('after_move', info)
@@ -3733,7 +4165,7 @@ def _make_archive_id(self, info_dict):
             if not url:
                 return
             # Try to find matching extractor for the URL and take its ie_key
-            for ie_key, ie in self._ies.items():
+            for ie_key, ie in self._get_candidate_ies(url):
                 if ie.suitable(url):
                     extractor = ie_key
                     break
@@ -3749,6 +4181,21 @@ def in_download_archive(self, info_dict):
         vid_ids.extend(info_dict.get('_old_archive_ids') or [])
         return any(id_ in self.archive for id_ in vid_ids)
 
+    def _in_download_archive_bulk(self, info_dicts):
+        """Same as in_download_archive for each of info_dicts, but with a single lookup in the archive"""
+        if not self.archive:
+            return [False] * len(info_dicts)
+
+        vid_ids = [
+            [self._make_archive_id(info_dict), *(info_dict.get('_old_archive_ids') or [])]
+            for info_dict in info_dicts]
+        all_ids = {id_ for ids in vid_ids for id_ in ids if id_}
+        if isinstance(self.archive, DownloadArchive):
+            found = self.archive.intersection(all_ids)
+        else:
+            found = {id_ for id_ in all_ids if id_ in self.archive}
+        return [any(id_ in found for id_ in ids) for ids in vid_ids]
+
     def record_download_archive(self, info_dict):
         fn = self.params.get('download_archive')
         if fn is None:
@@ -3757,10 +4204,8 @@ def record_download_archive(self, info_dict):
         assert vid_id
 
         self.write_debug(f'Adding to archive: {vid_id}')
-        if is_path_like(fn):
-            with locked_file(fn, 'a', encoding='utf-8') as archive_file:
-                archive_file.write(vid_id + '\n')
-        self.archive.add(vid_id)
+        with self._lock:
+            self.archive.add(vid_id)
 
     @staticmethod
     def format_resolution(format, default='unknown'):
@@ -4259,6 +4704,21 @@ def _write_info_json(self, label, ie_result, infofn, overwrite=None):
             self.report_error(f'Cannot write {label} metadata to JSON file {infofn}')
             return None
 
+    def _write_info_jsonl(self, label, ie_result, infofn):
+        """ Append ie_result as a line of the JSON Lines file infofn, or truncate it if ie_result is None.
+            Returns True = written, None = error """
+        if ie_result is None:
+            self.to_screen(f'[info] Writing {label} metadata as JSON Lines to: {infofn}')
+        try:
+            with open(infofn, 'w' if ie_result is None else 'a', encoding='utf-8') as f:
+                if ie_result is not None:
+                    json.dump(self.sanitize_info(ie_result, self.params.get('clean_infojson', True)), f, ensure_ascii=False)
+                    f.write('\n')
+            return True
+        except OSError:
+            self.report_error(f'Cannot write {label} metadata to JSON Lines file {infofn}')
+            return None
+
     def _write_description(self, label, ie_result, descfn):
         """ Write description and returns True = written, False = skip, None = error """
         if not self.params.get('writedescription'):
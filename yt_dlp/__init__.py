@@ -204,6 +204,9 @@ def validate_minmax(min_val, max_val, min_name, max_name=None):
     validate_positive('autonumber start', opts.autonumber_start)
     validate_positive('autonumber size', opts.autonumber_size, True)
     validate_positive('concurrent fragments', opts.concurrent_fragment_downloads, True)
+    validate_positive('concurrent entries', opts.concurrent_entries, True)
+    validate_positive('concurrent postprocessing', opts.concurrent_postprocessing)
+    validate_positive('HTTP connections', opts.http_connections, True)
     validate_positive('playlist start', opts.playliststart, True)
     if opts.playlistend != -1:
         validate_minmax(opts.playliststart, opts.playlistend, 'playlist start', 'playlist end')
@@ -298,6 +301,7 @@ def validate_bytes(name, value):
     opts.max_filesize = validate_bytes('max filesize', opts.max_filesize)
     opts.buffersize = validate_bytes('buffer size', opts.buffersize)
     opts.http_chunk_size = validate_bytes('http chunk size', opts.http_chunk_size)
+    opts.fragment_buffer_size = validate_bytes('fragment buffer size', opts.fragment_buffer_size)
 
     # Output templates
     def validate_outtmpl(tmpl, msg):
@@ -511,8 +515,8 @@ def report_conflict(arg1, opt1, arg2='--allow-unplayable-formats', opt2='allow_u
 
     # Conflicting options
     report_conflict('--playlist-reverse', 'playlist_reverse', '--playlist-random', 'playlist_random')
-    report_conflict('--playlist-reverse', 'playlist_reverse', '--lazy-playlist', 'lazy_playlist')
-    report_conflict('--playlist-random', 'playlist_random', '--lazy-playlist', 'lazy_playlist')
+    report_conflict('--playlist-reverse', 'playlist_reverse', '--lazy-playlist', 'lazy_playlist', val2=opts.lazy_playlist is True)
+    report_conflict('--playlist-random', 'playlist_random', '--lazy-playlist', 'lazy_playlist', val2=opts.lazy_playlist is True)
     report_conflict('--dateafter', 'dateafter', '--date', 'date', default=None)
     report_conflict('--datebefore', 'datebefore', '--date', 'date', default=None)
     report_conflict('--exec-before-download', 'exec_before_dl_cmd',
@@ -830,9 +834,11 @@ def parse_options(argv=None):
         'skip_unavailable_fragments': opts.skip_unavailable_fragments,
         'keep_fragments': opts.keep_fragments,
         'concurrent_fragment_downloads': opts.concurrent_fragment_downloads,
+        'fragment_buffer_size': opts.fragment_buffer_size,
         'buffersize': opts.buffersize,
         'noresizebuffer': opts.noresizebuffer,
         'http_chunk_size': opts.http_chunk_size,
+        'http_connections': opts.http_connections,
         'continuedl': opts.continue_dl,
         'noprogress': opts.quiet if opts.noprogress is None else opts.noprogress,
         'progress_with_newline': opts.progress_with_newline,
@@ -843,6 +849,8 @@ def parse_options(argv=None):
         'playlistreverse': opts.playlist_reverse,
         'playlistrandom': opts.playlist_random,
         'lazy_playlist': opts.lazy_playlist,
+        'concurrent_entries': opts.concurrent_entries,
+        'concurrent_postprocessing': opts.concurrent_postprocessing,
         'noplaylist': opts.noplaylist,
         'logtostderr': opts.outtmpl.get('default') == '-',
         'consoletitle': opts.consoletitle,
@@ -937,6 +945,7 @@ def parse_options(argv=None):
         'hls_use_mpegts': opts.hls_use_mpegts,
         'hls_split_discontinuity': opts.hls_split_discontinuity,
         'external_downloader_args': opts.external_downloader_args,
+        'aria2c_rpc': opts.aria2c_rpc,
         'postprocessor_args': opts.postprocessor_args,
         'cn_verification_proxy': opts.cn_verification_proxy,
         'geo_verification_proxy': opts.geo_verification_proxy,
@@ -1,6 +1,8 @@
 import base64
+import struct
 from math import ceil
 
+from .compat import functools  # isort: split
 from .compat import compat_ord
 from .dependencies import Cryptodome
 from .utils import bytes_to_intlist, intlist_to_bytes
@@ -17,11 +19,11 @@ def aes_gcm_decrypt_and_verify_bytes(data, key, tag, nonce):
 else:
     def aes_cbc_decrypt_bytes(data, key, iv):
         """ Decrypt bytes with AES-CBC using native implementation since pycryptodome is unavailable """
-        return intlist_to_bytes(aes_cbc_decrypt(*map(bytes_to_intlist, (data, key, iv))))
+        return _ttable_cbc_decrypt(data, key, iv)
 
     def aes_gcm_decrypt_and_verify_bytes(data, key, tag, nonce):
         """ Decrypt bytes with AES-GCM using native implementation since pycryptodome is unavailable """
-        return intlist_to_bytes(aes_gcm_decrypt_and_verify(*map(bytes_to_intlist, (data, key, tag, nonce))))
+        return _ttable_gcm_decrypt_and_verify(data, key, tag, nonce)
 
 
 def aes_cbc_encrypt_bytes(data, key, iv, **kwargs):
@@ -230,11 +232,10 @@ def aes_gcm_decrypt_and_verify(data, key, tag, nonce):
     iv_ctr = inc(j0)
 
     decrypted_data = aes_ctr_decrypt(data, key, iv_ctr + [0] * (BLOCK_SIZE_BYTES - len(iv_ctr)))
-    pad_len = len(data) // 16 * 16
     s_tag = ghash(
         hash_subkey,
         data
-        + [0] * (BLOCK_SIZE_BYTES - len(data) + pad_len)        # pad
+        + [0] * (-len(data) % BLOCK_SIZE_BYTES)                 # pad
         + bytes_to_intlist((0 * 8).to_bytes(8, 'big')           # length of associated data
                            + ((len(data) * 8).to_bytes(8, 'big'))),  # length of data
     )
@@ -532,6 +533,200 @@ def ghash(subkey, data):
     return last_y
 
 
+# Table-driven implementation on 32-bit words, used for bytes when pycryptodome is unavailable.
+# A block is held as four big-endian words, one per column of the state,
+# and each round is a few table lookups per word (see "The Design of Rijndael", 4.2)
+
+def _gf_mul(a, b):
+    if a == 0 or b == 0:
+        return 0
+    return RIJNDAEL_EXP_TABLE[(RIJNDAEL_LOG_TABLE[a] + RIJNDAEL_LOG_TABLE[b]) % 0xFF]
+
+
+def _rotate_tables(table):
+    tables = [table]
+    for _ in range(3):
+        tables.append([(word >> 8) | ((word & 0xFF) << 24) for word in tables[-1]])
+    return tables
+
+
+@functools.cache
+def _t_tables():
+    """
+    Return the encryption and decryption tables, which combine SubBytes, ShiftRows and MixColumns,
+    and the (inverse) S-box shifted into each byte of a word for the last round
+    """
+    encryption = _rotate_tables([
+        _gf_mul(x, 2) << 24 | x << 16 | x << 8 | _gf_mul(x, 3) for x in SBOX])
+    decryption = _rotate_tables([
+        _gf_mul(x, 14) << 24 | _gf_mul(x, 9) << 16 | _gf_mul(x, 13) << 8 | _gf_mul(x, 11) for x in SBOX_INV])
+    last_round = [[x << shift for x in SBOX] for shift in (24, 16, 8, 0)]
+    last_round_inv = [[x << shift for x in SBOX_INV] for shift in (24, 16, 8, 0)]
+    return encryption, decryption, last_round, last_round_inv
+
+
+def _to_words(data):
+    return struct.unpack(f'>{len(data) // 4}I', data)
+
+
+def _from_words(words):
+    return struct.pack(f'>{len(words)}I', *words)
+
+
+def _xor_bytes(data1, data2):
+    return (int.from_bytes(data1, 'big') ^ int.from_bytes(data2, 'big')).to_bytes(len(data1), 'big')
+
+
+@functools.lru_cache(maxsize=16)
+def _round_keys(key):
+    """
+    Return the round keys for encryption and decryption as words
+
+    The decryption keys are for the equivalent inverse cipher (FIPS-197, 5.3.5),
+    i.e. in reverse order and with InvMixColumns applied to the ones of the inner rounds
+    """
+    encryption_keys = _to_words(bytes(key_expansion(list(key))))
+    rounds = len(encryption_keys) // 4 - 1
+    td0, td1, td2, td3 = _t_tables()[1]
+    decryption_keys = list(encryption_keys[rounds * 4:])
+    for i in range(rounds - 1, 0, -1):
+        decryption_keys.extend(
+            td0[SBOX[w >> 24]] ^ td1[SBOX[w >> 16 & 0xFF]] ^ td2[SBOX[w >> 8 & 0xFF]] ^ td3[SBOX[w & 0xFF]]
+            for w in encryption_keys[i * 4: i * 4 + 4])
+    decryption_keys.extend(encryption_keys[:4])
+    return encryption_keys, tuple(decryption_keys)
+
+
+def _ttable_encrypt_words(words, round_keys):
+    """Encrypt consecutive blocks given as words"""
+    (te0, te1, te2, te3), _, (s0_, s1_, s2_, s3_), _ = _t_tables()
+    last = len(round_keys) - 4
+    encrypted = []
+    for i in range(0, len(words), 4):
+        s0, s1, s2, s3 = (words[i] ^ round_keys[0], words[i + 1] ^ round_keys[1],
+                          words[i + 2] ^ round_keys[2], words[i + 3] ^ round_keys[3])
+        for k in range(4, last, 4):
+            s0, s1, s2, s3 = (
+                te0[s0 >> 24] ^ te1[s1 >> 16 & 0xFF] ^ te2[s2 >> 8 & 0xFF] ^ te3[s3 & 0xFF] ^ round_keys[k],
+                te0[s1 >> 24] ^ te1[s2 >> 16 & 0xFF] ^ te2[s3 >> 8 & 0xFF] ^ te3[s0 & 0xFF] ^ round_keys[k + 1],
+                te0[s2 >> 24] ^ te1[s3 >> 16 & 0xFF] ^ te2[s0 >> 8 & 0xFF] ^ te3[s1 & 0xFF] ^ round_keys[k + 2],
+                te0[s3 >> 24] ^ te1[s0 >> 16 & 0xFF] ^ te2[s1 >> 8 & 0xFF] ^ te3[s2 & 0xFF] ^ round_keys[k + 3])
+        encrypted.extend((
+            s0_[s0 >> 24] ^ s1_[s1 >> 16 & 0xFF] ^ s2_[s2 >> 8 & 0xFF] ^ s3_[s3 & 0xFF] ^ round_keys[last],
+            s0_[s1 >> 24] ^ s1_[s2 >> 16 & 0xFF] ^ s2_[s3 >> 8 & 0xFF] ^ s3_[s0 & 0xFF] ^ round_keys[last + 1],
+            s0_[s2 >> 24] ^ s1_[s3 >> 16 & 0xFF] ^ s2_[s0 >> 8 & 0xFF] ^ s3_[s1 & 0xFF] ^ round_keys[last + 2],
+            s0_[s3 >> 24] ^ s1_[s0 >> 16 & 0xFF] ^ s2_[s1 >> 8 & 0xFF] ^ s3_[s2 & 0xFF] ^ round_keys[last + 3]))
+    return encrypted
+
+
+def _ttable_decrypt_words(words, round_keys):
+    """Decrypt consecutive blocks given as words"""
+    _, (td0, td1, td2, td3), _, (s0_, s1_, s2_, s3_) = _t_tables()
+    last = len(round_keys) - 4
+    decrypted = []
+    for i in range(0, len(words), 4):
+        s0, s1, s2, s3 = (words[i] ^ round_keys[0], words[i + 1] ^ round_keys[1],
+                          words[i + 2] ^ round_keys[2], words[i + 3] ^ round_keys[3])
+        for k in range(4, last, 4):
+            s0, s1, s2, s3 = (
+                td0[s0 >> 24] ^ td1[s3 >> 16 & 0xFF] ^ td2[s2 >> 8 & 0xFF] ^ td3[s1 & 0xFF] ^ round_keys[k],
+                td0[s1 >> 24] ^ td1[s0 >> 16 & 0xFF] ^ td2[s3 >> 8 & 0xFF] ^ td3[s2 & 0xFF] ^ round_keys[k + 1],
+                td0[s2 >> 24] ^ td1[s1 >> 16 & 0xFF] ^ td2[s0 >> 8 & 0xFF] ^ td3[s3 & 0xFF] ^ round_keys[k + 2],
+                td0[s3 >> 24] ^ td1[s2 >> 16 & 0xFF] ^ td2[s1 >> 8 & 0xFF] ^ td3[s0 & 0xFF] ^ round_keys[k + 3])
+        decrypted.extend((
+            s0_[s0 >> 24] ^ s1_[s3 >> 16 & 0xFF] ^ s2_[s2 >> 8 & 0xFF] ^ s3_[s1 & 0xFF] ^ round_keys[last],
+            s0_[s1 >> 24] ^ s1_[s0 >> 16 & 0xFF] ^ s2_[s3 >> 8 & 0xFF] ^ s3_[s2 & 0xFF] ^ round_keys[last + 1],
+            s0_[s2 >> 24] ^ s1_[s1 >> 16 & 0xFF] ^ s2_[s0 >> 8 & 0xFF] ^ s3_[s3 & 0xFF] ^ round_keys[last + 2],
+            s0_[s3 >> 24] ^ s1_[s2 >> 16 & 0xFF] ^ s2_[s1 >> 8 & 0xFF] ^ s3_[s0 & 0xFF] ^ round_keys[last + 3]))
+    return decrypted
+
+
+def _ttable_cbc_decrypt(data, key, iv):
+    """Same as aes_cbc_decrypt, but for bytes"""
+    data, key, iv = bytes(data), bytes(key), bytes(iv)
+    padded = data + bytes(-len(data) % BLOCK_SIZE_BYTES)
+    decrypted = _from_words(_ttable_decrypt_words(_to_words(padded), _round_keys(key)[1]))
+    # Each decrypted block is xored with the previous cipher block
+    return _xor_bytes(decrypted[:len(data)], (iv + data)[:len(data)])
+
+
+def _ttable_ctr_encrypt(data, key, iv):
+    """Same as aes_ctr_encrypt, but for bytes"""
+    data, key = bytes(data), bytes(key)
+    counter = int.from_bytes(iv, 'big')
+    counter_blocks = b''.join(
+        ((counter + i) % (1 << 128)).to_bytes(BLOCK_SIZE_BYTES, 'big')
+        for i in range(ceil(len(data) / BLOCK_SIZE_BYTES)))
+    keystream = _from_words(_ttable_encrypt_words(_to_words(counter_blocks), _round_keys(key)[0]))
+    return _xor_bytes(data, keystream[:len(data)])
+
+
+def _ghash_tables(subkey):
+    """
+    Tables for multiplying by the hash subkey one byte at a time
+
+    The product is the xor of table[i][x_i] over the bytes x_i of the other factor
+    (NIST SP 800-38D, 6.3: GF(2^128) multiplication is linear over the bits)
+    """
+    subkey = int.from_bytes(subkey, 'big')
+    powers = []  # The products with the bits of a factor, from the most significant one
+    for _ in range(128):
+        powers.append(subkey)
+        subkey = (subkey >> 1) ^ (0xE1 << 120 if subkey & 1 else 0)
+
+    tables = []
+    for i in range(BLOCK_SIZE_BYTES):
+        table = [0] * 256
+        for bit in range(8):
+            table[1 << bit] = powers[i * 8 + 7 - bit]
+        for x in range(3, 256):
+            lowest_bit = x & -x
+            if x != lowest_bit:
+                table[x] = table[lowest_bit] ^ table[x ^ lowest_bit]
+        tables.append(table)
+    return tables
+
+
+def _ttable_ghash(tables, data):
+    """Same as ghash, but for bytes and using _ghash_tables"""
+    if len(data) % BLOCK_SIZE_BYTES:
+        raise ValueError(f'Length of data should be {BLOCK_SIZE_BYTES} bytes')
+
+    last_y = 0
+    for i in range(0, len(data), BLOCK_SIZE_BYTES):
+        block = (last_y ^ int.from_bytes(data[i: i + BLOCK_SIZE_BYTES], 'big')).to_bytes(BLOCK_SIZE_BYTES, 'big')
+        last_y = 0
+        for table, x in zip(tables, block):
+            last_y ^= table[x]
+    return last_y.to_bytes(BLOCK_SIZE_BYTES, 'big')
+
+
+def _ttable_gcm_decrypt_and_verify(data, key, tag, nonce):
+    """Same as aes_gcm_decrypt_and_verify, but for bytes"""
+    data, key, tag, nonce = bytes(data), bytes(key), bytes(tag), bytes(nonce)
+    hash_tables = _ghash_tables(_from_words(_ttable_encrypt_words((0, 0, 0, 0), _round_keys(key)[0])))
+
+    if len(nonce) == 12:
+        j0 = nonce + b'\x00\x00\x00\x01'
+    else:
+        j0 = _ttable_ghash(hash_tables, (
+            nonce + bytes(-len(nonce) % BLOCK_SIZE_BYTES) + (8 * len(nonce)).to_bytes(BLOCK_SIZE_BYTES, 'big')))
+
+    iv_ctr = ((int.from_bytes(j0, 'big') + 1) % (1 << 128)).to_bytes(BLOCK_SIZE_BYTES, 'big')
+    decrypted_data = _ttable_ctr_encrypt(data, key, iv_ctr)
+    s_tag = _ttable_ghash(
+        hash_tables,
+        data
+        + bytes(-len(data) % BLOCK_SIZE_BYTES)          # pad
+        + (0 * 8).to_bytes(8, 'big')                    # length of associated data
+        + (len(data) * 8).to_bytes(8, 'big'))           # length of data
+
+    if tag != _ttable_ctr_encrypt(s_tag, key, j0):
+        raise ValueError('Mismatching authentication tag')
+
+    return decrypted_data
+
+
 __all__ = [
     'aes_cbc_decrypt',
     'aes_cbc_decrypt_bytes',
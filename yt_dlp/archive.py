@@ -0,0 +1,178 @@
+import errno
+import os
+import threading
+
+from .dependencies import sqlite3
+from .utils import locked_file
+
+SQLITE_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+_SQLITE_MAGIC = b'SQLite format 3\x00'
+
+
+class DownloadArchive:
+    """
+    Base class for download archive backends
+
+    An archive behaves like a set of archive IDs (see make_archive_id).
+    Adding an ID records it in the backing storage
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+
+    def __contains__(self, vid_id):
+        raise NotImplementedError('This method must be implemented by subclasses')
+
+    def __iter__(self):
+        raise NotImplementedError('This method must be implemented by subclasses')
+
+    def add(self, vid_id):
+        raise NotImplementedError('This method must be implemented by subclasses')
+
+    def update(self, vid_ids):
+        for vid_id in vid_ids:
+            self.add(vid_id)
+
+    def intersection(self, vid_ids):
+        """Return the set of vid_ids that are in the archive"""
+        return {vid_id for vid_id in vid_ids if vid_id in self}
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class TextDownloadArchive(DownloadArchive):
+    """An archive stored as a text file with one ID per line. The whole file is read into memory"""
+
+    def __init__(self, filename):
+        super().__init__(filename)
+        self._ids = set()
+        try:
+            with locked_file(filename, 'r', encoding='utf-8') as archive_file:
+                for line in archive_file:
+                    self._ids.add(line.strip())
+        except OSError as ioe:
+            if ioe.errno != errno.ENOENT:
+                raise
+
+    def __contains__(self, vid_id):
+        return vid_id in self._ids
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def intersection(self, vid_ids):
+        return self._ids.intersection(vid_ids)
+
+    def add(self, vid_id):
+        with locked_file(self.filename, 'a', encoding='utf-8') as archive_file:
+            archive_file.write(vid_id + '\n')
+        self._ids.add(vid_id)
+
+    def update(self, vid_ids):
+        vid_ids = [vid_id for vid_id in vid_ids if vid_id not in self._ids]
+        with locked_file(self.filename, 'a', encoding='utf-8') as archive_file:
+            archive_file.writelines(f'{vid_id}\n' for vid_id in vid_ids)
+        self._ids.update(vid_ids)
+
+
+class SQLiteDownloadArchive(DownloadArchive):
+    """
+    An archive stored in an indexed SQLite database
+
+    Membership is looked up on demand, so opening the archive does not depend on its size.
+    Every add is committed at once, like a line of a text archive, so that no recorded
+    download is lost if the process is killed; this costs a transaction per added ID,
+    which is negligible next to a download. update adds its IDs in a single transaction
+    """
+
+    # Maximum number of IDs that are looked up with a single query
+    _QUERY_SIZE = 500
+
+    def __init__(self, filename):
+        if not sqlite3:
+            raise ImportError(
+                'Cannot use an SQLite download archive without sqlite3 support. '
+                'Please use a Python interpreter compiled with sqlite3 support')
+        super().__init__(filename)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._connect()
+
+    def _connect(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.filename, timeout=30, check_same_thread=False)
+            with self._conn:
+                self._conn.execute('CREATE TABLE IF NOT EXISTS archive (id TEXT PRIMARY KEY) WITHOUT ROWID')
+        return self._conn
+
+    def __contains__(self, vid_id):
+        with self._lock:
+            return self._connect().execute('SELECT 1 FROM archive WHERE id = ?', (vid_id,)).fetchone() is not None
+
+    def intersection(self, vid_ids):
+        vid_ids = list(set(vid_ids))
+        found = set()
+        with self._lock:
+            conn = self._connect()
+            for start in range(0, len(vid_ids), self._QUERY_SIZE):
+                chunk = vid_ids[start:start + self._QUERY_SIZE]
+                found.update(vid_id for vid_id, in conn.execute(
+                    f'SELECT id FROM archive WHERE id IN ({", ".join("?" * len(chunk))})', chunk))
+        return found
+
+    def __iter__(self):
+        with self._lock:
+            rows = self._connect().execute('SELECT id FROM archive ORDER BY id').fetchall()
+        return (vid_id for vid_id, in rows)
+
+    def __bool__(self):
+        with self._lock:
+            return self._connect().execute('SELECT 1 FROM archive LIMIT 1').fetchone() is not None
+
+    def add(self, vid_id):
+        self.update((vid_id,))
+
+    def update(self, vid_ids):
+        with self._lock, self._connect() as conn:
+            conn.executemany('INSERT OR IGNORE INTO archive (id) VALUES (?)', ((vid_id,) for vid_id in vid_ids))
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def _is_sqlite_file(filename):
+    try:
+        with open(filename, 'rb') as f:
+            return f.read(len(_SQLITE_MAGIC)) == _SQLITE_MAGIC
+    except OSError:
+        return False
+
+
+def open_download_archive(filename):
+    """
+    Open the download archive at the given path
+
+    Files with an SQLite header or one of SQLITE_EXTENSIONS use the indexed SQLite backend,
+    and anything else is treated as a text archive
+    """
+    if os.path.isfile(filename) and os.path.getsize(filename):
+        is_sqlite = _is_sqlite_file(filename)
+    else:
+        is_sqlite = os.path.splitext(filename)[1].lower() in SQLITE_EXTENSIONS
+    return (SQLiteDownloadArchive if is_sqlite else TextDownloadArchive)(filename)
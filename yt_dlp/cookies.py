@@ -3,6 +3,8 @@
 import contextlib
 import datetime as dt
 import glob
+import hashlib
+import hmac
 import http.cookiejar
 import http.cookies
 import io
@@ -89,9 +91,10 @@ def _create_progress_bar(logger):
 def load_cookies(cookie_file, browser_specification, ydl):
     cookie_jars = []
     if browser_specification is not None:
-        browser_name, profile, keyring, container = _parse_browser_specification(*browser_specification)
-        cookie_jars.append(
-            extract_cookies_from_browser(browser_name, profile, YDLLogger(ydl), keyring=keyring, container=container))
+        browser_name, profile, keyring, container, domains = _parse_browser_specification(*browser_specification)
+        cookie_jars.append(extract_cookies_from_browser(
+            browser_name, profile, YDLLogger(ydl), keyring=keyring, container=container,
+            domains=domains, cache=ydl.cache))
 
     if cookie_file is not None:
         is_filename = is_path_like(cookie_file)
@@ -106,16 +109,31 @@ def load_cookies(cookie_file, browser_specification, ydl):
     return _merge_cookie_jars(cookie_jars)
 
 
-def extract_cookies_from_browser(browser_name, profile=None, logger=YDLLogger(), *, keyring=None, container=None):
+def extract_cookies_from_browser(browser_name, profile=None, logger=YDLLogger(), *, keyring=None, container=None,
+                                 domains=None, cache=None):
+    """
+    @param domains  Only extract the cookies of these domains (and their subdomains)
+    @param cache    A yt_dlp.cache.Cache in which the decrypted cookies of Chromium-based browsers can be kept
+    """
     if browser_name == 'firefox':
-        return _extract_firefox_cookies(profile, container, logger)
+        jar = _extract_firefox_cookies(profile, container, logger)
     elif browser_name == 'safari':
-        return _extract_safari_cookies(profile, logger)
+        jar = _extract_safari_cookies(profile, logger)
     elif browser_name in CHROMIUM_BASED_BROWSERS:
-        return _extract_chrome_cookies(browser_name, profile, keyring, logger)
+        return _extract_chrome_cookies(browser_name, profile, keyring, logger, domains=domains, cache=cache)
     else:
         raise ValueError(f'unknown browser: {browser_name}')
 
+    if domains:
+        for cookie in list(jar):
+            if not _is_cookie_of_domains(cookie.domain, domains):
+                jar.clear(cookie.domain, cookie.path, cookie.name)
+    return jar
+
+
+def _is_cookie_of_domains(host, domains):
+    return any(host == domain or host.endswith(f'.{domain}') for domain in domains)
+
 
 def _extract_firefox_cookies(profile, container, logger):
     logger.info('Extracting cookies from firefox')
@@ -267,7 +285,7 @@ def _get_chromium_based_browser_settings(browser_name):
     }
 
 
-def _extract_chrome_cookies(browser_name, profile, keyring, logger):
+def _extract_chrome_cookies(browser_name, profile, keyring, logger, *, domains=None, cache=None):
     logger.info(f'Extracting cookies from {browser_name}')
 
     if not sqlite3:
@@ -295,6 +313,14 @@ def _extract_chrome_cookies(browser_name, profile, keyring, logger):
     logger.debug(f'Extracting cookies from: "{cookie_database_path}"')
 
     decryptor = get_cookie_decryptor(config['browser_dir'], config['keyring_name'], logger, keyring=keyring)
+    cookie_cache = cache and _ChromeCookieCache(cache, browser_name, cookie_database_path, decryptor, logger)
+    if cookie_cache and cookie_cache.cookies is not None:
+        jar = YoutubeDLCookieJar()
+        for host_key, *cookie_fields in cookie_cache.cookies:
+            if not domains or _is_cookie_of_domains(host_key, domains):
+                jar.set_cookie(_make_chrome_cookie(host_key, *cookie_fields))
+        logger.info(f'Extracted {len(jar)} cookies from {browser_name} (cached)')
+        return jar
 
     with tempfile.TemporaryDirectory(prefix='yt_dlp') as tmpdir:
         cursor = None
@@ -303,7 +329,14 @@ def _extract_chrome_cookies(browser_name, profile, keyring, logger):
             cursor.connection.text_factory = bytes
             column_names = _get_column_names(cursor, 'cookies')
             secure_column = 'is_secure' if 'is_secure' in column_names else 'secure'
-            cursor.execute(f'SELECT host_key, name, value, encrypted_value, path, expires_utc, {secure_column} FROM cookies')
+            query = f'SELECT host_key, name, value, encrypted_value, path, expires_utc, {secure_column} FROM cookies'
+            if domains:
+                logger.debug(f'Only loading cookies of {", ".join(domains)}')
+                query += ' WHERE ' + ' OR '.join(["host_key = ? OR host_key LIKE ? ESCAPE '\\'"] * len(domains))
+                cursor.execute(query, [param for domain in domains for param in (
+                    domain, '%.' + re.sub(r'([\\%_])', r'\\\1', domain))])
+            else:
+                cursor.execute(query)
             jar = YoutubeDLCookieJar()
             failed_cookies = 0
             unencrypted_cookies = 0
@@ -312,7 +345,7 @@ def _extract_chrome_cookies(browser_name, profile, keyring, logger):
                 total_cookie_count = len(table)
                 for i, line in enumerate(table):
                     progress_bar.print(f'Loading cookie {i: 6d}/{total_cookie_count: 6d}')
-                    is_encrypted, cookie = _process_chrome_cookie(decryptor, *line)
+                    is_encrypted, cookie = _process_chrome_cookie(cookie_cache or decryptor, *line)
                     if not cookie:
                         failed_cookies += 1
                         continue
@@ -326,7 +359,11 @@ def _extract_chrome_cookies(browser_name, profile, keyring, logger):
             logger.info(f'Extracted {len(jar)} cookies from {browser_name}{failed_message}')
             counts = decryptor._cookie_counts.copy()
             counts['unencrypted'] = unencrypted_cookies
+            if cookie_cache:
+                counts['cached'] = cookie_cache.hits
             logger.debug(f'cookie version breakdown: {counts}')
+            if cookie_cache and not domains:
+                cookie_cache.store(jar)
             return jar
         except PermissionError as error:
             if compat_os_name == 'nt' and error.errno == 13:
@@ -356,13 +393,100 @@ def _process_chrome_cookie(decryptor, host_key, name, value, encrypted_value, pa
     if not expires_utc:
         expires_utc = None
 
-    return is_encrypted, http.cookiejar.Cookie(
+    return is_encrypted, _make_chrome_cookie(host_key, name, value, path, expires_utc, is_secure)
+
+
+def _make_chrome_cookie(host_key, name, value, path, expires_utc, is_secure):
+    return http.cookiejar.Cookie(
         version=0, name=name, value=value, port=None, port_specified=False,
         domain=host_key, domain_specified=bool(host_key), domain_initial_dot=host_key.startswith('.'),
         path=path, path_specified=bool(path), secure=is_secure, expires=expires_utc, discard=False,
         comment=None, comment_url=None, rest={})
 
 
+class _ChromeCookieCache:
+    """
+    The decrypted cookies of a Chromium-based browser, kept in the yt-dlp cache
+
+    If the cookie database has not changed (same mtime and size), the cookies are loaded
+    from the cache without copying and decrypting the database. Otherwise, only the values
+    that have changed since the last extraction are decrypted.
+
+    The cache is encrypted and authenticated with keys derived from the key with which the
+    browser encrypts its cookies, so it is not any less protected than the database itself.
+    Nothing is cached if that key is not protected by the OS (e.g. the Linux basic text store).
+    A SHAKE-256 keystream is used for the encryption (with HMAC-SHA256), since the native AES
+    implementation would take as long as decrypting the cookies one by one
+    """
+    _SECTION = 'chrome-cookies'
+
+    def __init__(self, cache, browser_name, database_path, decryptor, logger):
+        self._cache = cache
+        self._logger = logger
+        self._decryptor = decryptor
+        self._key = f'{browser_name}-{hashlib.sha256(os.path.abspath(database_path).encode()).hexdigest()[:16]}'
+        stat = os.stat(database_path)
+        self._database_state = [stat.st_mtime_ns, stat.st_size]
+        self.cookies, self.hits = None, 0
+        # SHA-256 of the encrypted value -> decrypted value
+        self._values, self._used_values = {}, {}
+
+        secret = cache.enabled and decryptor.cache_secret
+        self._encryption_key, self._mac_key = (
+            (hmac.digest(secret, purpose, 'sha256') for purpose in (b'encryption', b'authentication'))
+            if secret else (None, None))
+        if secret:
+            self._load()
+
+    def _load(self):
+        data = self._cache.load(self._SECTION, self._key)
+        if data is None:
+            return
+        try:
+            nonce, payload, mac = (base64.b64decode(data[key]) for key in ('nonce', 'data', 'mac'))
+            if not hmac.compare_digest(hmac.digest(self._mac_key, nonce + payload, 'sha256'), mac):
+                raise ValueError('MAC check failed')
+            cached = json.loads(self._xor_keystream(payload, nonce))
+            self._values = cached['values']
+        except (TypeError, KeyError, ValueError) as e:
+            self._logger.debug(f'Ignoring the cached cookies: {error_to_str(e)}')
+            return
+        if data.get('database') == self._database_state:
+            self.cookies = cached['cookies']
+
+    def decrypt(self, encrypted_value):
+        digest = hashlib.sha256(encrypted_value).hexdigest()
+        value = self._values.get(digest)
+        if value is not None:
+            self.hits += 1
+        else:
+            value = self._decryptor.decrypt(encrypted_value)
+        if value is not None:
+            self._used_values[digest] = value
+        return value
+
+    def store(self, jar):
+        if not self._encryption_key or not all(isinstance(cookie.value, str) for cookie in jar):
+            return
+        payload = json.dumps({
+            'cookies': [[cookie.domain, cookie.name, cookie.value, cookie.path, cookie.expires, cookie.secure]
+                        for cookie in jar],
+            'values': self._used_values,
+        }).encode()
+        nonce = os.urandom(16)
+        payload = self._xor_keystream(payload, nonce)
+        self._cache.store(self._SECTION, self._key, {
+            'database': self._database_state,
+            'nonce': base64.b64encode(nonce).decode(),
+            'data': base64.b64encode(payload).decode(),
+            'mac': base64.b64encode(hmac.digest(self._mac_key, nonce + payload, 'sha256')).decode(),
+        })
+
+    def _xor_keystream(self, data, nonce):
+        keystream = hashlib.shake_256(self._encryption_key + nonce).digest(len(data))
+        return (int.from_bytes(data, 'big') ^ int.from_bytes(keystream, 'big')).to_bytes(len(data), 'big')
+
+
 class ChromeCookieDecryptor:
     """
     Overview:
@@ -396,6 +520,11 @@ class ChromeCookieDecryptor:
     def decrypt(self, encrypted_value):
         raise NotImplementedError('Must be implemented by sub classes')
 
+    @property
+    def cache_secret(self):
+        """The key of the cookies if it is protected by the OS, else None. See _ChromeCookieCache"""
+        return None
+
 
 def get_cookie_decryptor(browser_root, browser_keyring_name, logger, *, keyring=None):
     if sys.platform == 'darwin':
@@ -419,6 +548,10 @@ def _v11_key(self):
         password = _get_linux_keyring_password(self._browser_keyring_name, self._keyring, self._logger)
         return None if password is None else self.derive_key(password)
 
+    @property
+    def cache_secret(self):
+        return None if self._v11_key == self._empty_key else self._v11_key
+
     @staticmethod
     def derive_key(password):
         # values from
@@ -463,6 +596,10 @@ def __init__(self, browser_keyring_name, logger):
         self._v10_key = None if password is None else self.derive_key(password)
         self._cookie_counts = {'v10': 0, 'other': 0}
 
+    @property
+    def cache_secret(self):
+        return self._v10_key
+
     @staticmethod
     def derive_key(password):
         # values from
@@ -494,6 +631,10 @@ def __init__(self, browser_root, logger):
         self._v10_key = _get_windows_v10_key(browser_root, logger)
         self._cookie_counts = {'v10': 0, 'other': 0}
 
+    @property
+    def cache_secret(self):
+        return self._v10_key
+
     def decrypt(self, encrypted_value):
         version = encrypted_value[:3]
         ciphertext = encrypted_value[3:]
@@ -1110,14 +1251,14 @@ def _is_path(value):
     return any(sep in value for sep in (os.path.sep, os.path.altsep) if sep)
 
 
-def _parse_browser_specification(browser_name, profile=None, keyring=None, container=None):
+def _parse_browser_specification(browser_name, profile=None, keyring=None, container=None, domains=None):
     if browser_name not in SUPPORTED_BROWSERS:
         raise ValueError(f'unsupported browser: "{browser_name}"')
     if keyring not in (None, *SUPPORTED_KEYRINGS):
         raise ValueError(f'unsupported keyring: "{keyring}"')
     if profile is not None and _is_path(expand_path(profile)):
         profile = expand_path(profile)
-    return browser_name, profile, keyring, container
+    return browser_name, profile, keyring, container, domains
 
 
 class LenientSimpleCookie(http.cookies.SimpleCookie):
@@ -1,9 +1,53 @@
+import functools
+import threading
 import time
 import urllib.parse
+import xml.etree.ElementTree
 
 from . import get_suitable_downloader
 from .fragment import FragmentFD
-from ..utils import update_url_query, urljoin
+from ..compat import compat_etree_fromstring
+from ..networking.exceptions import HTTPError, TransportError
+from ..utils import RetryManager, base_url, parse_duration, update_url_query, urljoin
+
+
+class _DynamicManifest:
+    """A dynamic MPD manifest, which is refreshed as needed by all the formats downloaded from it"""
+
+    def __init__(self, fd, info_dict, url):
+        from ..extractor.common import InfoExtractor
+
+        self._fd, self._info_dict, self.url = fd, info_dict, url
+        self._ie = InfoExtractor(fd.ydl)
+        self._lock = threading.Lock()
+        self.fetched = None
+        self.formats, self.is_dynamic, self.update_period = [], True, None
+
+    def refresh(self, last_fetched=None):
+        """
+        Fetch the manifest, unless it has been fetched since last_fetched
+
+        Returns the time it was fetched at, or None if it could not be fetched
+        """
+        with self._lock:
+            if self.fetched is not None and (last_fetched is None or self.fetched > last_fetched):
+                return self.fetched
+            for retry in RetryManager(
+                    self._fd.params.get('fragment_retries'), functools.partial(self._fd.report_retry, fatal=False)):
+                try:
+                    urlh = self._fd.ydl.urlopen(self._fd._prepare_url(self._info_dict, self.url))
+                    mpd_doc = compat_etree_fromstring(urlh.read())
+                except (HTTPError, TransportError, xml.etree.ElementTree.ParseError) as err:
+                    retry.error = err
+                    continue
+            if retry.error:
+                return None
+            self.formats, _ = self._ie._parse_mpd_formats_and_subtitles(
+                mpd_doc, mpd_base_url=base_url(urlh.url), mpd_url=urlh.url)
+            self.is_dynamic = mpd_doc.get('type') == 'dynamic'
+            self.update_period = parse_duration(mpd_doc.get('minimumUpdatePeriod'))
+            self.fetched = time.monotonic()
+            return self.fetched
 
 
 class DashSegmentsFD(FragmentFD):
@@ -13,13 +57,19 @@ class DashSegmentsFD(FragmentFD):
     """
 
     FD_NAME = 'dashsegments'
+    # Number of fragments before the live edge to start live streams at, unless --live-from-start
+    _LIVE_EDGE_FRAGMENTS = 3
+    # Seconds between refreshes of dynamic manifests without minimumUpdatePeriod or segment durations
+    _LIVE_REFRESH_INTERVAL = 5
 
     def real_download(self, filename, info_dict):
+        manifests = None
         if 'http_dash_segments_generator' in info_dict['protocol'].split('+'):
             real_downloader = None  # No external FD can support --live-from-start
+        elif info_dict.get('is_live'):
+            real_downloader = None  # The fragments of dynamic manifests are only known while downloading
+            manifests = {}
         else:
-            if info_dict.get('is_live'):
-                self.report_error('Live DASH videos are not supported')
             real_downloader = get_suitable_downloader(
                 info_dict, self.params, None, protocol='dash_frag_urls', to_stdout=(filename == '-'))
 
@@ -28,6 +78,16 @@ def real_download(self, filename, info_dict):
         requested_formats = [{**info_dict, **fmt} for fmt in info_dict.get('requested_formats', [])]
         args = []
         for fmt in requested_formats or [info_dict]:
+            if manifests is not None:
+                manifest_url = fmt.get('manifest_url')
+                if not manifest_url:
+                    self.report_error('Live DASH videos are only supported with the URL of their manifest')
+                    return False
+                # The formats from the same manifest share it, so that they are refreshed together
+                if manifest_url not in manifests:
+                    manifests[manifest_url] = _DynamicManifest(self, info_dict, manifest_url)
+                fmt['fragments'] = lambda _, fmt=fmt, manifest=manifests[manifest_url]: (
+                    self._live_fragments(fmt, manifest))
             try:
                 fragment_count = 1 if self.params.get('test') else len(fmt['fragments'])
             except TypeError:
@@ -62,6 +122,44 @@ def real_download(self, filename, info_dict):
 
         return self.download_and_append_fragments_multiple(*args, is_fatal=lambda idx: idx == 0)
 
+    def _live_fragments(self, fmt, manifest):
+        """Yield the fragments of the format that become available in each refresh of the dynamic manifest"""
+        last_url, fetched, duration = None, None, None
+        while True:
+            fetched = manifest.refresh(fetched)
+            if fetched is None:
+                self.report_warning('Unable to refresh the live manifest; the download will be stopped')
+                return
+            current = next((
+                f for f in manifest.formats
+                if f.get('manifest_stream_number') == fmt.get('manifest_stream_number')
+                and fmt['format_id'].endswith(f.get('format_id') or '')), None)
+            if current is None:
+                self.report_warning(f'Format {fmt["format_id"]} is no longer in the live manifest')
+                return
+
+            fragments = current.get('fragments') or []
+            fragment_url = lambda fragment: fragment.get('url') or urljoin(current['fragment_base_url'], fragment['path'])
+            # Only the initialization fragment has no duration
+            has_init = bool(fragments) and 'duration' not in fragments[0]
+            if last_url is None:
+                if has_init:
+                    yield {'url': fragment_url(fragments[0])}
+                start = 0 if self.params.get('live_from_start') else len(fragments) - self._LIVE_EDGE_FRAGMENTS
+            else:
+                start = next((
+                    idx + 1 for idx in range(len(fragments) - 1, -1, -1)
+                    if fragment_url(fragments[idx]) == last_url), 0)
+            for idx in range(max(start, int(has_init)), len(fragments)):
+                fragment = fragments[idx]
+                last_url, duration = fragment_url(fragment), fragment.get('duration')
+                yield {'url': last_url, 'duration': duration}
+
+            if not manifest.is_dynamic:
+                return
+            time.sleep(max(0, fetched + (manifest.update_period or duration or self._LIVE_REFRESH_INTERVAL)
+                           - time.monotonic()))
+
     def _resolve_fragments(self, fragments, ctx):
         fragments = fragments(ctx) if callable(fragments) else fragments
         return [next(iter(fragments))] if self.params.get('test') else fragments
@@ -1,3 +1,4 @@
+import contextlib
 import enum
 import json
 import os
@@ -5,16 +6,20 @@
 import subprocess
 import sys
 import tempfile
+import threading
 import time
+import urllib.parse
 import uuid
 
 from .fragment import FragmentFD
 from ..compat import functools
 from ..networking import Request
+from ..networking.exceptions import HTTPError, network_exceptions
 from ..postprocessor.ffmpeg import EXT_TO_OUT_FORMATS, FFmpegPostProcessor
 from ..utils import (
     Popen,
     RetryManager,
+    YoutubeDLError,
     _configuration_args,
     check_executable,
     classproperty,
@@ -25,7 +30,9 @@
     encodeArgument,
     encodeFilename,
     find_available_port,
+    int_or_none,
     remove_end,
+    shell_quote,
     traverse_obj,
 )
 
@@ -145,9 +152,16 @@ def _call_downloader(self, tmpfilename, info_dict):
         cmd = [encodeArgument(a) for a in self._make_cmd(tmpfilename, info_dict)]
 
         self._debug_cmd(cmd)
+        return self._run_downloader(functools.partial(self._call_process, cmd, info_dict), tmpfilename, info_dict)
 
+    def _run_downloader(self, run, tmpfilename, info_dict):
+        """
+        Download with run, which returns (stdout, stderr, returncode) like _call_process
+
+        Fragmented downloads are retried, and their fragments are joined into tmpfilename
+        """
         if 'fragments' not in info_dict:
-            _, stderr, returncode = self._call_process(cmd, info_dict)
+            _, stderr, returncode = run()
             if returncode and stderr:
                 self.to_stderr(stderr)
             return returncode
@@ -157,7 +171,7 @@ def _call_downloader(self, tmpfilename, info_dict):
         retry_manager = RetryManager(self.params.get('fragment_retries'), self.report_retry,
                                      frag_index=None, fatal=not skip_unavailable_fragments)
         for retry in retry_manager:
-            _, stderr, returncode = self._call_process(cmd, info_dict)
+            _, stderr, returncode = run()
             if not returncode:
                 break
             # TODO: Decide whether to retry based on error code
@@ -267,9 +281,189 @@ def _make_cmd(self, tmpfilename, info_dict):
         return cmd
 
 
+class Aria2cRPCError(YoutubeDLError):
+    pass
+
+
+class Aria2cRPCServer:
+    """
+    A long-lived aria2c RPC server, which makes the aria2c downloads of a YoutubeDL
+
+    The statuses of all the downloads are polled together, with the same
+    tellActive/tellStopped requests, at most once every _POLL_INTERVAL
+    """
+    _POLL_INTERVAL = 0.5
+    _STARTUP_TIMEOUT = 10
+    # Maximum number of calls in a request, and of results in a response
+    _BATCH_SIZE = 1000
+    _STATUS_KEYS = ['gid', 'status', 'totalLength', 'completedLength', 'downloadSpeed', 'errorCode', 'errorMessage']
+    FINISHED_STATUSES = ('complete', 'error', 'removed')
+
+    def __init__(self, ydl, url, secret=None, process=None):
+        self._ydl, self.url, self._process = ydl, url, process
+        self._token = secret and f'token:{secret}'
+        self._lock = threading.Lock()
+        self._last_poll = 0
+        # The last known statuses of the downloads that are followed, by GID
+        self._statuses = {}
+
+    @classmethod
+    def connect(cls, ydl, url):
+        """Connect to the aria2c RPC server at url. The secret is taken from the password of the url"""
+        parsed = urllib.parse.urlparse(url)
+        server = cls(
+            ydl, parsed._replace(netloc=parsed.netloc.rpartition('@')[2]).geturl(),
+            parsed.password and urllib.parse.unquote(parsed.password))
+        server.call('aria2.getVersion')
+        return server
+
+    @classmethod
+    def start(cls, ydl, exe, args=()):
+        """Start an aria2c RPC server, which is stopped by close or when this process exits"""
+        port, secret = find_available_port() or 6800, str(uuid.uuid4())
+        cmd = [
+            exe, '--no-conf', '--enable-rpc', f'--rpc-listen-port={port}', f'--rpc-secret={secret}',
+            '--rpc-max-request-size=16M', f'--max-download-result={cls._BATCH_SIZE}', f'--stop-with-process={os.getpid()}',
+            '--console-log-level=warn', '--summary-interval=0', '--download-result=hide', '-j16', *args]
+        ydl.write_debug(f'aria2c RPC server command line: {shell_quote(cmd)}')
+        server = cls(ydl, f'http://localhost:{port}/jsonrpc', secret, Popen(
+            [encodeArgument(arg) for arg in cmd], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+
+        deadline = time.monotonic() + cls._STARTUP_TIMEOUT
+        while True:
+            try:
+                server.call('aria2.getVersion')
+                return server
+            except network_exceptions:
+                if server._process.poll() is not None or time.monotonic() > deadline:
+                    server.close()
+                    raise Aria2cRPCError('The aria2c RPC server did not start')
+                time.sleep(0.1)
+
+    def _request(self, method, params):
+        # Does not actually need to be UUID, just unique
+        sanitycheck = str(uuid.uuid4())
+        d = json.dumps({
+            'jsonrpc': '2.0',
+            'id': sanitycheck,
+            'method': method,
+            'params': params,
+        }).encode()
+        request = Request(self.url, data=d, headers={'Content-Type': 'application/json'}, proxies={'all': None})
+        try:
+            with self._ydl.urlopen(request) as r:
+                resp = json.load(r)
+        except HTTPError as e:
+            # aria2c answers errors with a 400 status
+            try:
+                resp = json.load(e.response)
+            except ValueError:
+                raise e
+        if resp.get('error'):
+            raise Aria2cRPCError(traverse_obj(resp, ('error', 'message')) or 'Unknown error')
+        assert resp.get('id') == sanitycheck, 'Something went wrong with RPC server'
+        return resp['result']
+
+    def _params(self, params):
+        return [self._token, *params] if self._token else list(params)
+
+    def call(self, method, *params):
+        return self._request(method, self._params(params))
+
+    def multicall(self, calls):
+        """
+        Make the calls, given as (method, *params) tuples, in as few requests as possible
+
+        @returns  The results of the calls, or the Aria2cRPCError of those that failed
+        """
+        results, calls = [], list(calls)
+        for start in range(0, len(calls), self._BATCH_SIZE):
+            results.extend(self._request('system.multicall', [[
+                {'methodName': method, 'params': self._params(params)}
+                for method, *params in calls[start:start + self._BATCH_SIZE]]]))
+        return [result[0] if isinstance(result, list) else Aria2cRPCError(traverse_obj(result, 'message'))
+                for result in results]
+
+    def add(self, downloads):
+        """Add the downloads, given as (uri, options) pairs, and follow their statuses. Returns their GIDs"""
+        results = self.multicall(('aria2.addUri', [uri], options) for uri, options in downloads)
+        gids = [result for result in results if not isinstance(result, Aria2cRPCError)]
+        with self._lock:
+            self._statuses.update(dict.fromkeys(gids))
+        if len(gids) != len(results):
+            self.release(gids)
+            raise next(result for result in results if isinstance(result, Aria2cRPCError))
+        return gids
+
+    def get_statuses(self, gids):
+        """Return the last known statuses of the downloads, after polling the server if they are out of date"""
+        with self._lock:
+            if time.monotonic() - self._last_poll >= self._POLL_INTERVAL:
+                self._poll()
+                self._last_poll = time.monotonic()
+            return [self._statuses.get(gid) for gid in gids]
+
+    def _poll(self):
+        active, stopped = self.multicall((
+            ('aria2.tellActive', self._STATUS_KEYS),
+            ('aria2.tellStopped', 0, self._BATCH_SIZE, self._STATUS_KEYS),
+        ))
+        for result in (active, stopped):
+            if isinstance(result, Aria2cRPCError):
+                raise result
+        offset, seen = 0, set()
+        while True:
+            finished = [status for status in stopped if status['gid'] in self._statuses]
+            for status in (*active, *finished):
+                if status['gid'] in self._statuses:
+                    self._statuses[status['gid']] = status
+                    seen.add(status['gid'])
+            # Remove the results from the server, so that the next polls do not get them again
+            self.multicall(('aria2.removeDownloadResult', status['gid']) for status in finished)
+            if len(stopped) < self._BATCH_SIZE:
+                break
+            offset += len(stopped) - len(finished)
+            active, stopped = [], self.call('aria2.tellStopped', offset, self._BATCH_SIZE, self._STATUS_KEYS)
+
+        # The others are either waiting, or have been lost, e.g. if their results were evicted
+        # by --max-download-result, removed by another client, or the server was restarted
+        missing = [gid for gid, status in self._statuses.items()
+                   if gid not in seen and traverse_obj(status, 'status') not in self.FINISHED_STATUSES]
+        results = self.multicall(('aria2.tellStatus', gid, self._STATUS_KEYS) for gid in missing)
+        for gid, result in zip(missing, results):
+            self._statuses[gid] = result if not isinstance(result, Aria2cRPCError) else {
+                'gid': gid, 'status': 'error', 'errorMessage': f'The download is no longer on the server: {result}'}
+
+    @functools.cached_property
+    def max_concurrent_downloads(self):
+        return int_or_none(self.call('aria2.getGlobalOption').get('max-concurrent-downloads')) or 5
+
+    def release(self, gids):
+        """Stop following the downloads, and remove the ones that have not finished from the server"""
+        with self._lock:
+            statuses = [self._statuses.pop(gid, None) for gid in gids]
+        unfinished = [gid for gid, status in zip(gids, statuses)
+                      if traverse_obj(status, 'status') not in self.FINISHED_STATUSES]
+        if unfinished:
+            with contextlib.suppress(Aria2cRPCError, *network_exceptions):
+                self.multicall(('aria2.forceRemove', gid) for gid in unfinished)
+
+    def close(self):
+        """Stop the aria2c RPC server if it was started by start"""
+        if not self._process:
+            return
+        with contextlib.suppress(Aria2cRPCError, *network_exceptions):
+            self.call('aria2.forceShutdown')
+        try:
+            self._process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self._process.kill(timeout=None)
+
+
 class Aria2cFD(ExternalFD):
     AVAILABLE_OPT = '-v'
     SUPPORTED_PROTOCOLS = ('http', 'https', 'ftp', 'ftps', 'dash_frag_urls', 'm3u8_frag_urls')
+    _RPC_SERVER_LOCK = threading.Lock()
 
     @staticmethod
     def supports_manifest(manifest):
@@ -284,7 +478,123 @@ def supports_manifest(manifest):
     def _aria2c_filename(fn):
         return fn if os.path.isabs(fn) else f'.{os.path.sep}{fn}'
 
+    def _rpc_server(self):
+        """The aria2c RPC server of --aria2c-rpc, or None if the downloads are made by a process each"""
+        rpc = self.params.get('aria2c_rpc')
+        if not rpc:
+            return None
+        with self._RPC_SERVER_LOCK:
+            if self.ydl._aria2c_rpc_server is None:
+                try:
+                    self.ydl._aria2c_rpc_server = (
+                        Aria2cRPCServer.start(self.ydl, self.exe, self._configuration_args()) if rpc == 'start'
+                        else Aria2cRPCServer.connect(self.ydl, rpc))
+                except (OSError, Aria2cRPCError, *network_exceptions) as e:
+                    self.report_warning(f'Unable to use the aria2c RPC server: {e}; starting aria2c for every download')
+                    self.ydl._aria2c_rpc_server = False
+            return self.ydl._aria2c_rpc_server or None
+
+    def _make_rpc_downloads(self, server, tmpfilename, info_dict):
+        """The (uri, options) of the aria2.addUri calls that make the download"""
+        options = {
+            'continue': 'true',
+            'http-accept-gzip': 'true',
+            'file-allocation': 'none',
+            'max-connection-per-server': '16',
+            'split': '16',
+            'auto-file-renaming': 'false',
+            # The server may not have the same working directory
+            'dir': os.path.abspath(os.path.dirname(tmpfilename) or '.') + os.path.sep,
+        }
+        # --load-cookies is a global option, so the cookies are sent as a header instead
+        headers = {**(info_dict.get('http_headers') or {})}
+        cookie_header = self.ydl.cookiejar.get_cookie_header(info_dict['url'])
+        if cookie_header:
+            headers['Cookie'] = cookie_header
+        if headers:
+            options['header'] = [f'{key}: {val}' for key, val in headers.items()]
+        for option, param in (('interface', 'source_address'), ('all-proxy', 'proxy')):
+            if self.params.get(param) is not None:
+                options[option] = str(self.params[param])
+        if self.params.get('ratelimit'):
+            # The limit is for each download, and the fragments are downloaded concurrently
+            concurrent = min(len(info_dict.get('fragments') or [None]), server.max_concurrent_downloads)
+            options['max-download-limit'] = str(max(int(self.params['ratelimit'] // concurrent), 1))
+        options['check-certificate'] = 'false' if self.params.get('nocheckcertificate') else 'true'
+        options['remote-time'] = 'true' if self.params.get('updatetime') else 'false'
+
+        basename = os.path.basename(tmpfilename)
+        if 'fragments' not in info_dict:
+            return [(info_dict['url'], {**options, 'min-split-size': '1M', 'out': self._aria2c_filename(basename)})]
+        options.update({
+            'allow-overwrite': 'true',
+            'allow-piece-length-change': 'true',
+            'uri-selector': 'inorder',
+        })
+        return [(fragment['url'], {**options, 'out': self._aria2c_filename(f'{basename}-Frag{frag_index}')})
+                for frag_index, fragment in enumerate(info_dict['fragments'])]
+
+    def _call_rpc_server(self, server, tmpfilename, info_dict):
+        started = time.time()
+        fragmented = 'fragments' in info_dict
+        frag_count = len(info_dict['fragments']) if fragmented else 1
+        status = {
+            'filename': info_dict.get('_filename'),
+            'status': 'downloading',
+            'elapsed': 0,
+            'downloaded_bytes': 0,
+            'fragment_count': frag_count if fragmented else None,
+            'fragment_index': 0 if fragmented else None,
+        }
+        self._hook_progress(status, info_dict)
+
+        def get_stat(key, statuses, average=False):
+            val = tuple(filter(None, map(float, traverse_obj(statuses, (..., key))))) or [0]
+            return sum(val) / (len(val) if average else 1)
+
+        gids = []
+        try:
+            gids = server.add(self._make_rpc_downloads(server, tmpfilename, info_dict))
+            while True:
+                statuses = [s for s in server.get_statuses(gids) if s]
+                finished = [s for s in statuses if s['status'] in server.FINISHED_STATUSES]
+                downloaded = get_stat('completedLength', statuses)
+                speed = get_stat('downloadSpeed', statuses)
+                total = frag_count * get_stat('totalLength', statuses, average=True)
+                if total < downloaded:
+                    total = None
+
+                status.update({
+                    'downloaded_bytes': int(downloaded),
+                    'speed': speed,
+                    'total_bytes': None if fragmented else total,
+                    'total_bytes_estimate': total,
+                    'eta': total and (total - downloaded) / (speed or 1),
+                    'fragment_index': min(frag_count, len(finished) + 1) if fragmented else None,
+                    'elapsed': time.time() - started,
+                })
+                self._hook_progress(status, info_dict)
+
+                if len(finished) == len(gids):
+                    break
+                time.sleep(server._POLL_INTERVAL)
+        except (Aria2cRPCError, *network_exceptions) as e:
+            return '', f'aria2c RPC server error: {e}', 1
+        finally:
+            server.release(gids)
+
+        failed = [s for s in finished if s['status'] != 'complete']
+        if not failed:
+            return '', '', 0
+        return ('', '\n'.join(s.get('errorMessage') or f'Download {s["status"]}' for s in failed),
+                int_or_none(failed[0].get('errorCode')) or 1)
+
     def _call_downloader(self, tmpfilename, info_dict):
+        server = self._rpc_server()
+        if server:
+            return self._run_downloader(
+                functools.partial(self._call_rpc_server, server, tmpfilename, info_dict), tmpfilename, info_dict)
+
         # FIXME: Disabled due to https://github.com/yt-dlp/yt-dlp/issues/5931
         if False and 'no-external-downloader-progress' not in self.params.get('compat_opts', []):
             info_dict['__rpc'] = {
@@ -4,6 +4,8 @@
 import math
 import os
 import struct
+import tempfile
+import threading
 import time
 
 from .common import FileDownloader
@@ -12,7 +14,13 @@
 from ..compat import compat_os_name
 from ..networking import Request
 from ..networking.exceptions import HTTPError, IncompleteRead
-from ..utils import DownloadError, RetryManager, encodeFilename, traverse_obj
+from ..utils import (
+    DownloadError,
+    RetryManager,
+    encodeFilename,
+    join_nonempty,
+    traverse_obj,
+)
 from ..utils.networking import HTTPHeaderDict
 from ..utils.progress import ProgressCalculator
 
@@ -24,6 +32,83 @@ def to_screen(self, *args, **kargs):
     to_console_title = to_screen
 
 
+class FragmentBuffer:
+    """
+    A write-only stream that holds a fragment in memory
+
+    The data is spilled to an anonymous temporary file once it grows larger
+    than max_size. Closing the stream does not discard the data, since
+    HttpFD closes its stream before the fragment is read back
+    """
+
+    def __init__(self, max_size):
+        self._file = tempfile.SpooledTemporaryFile(max_size)
+
+    def write(self, data):
+        return self._file.write(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+    def truncate(self):
+        self._file.seek(0)
+        self._file.truncate()
+
+    def tell(self):
+        return self._file.tell()
+
+    def read(self):
+        self._file.seek(0)
+        return self._file.read()
+
+    def discard(self):
+        self._file.close()
+
+
+class HttpBufferedDownloader(HttpQuietDownloader):
+    """Downloads fragments into FragmentBuffer objects instead of files on disk"""
+
+    def __init__(self, ydl, params, max_size):
+        super().__init__(ydl, {**params, 'xattr_set_filesize': False})
+        self._max_size = max_size
+        self._buffers = {}
+        self._lock = threading.Lock()
+
+    def temp_name(self, filename):
+        return filename
+
+    def filesize_or_none(self, filename):
+        return 0
+
+    def sanitize_open(self, filename, open_mode):
+        with self._lock:
+            buffer = self._buffers.get(filename)
+            if buffer is None:
+                buffer = self._buffers[filename] = FragmentBuffer(self._max_size)
+        if 'a' not in open_mode:
+            buffer.truncate()
+        return buffer, filename
+
+    def try_rename(self, old_filename, new_filename):
+        pass
+
+    def try_utime(self, filename, last_modified_hdr):
+        return None
+
+    def pop_buffer(self, filename):
+        with self._lock:
+            return self._buffers.pop(filename, None)
+
+    def discard_buffers(self):
+        with self._lock:
+            buffers, self._buffers = self._buffers, {}
+        for buffer in buffers.values():
+            buffer.discard()
+
+
 class FragmentFD(FileDownloader):
     """
     A base file downloader class for fragmented media (e.g. f4m/m3u8 manifests).
@@ -37,6 +122,9 @@ class FragmentFD(FileDownloader):
     keep_fragments:     Keep downloaded fragments on disk after downloading is
                         finished
     concurrent_fragment_downloads:  The number of threads to use for native hls and dash downloads
+    fragment_buffer_size:  Keep fragments in memory instead of writing them to
+                        disk. A fragment larger than this many bytes is spilled
+                        to an anonymous temporary file. Ignored with keep_fragments
     _no_ytdl_file:      Don't use .ytdl file
 
     For each incomplete fragment download yt-dlp keeps on disk a special
@@ -60,6 +148,9 @@ class FragmentFD(FileDownloader):
     This feature is experimental and file format may change in future.
     """
 
+    # Number of fragments per worker that may be in flight or waiting to be appended
+    _FRAGMENT_REORDER_WINDOW = 4
+
     def report_retry_fragment(self, err, frag_index, count, retries):
         self.deprecation_warning('yt_dlp.downloader.FragmentFD.report_retry_fragment is deprecated. '
                                  'Use yt_dlp.downloader.FileDownloader.report_retry instead')
@@ -119,7 +210,7 @@ def _download_fragment(self, ctx, frag_url, info_dict, headers=None, request_dat
         }
         frag_resume_len = 0
         if ctx['dl'].params.get('continuedl', True):
-            frag_resume_len = self.filesize_or_none(self.temp_name(fragment_filename))
+            frag_resume_len = ctx['dl'].filesize_or_none(ctx['dl'].temp_name(fragment_filename))
         fragment_info_dict['frag_resume_len'] = ctx['frag_resume_len'] = frag_resume_len
 
         success, _ = ctx['dl'].download(fragment_filename, fragment_info_dict)
@@ -133,6 +224,13 @@ def _download_fragment(self, ctx, frag_url, info_dict, headers=None, request_dat
     def _read_fragment(self, ctx):
         if not ctx.get('fragment_filename_sanitized'):
             return None
+        if isinstance(ctx['dl'], HttpBufferedDownloader):
+            buffer = ctx['dl'].pop_buffer(ctx['fragment_filename_sanitized'])
+            if buffer is None:
+                return None
+            frag_content = buffer.read()
+            buffer.discard()
+            return frag_content
         try:
             down, frag_sanitized = self.sanitize_open(ctx['fragment_filename_sanitized'], 'rb')
         except FileNotFoundError:
@@ -165,14 +263,20 @@ def _prepare_frag_download(self, ctx):
             total_frags_str = 'unknown (live)'
         self.to_screen(f'[{self.FD_NAME}] Total fragments: {total_frags_str}')
         self.report_destination(ctx['filename'])
-        dl = HttpQuietDownloader(self.ydl, {
+        dl_params = {
             **self.params,
             'noprogress': True,
             'test': False,
+            'http_connections': 1,
             'sleep_interval': 0,
             'max_sleep_interval': 0,
             'sleep_interval_subtitles': 0,
-        })
+        }
+        buffer_size = self.params.get('fragment_buffer_size')
+        if buffer_size and not self.params.get('keep_fragments', False):
+            dl = HttpBufferedDownloader(self.ydl, dl_params, buffer_size)
+        else:
+            dl = HttpQuietDownloader(self.ydl, dl_params)
         tmpfilename = self.temp_name(ctx['filename'])
         open_mode = 'wb'
 
@@ -285,6 +389,8 @@ def frag_progress_hook(s):
 
     def _finish_frag_download(self, ctx, info_dict):
         ctx['dest_stream'].close()
+        if isinstance(ctx['dl'], HttpBufferedDownloader):
+            ctx['dl'].discard_buffers()
         if self.__do_ytdl_file(ctx):
             self.try_remove(self.ytdl_filename(ctx['filename']))
         elapsed = time.time() - ctx['started']
@@ -339,6 +445,20 @@ def _prepare_external_frag_download(self, ctx):
             'fragment_index': 0,
         })
 
+    def _report_fragment_latencies(self, ctx):
+        latencies = ctx.get('fragment_latencies')
+        if not latencies or not self.params.get('verbose'):
+            return
+        slowest = sorted(latencies, key=latencies.get, reverse=True)[:3]
+        mean = sum(latencies.values()) / len(latencies)
+        stragglers = ', '.join(f'{idx} ({latencies[idx]:.2f}s)' for idx in slowest)
+        backlog = ctx.get('max_reorder_backlog')
+        self.write_debug(join_nonempty(
+            f'[{self.FD_NAME}] Fragment latency: mean {mean:.2f}s over {len(latencies)} fragments',
+            f'slowest {stragglers}',
+            backlog is not None and f'at most {backlog} fragments held back for reordering',
+            delim='; '))
+
     def decrypter(self, info_dict):
         _key_cache = {}
 
@@ -482,36 +602,80 @@ def append_fragment(frag_content, frag_index, ctx):
             return True
 
         decrypt_fragment = self.decrypter(info_dict)
+        latencies = ctx['fragment_latencies'] = {}
 
         max_workers = math.ceil(
             self.params.get('concurrent_fragment_downloads', 1) / ctx.get('max_progress', 1))
         if max_workers > 1:
-            def _download_fragment(fragment):
-                ctx_copy = ctx.copy()
+            def _download_fragment(fragment, ctx_copy):
+                start = time.monotonic()
                 download_fragment(fragment, ctx_copy)
+                latencies[fragment['frag_index']] = time.monotonic() - start
                 return fragment, fragment['frag_index'], ctx_copy.get('fragment_filename_sanitized')
 
+            if compat_os_name == 'nt':
+                def wait_first(futures):
+                    while True:
+                        done, _ = concurrent.futures.wait(
+                            futures, 0.1, return_when=concurrent.futures.FIRST_COMPLETED)
+                        if done:
+                            return done
+            else:
+                def wait_first(futures):
+                    return concurrent.futures.wait(
+                        futures, return_when=concurrent.futures.FIRST_COMPLETED)[0]
+
+            # Fragments can finish out of order. Finished fragments are held back until all
+            # preceding ones are appended, and no new fragments are submitted while the window is full
+            window = max_workers * self._FRAGMENT_REORDER_WINDOW
+            fragments_iter = iter(fragments)
+            pending, finished = {}, {}
+            next_submit = next_append = 0
             with tpe or concurrent.futures.ThreadPoolExecutor(max_workers) as pool:
                 try:
-                    for fragment, frag_index, frag_filename in pool.map(_download_fragment, fragments):
-                        ctx.update({
-                            'fragment_filename_sanitized': frag_filename,
-                            'fragment_index': frag_index,
-                        })
-                        if not append_fragment(decrypt_fragment(fragment, self._read_fragment(ctx)), frag_index, ctx):
-                            return False
+                    while True:
+                        while fragments_iter and next_submit - next_append < window:
+                            fragment = next(fragments_iter, None)
+                            if fragment is None:
+                                fragments_iter = None
+                                break
+                            # NB: Copied here, since ctx holds the fragment that is being appended
+                            ctx_copy = {**ctx, 'fragment_filename_sanitized': None}
+                            pending[pool.submit(_download_fragment, fragment, ctx_copy)] = next_submit
+                            next_submit += 1
+                        if not pending:
+                            break
+                        for future in wait_first(pending):
+                            finished[pending.pop(future)] = future.result()
+                        # Finished fragments that are held back by a preceding one
+                        ctx['max_reorder_backlog'] = max(
+                            ctx.get('max_reorder_backlog', 0), len(finished) - (next_append in finished))
+                        while next_append in finished:
+                            fragment, frag_index, frag_filename = finished.pop(next_append)
+                            next_append += 1
+                            ctx.update({
+                                'fragment_filename_sanitized': frag_filename,
+                                'fragment_index': frag_index,
+                            })
+                            if not append_fragment(decrypt_fragment(fragment, self._read_fragment(ctx)), frag_index, ctx):
+                                return False
                 except KeyboardInterrupt:
                     self._finish_multiline_status()
                     self.report_error(
                         'Interrupted by user. Waiting for all threads to shutdown...', is_error=False, tb=False)
                     pool.shutdown(wait=False)
                     raise
+                finally:
+                    for future in pending:
+                        future.cancel()
         else:
             for fragment in fragments:
                 if not interrupt_trigger[0]:
                     break
                 try:
+                    start = time.monotonic()
                     download_fragment(fragment, ctx)
+                    latencies[fragment['frag_index']] = time.monotonic() - start
                     result = append_fragment(
                         decrypt_fragment(fragment, self._read_fragment(ctx)), fragment['frag_index'], ctx)
                 except KeyboardInterrupt:
@@ -521,6 +685,7 @@ def _download_fragment(fragment):
                 if not result:
                     return False
 
+        self._report_fragment_latencies(ctx)
         if finish_func is not None:
             ctx['dest_stream'].write(finish_func())
             ctx['dest_stream'].flush()
@@ -1,6 +1,8 @@
 import binascii
+import functools
 import io
 import re
+import time
 import urllib.parse
 
 from . import get_suitable_downloader
@@ -8,7 +10,9 @@
 from .fragment import FragmentFD
 from .. import webvtt
 from ..dependencies import Cryptodome
+from ..networking.exceptions import HTTPError, TransportError
 from ..utils import (
+    RetryManager,
     bug_reports_message,
     parse_m3u8_attributes,
     remove_start,
@@ -26,6 +30,8 @@ class HlsFD(FragmentFD):
     """
 
     FD_NAME = 'hlsnative'
+    # Seconds between refreshes of live playlists without #EXT-X-TARGETDURATION
+    _LIVE_REFRESH_INTERVAL = 5
 
     @staticmethod
     def _has_drm(manifest):  # TODO: https://github.com/yt-dlp/yt-dlp/pull/5039
@@ -63,7 +69,6 @@ def can_download(cls, manifest, info_dict, allow_unplayable_formats=False):
             ]
 
         def check_results():
-            yield not info_dict.get('is_live')
             for feature in UNSUPPORTED_FEATURES:
                 yield not re.search(feature, manifest)
             if not allow_unplayable_formats:
@@ -72,11 +77,15 @@ def check_results():
 
     def real_download(self, filename, info_dict):
         man_url = info_dict['url']
-        self.to_screen(f'[{self.FD_NAME}] Downloading m3u8 manifest')
-
-        urlh = self.ydl.urlopen(self._prepare_url(info_dict, man_url))
-        man_url = urlh.url
-        s = urlh.read().decode('utf-8', 'ignore')
+        cached_manifest = not info_dict.get('is_live') and self.ydl._get_cached_manifest(man_url)
+        if cached_manifest:
+            self.write_debug(f'[{self.FD_NAME}] Using the m3u8 manifest downloaded during extraction')
+            man_url, s = cached_manifest
+        else:
+            self.to_screen(f'[{self.FD_NAME}] Downloading m3u8 manifest')
+            urlh = self.ydl.urlopen(self._prepare_url(info_dict, man_url))
+            man_url = urlh.url
+            s = urlh.read().decode('utf-8', 'ignore')
 
         can_download, message = self.can_download(s, info_dict, self.params.get('allow_unplayable_formats')), None
         if can_download:
@@ -87,10 +96,6 @@ def real_download(self, filename, info_dict):
             elif no_crypto:
                 message = ('The stream has AES-128 encryption and neither ffmpeg nor pycryptodomex are available; '
                            'Decryption will be performed natively, but will be extremely slow')
-            elif info_dict.get('extractor_key') == 'Generic' and re.search(r'(?m)#EXT-X-MEDIA-SEQUENCE:(?!0$)', s):
-                install_ffmpeg = '' if has_ffmpeg else 'install ffmpeg and '
-                message = ('Live HLS streams are not supported by the native downloader. If this is a livestream, '
-                           f'please {install_ffmpeg}add "--downloader ffmpeg --hls-use-mpegts" to your command')
         if not can_download:
             if self._has_drm(s) and not self.params.get('allow_unplayable_formats'):
                 if info_dict.get('has_drm') and self.params.get('test'):
@@ -107,9 +112,16 @@ def real_download(self, filename, info_dict):
         elif message:
             self.report_warning(message)
 
+        # Media playlists without #EXT-X-ENDLIST are refreshed until it is added. Generic has no
+        # information about liveness, so a non-zero media sequence is used as a heuristic there
+        is_live = '#EXT-X-ENDLIST' not in s and not self.params.get('test', False) and bool(
+            info_dict.get('is_live') or info_dict.get('extractor_key') == 'Generic'
+            and re.search(r'(?m)#EXT-X-MEDIA-SEQUENCE:(?!0$)', s))
+
         is_webvtt = info_dict['ext'] == 'vtt'
-        if is_webvtt:
-            real_downloader = None  # Packing the fragments is not currently supported for external downloader
+        if is_webvtt or is_live:
+            # Packing the fragments and refreshing live playlists are not currently supported for external downloader
+            real_downloader = None
         else:
             real_downloader = get_suitable_downloader(
                 info_dict, self.params, None, protocol='m3u8_frag_urls', to_stdout=(filename == '-'))
@@ -126,8 +138,6 @@ def is_ad_fragment_end(s):
             return (s.startswith('#ANVATO-SEGMENT-INFO') and 'type=master' in s
                     or s.startswith('#UPLYNK-SEGMENT') and s.endswith(',segment'))
 
-        fragments = []
-
         media_frags = 0
         ad_frags = 0
         ad_frag_next = False
@@ -148,8 +158,9 @@ def is_ad_fragment_end(s):
 
         ctx = {
             'filename': filename,
-            'total_frags': media_frags,
+            'total_frags': None if is_live else media_frags,
             'ad_frags': ad_frags,
+            'live': is_live,
         }
 
         if real_downloader:
@@ -166,9 +177,6 @@ def is_ad_fragment_end(s):
         extra_key_query = None
         if extra_param_to_key_url := info_dict.get('extra_param_to_key_url'):
             extra_key_query = urllib.parse.parse_qs(extra_param_to_key_url)
-        i = 0
-        media_sequence = 0
-        decrypt_info = {'METHOD': 'NONE'}
         external_aes_key = traverse_obj(info_dict, ('hls_aes', 'key'))
         if external_aes_key:
             external_aes_key = binascii.unhexlify(remove_start(external_aes_key, '0x'))
@@ -176,21 +184,25 @@ def is_ad_fragment_end(s):
         external_aes_iv = traverse_obj(info_dict, ('hls_aes', 'iv'))
         if external_aes_iv:
             external_aes_iv = binascii.unhexlify(remove_start(external_aes_iv, '0x').zfill(32))
-        byte_range = {}
-        discontinuity_count = 0
-        frag_index = 0
-        ad_frag_next = False
-        for line in s.splitlines():
-            line = line.strip()
-            if line:
+
+        def parse_fragments(s, man_url, skip_init=False):
+            fragments = []
+            media_sequence = 0
+            decrypt_info = {'METHOD': 'NONE'}
+            byte_range = {}
+            discontinuity_count = 0
+            frag_index = 0
+            ad_frag_next = False
+            for line in s.splitlines():
+                line = line.strip()
+                if not line:
+                    continue
                 if not line.startswith('#'):
                     if format_index and discontinuity_count != format_index:
                         continue
                     if ad_frag_next:
                         continue
                     frag_index += 1
-                    if frag_index <= ctx['fragment_index']:
-                        continue
                     frag_url = urljoin(man_url, line)
                     if extra_segment_query:
                         frag_url = update_url_query(frag_url, extra_segment_query)
@@ -210,8 +222,7 @@ def is_ad_fragment_end(s):
                     if frag_index > 0:
                         self.report_error(
                             'Initialization fragment found after media fragments, unable to download')
-                        return False
-                    frag_index += 1
+                        return None
                     map_info = parse_m3u8_attributes(line[11:])
                     frag_url = urljoin(man_url, map_info.get('URI'))
                     if extra_segment_query:
@@ -225,13 +236,15 @@ def is_ad_fragment_end(s):
                             'end': sub_range_start + int(splitted_byte_range[0]),
                         }
 
-                    fragments.append({
-                        'frag_index': frag_index,
-                        'url': frag_url,
-                        'decrypt_info': decrypt_info,
-                        'byte_range': byte_range,
-                        'media_sequence': media_sequence,
-                    })
+                    if not skip_init:
+                        frag_index += 1
+                        fragments.append({
+                            'frag_index': frag_index,
+                            'url': frag_url,
+                            'decrypt_info': decrypt_info,
+                            'byte_range': byte_range,
+                            'media_sequence': media_sequence,
+                        })
                     media_sequence += 1
 
                 elif line.startswith('#EXT-X-KEY'):
@@ -268,11 +281,58 @@ def is_ad_fragment_end(s):
                     ad_frag_next = False
                 elif line.startswith('#EXT-X-DISCONTINUITY'):
                     discontinuity_count += 1
-                i += 1
-
-        # We only download the first fragment during the test
-        if self.params.get('test', False):
-            fragments = [fragments[0] if fragments else None]
+            return fragments
+
+        def live_fragments(fragments, s):
+            """Yield the fragments of the live playlist, refreshing it until #EXT-X-ENDLIST"""
+            frag_index = 0
+            last_media_sequence = None
+            while True:
+                refreshed = time.monotonic()
+                new_frags = 0
+                for fragment in fragments:
+                    if last_media_sequence is not None and fragment['media_sequence'] <= last_media_sequence:
+                        continue
+                    last_media_sequence = fragment['media_sequence']
+                    frag_index += 1
+                    new_frags += 1
+                    yield {**fragment, 'frag_index': frag_index}
+                if '#EXT-X-ENDLIST' in s:
+                    return
+
+                # The playlist should be reloaded after the target duration,
+                # or half of it if it was unchanged [1]
+                # 1. https://datatracker.ietf.org/doc/html/rfc8216#section-6.3.4
+                mobj = re.search(r'(?m)^#EXT-X-TARGETDURATION:(\d+(?:\.\d+)?)', s)
+                target_duration = float(mobj.group(1)) if mobj else self._LIVE_REFRESH_INTERVAL
+                delay = refreshed + (target_duration if new_frags else target_duration / 2) - time.monotonic()
+                time.sleep(max(0, delay))
+                # The download is stopped gracefully, keeping the fragments downloaded so far
+                for retry in RetryManager(
+                        self.params.get('fragment_retries'), functools.partial(self.report_retry, fatal=False)):
+                    try:
+                        s = self.ydl.urlopen(self._prepare_url(info_dict, man_url)).read().decode('utf-8', 'ignore')
+                    except (HTTPError, TransportError) as err:
+                        retry.error = err
+                        continue
+                if retry.error:
+                    self.report_warning('Unable to refresh the live playlist; the download will be stopped')
+                    return
+                fragments = parse_fragments(s, man_url, skip_init=True)
+                if fragments is None:
+                    return
+
+        fragments = parse_fragments(s, man_url)
+        if fragments is None:
+            return False
+
+        if is_live:
+            fragments = live_fragments(fragments, s)
+        else:
+            fragments = [fragment for fragment in fragments if fragment['frag_index'] > ctx['fragment_index']]
+            # We only download the first fragment during the test
+            if self.params.get('test', False):
+                fragments = [fragments[0] if fragments else None]
 
         if real_downloader:
             info_dict['fragments'] = fragments
@@ -372,7 +432,7 @@ def fin_fragments():
 
                 return output.getvalue().encode()
 
-            if len(fragments) == 1:
+            if not is_live and len(fragments) == 1:
                 self.download_and_append_fragments(ctx, fragments, info_dict)
             else:
                 self.download_and_append_fragments(
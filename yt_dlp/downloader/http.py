@@ -1,5 +1,8 @@
+import concurrent.futures
+import json
 import os
 import random
+import threading
 import time
 
 from .common import FileDownloader
@@ -24,7 +27,30 @@
 from ..utils.networking import HTTPHeaderDict
 
 
+class _Segment:
+    """A byte range of the file, of which the bytes before pos have been written"""
+
+    def __init__(self, start, end, pos=None):
+        self.start, self.end = start, end
+        self.pos = start if pos is None else pos
+        self.worker = self.response = None
+        self.last_progress = time.monotonic()
+
+    @property
+    def remaining(self):
+        return self.end - self.pos + 1
+
+
 class HttpFD(FileDownloader):
+    # Files smaller than twice this are not split, nor are the remaining parts of segments
+    _MIN_SEGMENT_SIZE = 1024 * 1024
+    # A segment without progress for this many seconds is taken over by an idle connection
+    _SEGMENT_STALL_TIMEOUT = 10
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._thread_buffer = threading.local()
+
     def real_download(self, filename, info_dict):
         url = info_dict['url']
         request_data = info_dict.get('request_data', None)
@@ -64,6 +90,14 @@ class DownloadContext(dict):
 
         ctx.is_resume = ctx.resume_len > 0
 
+        connections = self.params.get('http_connections') or 1
+        if (connections > 1 and not is_test and ctx.tmpfilename != '-' and request_data is None
+                and req_start is None and req_end is None
+                and (not ctx.is_resume or os.path.isfile(encodeFilename(self.ytdl_filename(ctx.filename))))):
+            result = self._download_segmented(ctx, info_dict, headers, connections, chunk_size)
+            if result is not None:
+                return result
+
         class SucceedDownload(Exception):
             pass
 
@@ -249,7 +283,8 @@ def retry(e):
             while True:
                 try:
                     # Download and write
-                    data_block = ctx.data.read(block_size if not is_test else min(block_size, data_len - byte_counter))
+                    data_block = self._read_block(
+                        ctx.data, block_size if not is_test else min(block_size, data_len - byte_counter))
                 except TransportError as err:
                     retry(err)
 
@@ -381,3 +416,255 @@ def retry(e):
                 close_stream()
                 raise
         return False
+
+    def _download_segmented(self, ctx, info_dict, headers, connections, chunk_size):
+        """
+        Download the file over several connections, each writing its segments in place
+
+        Returns None if the server does not support range requests or the file is too small.
+        The progress is kept in the .ytdl file as {"downloader": {"total_bytes": ..., "http_segments":
+        [[start, end, pos], ...]}}, so that an interrupted download can be resumed with the same segments
+        """
+        url = info_dict['url']
+        request = Request(url, None, headers)
+        request.headers['Range'] = 'bytes=0-0'
+        try:
+            with self.ydl.urlopen(request) as response:
+                _, _, total = parse_http_range(response.headers.get('Content-Range'))
+        except (HTTPError, TransportError):
+            return None
+        if not total or total < 2 * self._MIN_SEGMENT_SIZE:
+            return None
+
+        min_data_len, max_data_len = self.params.get('min_filesize'), self.params.get('max_filesize')
+        if min_data_len is not None and total < min_data_len:
+            self.to_screen(
+                f'\r[download] File is smaller than min-filesize ({total} bytes < {min_data_len} bytes). Aborting.')
+            return False
+        if max_data_len is not None and total > max_data_len:
+            self.to_screen(
+                f'\r[download] File is larger than max-filesize ({total} bytes > {max_data_len} bytes). Aborting.')
+            return False
+
+        ytdl_filename = encodeFilename(self.ytdl_filename(ctx.filename))
+        segments = self._read_segments(ytdl_filename, ctx.tmpfilename, total)
+        is_resume = bool(segments)
+        if is_resume:
+            self.report_resuming_byte(sum(segment.pos - segment.start for segment in segments))
+        else:
+            size = -(-total // connections)
+            segments = [_Segment(start, min(start + size, total) - 1) for start in range(0, total, size)]
+
+        try:
+            if is_resume:
+                # The segments are written in place, which is not possible in append mode
+                stream = open(encodeFilename(ctx.tmpfilename), 'r+b')
+            else:
+                stream, ctx.tmpfilename = self.sanitize_open(ctx.tmpfilename, 'wb')
+                stream.truncate(total)
+        except OSError as err:
+            self.report_error(f'unable to open for writing: {err}')
+            return False
+        ctx.filename = self.undo_temp_name(ctx.tmpfilename)
+        self.report_destination(ctx.filename)
+        self.to_screen(f'[download] Downloading with {connections} connections')
+        if self.params.get('xattr_set_filesize', False):
+            try:
+                write_xattr(ctx.tmpfilename, 'user.ytdl.filesize', str(total).encode())
+            except (XAttrUnavailableError, XAttrMetadataError) as err:
+                self.report_error(f'unable to set filesize xattr: {err}')
+
+        lock = threading.Lock()
+        aborted = threading.Event()
+        resume_len = sum(segment.pos - segment.start for segment in segments)
+        progress = {'downloaded_bytes': resume_len, 'last_modified': None}
+        start = time.time()
+
+        def write(data, offset):
+            if hasattr(os, 'pwrite'):
+                os.pwrite(stream.fileno(), data, offset)
+            else:
+                stream.seek(offset)
+                stream.write(data)
+
+        def take_segment(worker):
+            with lock:
+                unfinished = [segment for segment in segments if segment.remaining > 0]
+                if not unfinished:
+                    return None
+                segment = next((segment for segment in unfinished if segment.worker is None), None)
+                if segment is None:
+                    now = time.monotonic()
+                    stalled = [segment for segment in unfinished
+                               if now - segment.last_progress > self._SEGMENT_STALL_TIMEOUT]
+                    if stalled:
+                        # Take over the whole segment, the connection of the stalled worker is dropped
+                        segment = min(stalled, key=lambda segment: segment.last_progress)
+                        if segment.response is not None:
+                            segment.response.close()
+                    else:
+                        # Split the largest remaining segment
+                        largest = max(unfinished, key=lambda segment: segment.remaining)
+                        if largest.remaining < 2 * self._MIN_SEGMENT_SIZE:
+                            return ...
+                        middle = largest.pos + largest.remaining // 2
+                        segment = _Segment(middle, largest.end)
+                        largest.end = middle - 1
+                        segments.append(segment)
+                segment.worker, segment.response = worker, None
+                segment.last_progress = time.monotonic()
+                return segment
+
+        def download_segment(segment, worker):
+            block_size = self.params.get('buffersize', 1024)
+            while True:
+                with lock:
+                    if segment.worker is not worker or segment.remaining <= 0 or aborted.is_set():
+                        return
+                    range_start = segment.pos
+                    range_end = segment.end if not chunk_size else min(segment.end, range_start + chunk_size - 1)
+                request = Request(url, None, headers)
+                request.headers['Range'] = f'bytes={range_start}-{range_end}'
+                response = self.ydl.urlopen(request)
+                with lock:
+                    segment.response = response
+                    progress['last_modified'] = progress['last_modified'] or response.headers.get('last-modified')
+                try:
+                    if parse_http_range(response.headers.get('Content-Range'))[0] != range_start:
+                        raise TransportError(f'Server did not return the requested range {range_start}-{range_end}')
+                    byte_counter = 0
+                    before = time.time()
+                    while not aborted.is_set():
+                        data_block = self._read_block(response, block_size)
+                        if not data_block:
+                            break
+                        with lock:
+                            if segment.worker is not worker:
+                                return
+                            data_block = data_block[:max(min(segment.remaining, range_end - segment.pos + 1), 0)]
+                            write(data_block, segment.pos)
+                            segment.pos += len(data_block)
+                            segment.last_progress = time.monotonic()
+                            progress['downloaded_bytes'] += len(data_block)
+                            downloaded_bytes = progress['downloaded_bytes']
+                            # The segment may have been split by another connection
+                            range_end = min(range_end, segment.end)
+                        byte_counter += len(data_block)
+                        if segment.pos > range_end:
+                            break
+                        now = time.time()
+                        self.slow_down(start, now, downloaded_bytes - resume_len)
+                        if not self.params.get('noresizebuffer', False):
+                            block_size = self.best_block_size(now - before, len(data_block))
+                        before = now
+                finally:
+                    response.close()
+                if not aborted.is_set() and segment.worker is worker and segment.pos <= range_end:
+                    raise ContentTooShortError(byte_counter, range_end - range_start + 1)
+
+        def run_worker(worker):
+            while not aborted.is_set():
+                segment = take_segment(worker)
+                if segment is None:
+                    return True
+                elif segment is ...:
+                    # Wait for segments to stall
+                    time.sleep(0.5)
+                    continue
+                for retry in RetryManager(self.params.get('retries'), self.report_retry):
+                    try:
+                        download_segment(segment, worker)
+                    except (TransportError, ContentTooShortError) as err:
+                        if segment.worker is not worker:
+                            break
+                        elif isinstance(err, HTTPError) and not 500 <= err.status < 600:
+                            raise
+                        retry.error = err
+                        continue
+                if retry.error:
+                    return False
+            return True
+
+        def report_progress():
+            now = time.time()
+            downloaded_bytes = progress['downloaded_bytes']
+            self._hook_progress({
+                'status': 'downloading',
+                'downloaded_bytes': downloaded_bytes,
+                'total_bytes': total,
+                'tmpfilename': ctx.tmpfilename,
+                'filename': ctx.filename,
+                'eta': self.calc_eta(start, now, total - resume_len, downloaded_bytes - resume_len),
+                'speed': self.calc_speed(start, now, downloaded_bytes - resume_len),
+                'elapsed': now - ctx.start_time,
+                'ctx_id': info_dict.get('ctx_id'),
+            }, info_dict)
+
+        def write_segments():
+            with lock:
+                state = [[segment.start, segment.end, segment.pos] for segment in segments]
+            self._write_segments(ytdl_filename, total, state)
+
+        success = False
+        with concurrent.futures.ThreadPoolExecutor(connections, thread_name_prefix='yt-dlp-http') as executor:
+            futures = [executor.submit(run_worker, worker) for worker in range(connections)]
+            try:
+                while True:
+                    done, not_done = concurrent.futures.wait(
+                        futures, timeout=0.5, return_when=concurrent.futures.FIRST_EXCEPTION)
+                    report_progress()
+                    write_segments()
+                    success = all(future.result() for future in done)
+                    if not success or not not_done:
+                        break
+            finally:
+                aborted.set()
+                with lock:
+                    for segment in segments:
+                        if segment.response is not None:
+                            segment.response.close()
+                concurrent.futures.wait(futures)
+                write_segments()
+                stream.close()
+
+        if not success or any(segment.remaining > 0 for segment in segments):
+            return False
+
+        self.try_remove(ytdl_filename)
+        self.try_rename(ctx.tmpfilename, ctx.filename)
+        if self.params.get('updatetime', True):
+            info_dict['filetime'] = self.try_utime(ctx.filename, progress['last_modified'])
+
+        self._hook_progress({
+            'downloaded_bytes': total,
+            'total_bytes': total,
+            'filename': ctx.filename,
+            'status': 'finished',
+            'elapsed': time.time() - ctx.start_time,
+            'ctx_id': info_dict.get('ctx_id'),
+        }, info_dict)
+        return True
+
+    def _read_block(self, response, size):
+        """Read up to size bytes into a buffer that is reused by the thread, and return a view of them"""
+        buffer = getattr(self._thread_buffer, 'buffer', None)
+        if buffer is None or len(buffer) < size:
+            buffer = self._thread_buffer.buffer = memoryview(bytearray(size))
+        return buffer[:response.readinto(buffer[:size])]
+
+    def _read_segments(self, ytdl_filename, tmpfilename, total):
+        if not self.params.get('continuedl', True) or self.filesize_or_none(tmpfilename) != total:
+            return None
+        try:
+            with open(ytdl_filename, encoding='utf-8') as f:
+                state = json.load(f)['downloader']
+            if state['total_bytes'] != total:
+                return None
+            return [_Segment(start, end, pos) for start, end, pos in state['http_segments']]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _write_segments(self, ytdl_filename, total, segments):
+        stream, _ = self.sanitize_open(ytdl_filename, 'w')
+        with stream:
+            json.dump({'downloader': {'total_bytes': total, 'http_segments': segments}}, stream)
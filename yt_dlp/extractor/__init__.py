@@ -1,3 +1,4 @@
+from ..compat import functools
 from ..compat.compat_utils import passthrough_module
 
 passthrough_module(__name__, '.extractors')
@@ -35,6 +36,19 @@ def list_extractors(age_limit=None):
     return [ie() for ie in list_extractor_classes(age_limit)]
 
 
+@functools.cache
+def get_url_index():
+    """Returns the URL index of the built-in extractors, or None if it is unavailable"""
+    from .common import _PLUGIN_OVERRIDES
+    from .extractors import _URL_INDEX, _URL_INDEXED_IES
+
+    if _URL_INDEX is None or _PLUGIN_OVERRIDES:
+        return None
+    from ._url_index import URLIndex
+
+    return URLIndex(_URL_INDEX, frozenset(_URL_INDEXED_IES))
+
+
 def get_info_extractor(ie_name):
     """Returns the info extractor class with the given ie_name"""
     from . import extractors
@@ -0,0 +1,226 @@
+"""
+Index of extractors by the words that must appear in the URLs they match
+
+A URL is split into "tokens", i.e. maximal runs of ASCII letters and digits.
+For each extractor, every URL matched by its _VALID_URL must contain at least
+one token from a small set that is derived from the literals of the regex.
+The index maps these tokens to the extractors, so that only a few candidates
+have to be tested with suitable() for a given URL.
+
+The index is built when generating lazy_extractors, since parsing all the regexes is slow
+"""
+
+import ast
+import collections
+import inspect
+import itertools
+import re
+import textwrap
+
+from ..utils import variadic
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+_ALNUM = frozenset('abcdefghijklmnopqrstuvwxyz0123456789')
+# Stands for any (possibly empty) string in the expansions of a regex
+_UNKNOWN = '\0'
+# Stands for a single non-alphanumeric character
+_SEPARATOR = '/'
+# Limit on the number of strings a regex is expanded into
+_MAX_EXPANSIONS = 256
+
+
+def url_tokens(url):
+    """Return the set of tokens in the URL, or None if the URL cannot be looked up in the index"""
+    if not url.isascii():
+        # Case-insensitive regexes may match non-ASCII characters to ASCII letters
+        return None
+    return set(_TOKEN_RE.findall(url.lower()))
+
+
+def _sre_modules():
+    try:
+        import re._constants as sre_constants
+        import re._parser as sre_parse
+    except ImportError:  # Python < 3.11
+        import sre_constants
+        import sre_parse
+    return sre_parse, sre_constants
+
+
+def _is_separator(code):
+    return code < 128 and chr(code).lower() not in _ALNUM
+
+
+def _expand(tokens, c):
+    """Expand a parsed regex into a list of strings made of literals, _SEPARATOR and _UNKNOWN"""
+    expansions = ['']
+    for op, av in tokens:
+        if op is c.LITERAL:
+            options = [chr(av).lower() if av < 128 else _UNKNOWN]
+        elif op is c.IN:
+            if all(item_op is c.LITERAL and _is_separator(item_av)
+                   or item_op is c.RANGE and all(map(_is_separator, range(item_av[0], item_av[1] + 1)))
+                   for item_op, item_av in av):
+                options = [_SEPARATOR]
+            else:
+                options = [_UNKNOWN]
+        elif op in (c.AT, c.ASSERT, c.ASSERT_NOT):
+            continue
+        elif op is c.SUBPATTERN:
+            options = _expand(av[-1], c)
+        elif op is c.BRANCH:
+            options = list(itertools.chain.from_iterable(_expand(branch, c) for branch in av[1]))
+        elif op in (c.MAX_REPEAT, c.MIN_REPEAT, getattr(c, 'POSSESSIVE_REPEAT', None)):
+            min_count, max_count, sub = av
+            if max_count == 0:
+                continue
+            elif min_count == max_count == 1:
+                options = _expand(sub, c)
+            elif min_count == 0 and max_count == 1:
+                options = ['', *_expand(sub, c)]
+            else:
+                options = [_UNKNOWN]
+        else:
+            options = [_UNKNOWN]
+
+        expansions = list(dict.fromkeys(a + b for a, b in itertools.product(expansions, options)))
+        if len(expansions) > _MAX_EXPANSIONS:
+            raise ValueError('Too many expansions')
+    return expansions
+
+
+def _guaranteed_tokens(expansion):
+    """Tokens that are certainly delimited by non-alphanumeric characters in the expansion"""
+    # The match always begins at the start of the URL, but may be followed by anything
+    expansion += _UNKNOWN
+    for mobj in _TOKEN_RE.finditer(expansion):
+        start, end = mobj.span()
+        if (start == 0 or expansion[start - 1] != _UNKNOWN) and expansion[end] != _UNKNOWN:
+            yield mobj.group()
+
+
+def valid_url_tokens(valid_url):
+    """
+    Return a list of sets of tokens, one for each way the regex(es) can match.
+    Each match contains at least one token of the corresponding set.
+    Returns None if some match is not guaranteed to contain any token
+    """
+    sre_parse, sre_constants = _sre_modules()
+    token_sets = []
+    for regex in variadic(valid_url):
+        try:
+            expansions = _expand(sre_parse.parse(regex), sre_constants)
+        except ValueError:
+            return None
+        for expansion in expansions:
+            tokens = set(_guaranteed_tokens(expansion))
+            if not tokens:
+                return None
+            token_sets.append(tokens)
+    return token_sets
+
+
+def _is_valid_url_check(node):
+    """Whether the expression is super().suitable(url) or cls._match_valid_url(url)"""
+    if not isinstance(node, ast.Call) or not isinstance(node.func, ast.Attribute):
+        return False
+    func = node.func
+    if func.attr == 'suitable':
+        return isinstance(func.value, ast.Call) and getattr(func.value.func, 'id', None) == 'super'
+    return func.attr == '_match_valid_url' and getattr(func.value, 'id', None) == 'cls'
+
+
+def _is_narrowing(node):
+    """Whether the expression can only be truthy if the URL matches _VALID_URL"""
+    if isinstance(node, ast.Constant):
+        return not node.value
+    elif isinstance(node, ast.BoolOp):
+        return isinstance(node.op, ast.And) and any(map(_is_narrowing, node.values))
+    elif isinstance(node, ast.IfExp):
+        return _is_narrowing(node.body) and _is_narrowing(node.orelse)
+    return _is_valid_url_check(node)
+
+
+def _only_narrows_valid_url(func):
+    """Whether an overridden suitable() only rejects some of the URLs matching _VALID_URL"""
+    try:
+        tree = ast.parse(textwrap.dedent(inspect.getsource(func)))
+    except (OSError, TypeError, SyntaxError):
+        return False
+    for stmt in tree.body[0].body:
+        if isinstance(stmt, ast.Return):
+            return stmt.value is not None and _is_narrowing(stmt.value)
+        elif (isinstance(stmt, ast.If) and isinstance(stmt.test, ast.UnaryOp) and isinstance(stmt.test.op, ast.Not)
+                and _is_valid_url_check(stmt.test.operand)):
+            # Everything below is only reached if the URL matches
+            return True
+        elif any(isinstance(node, ast.Return) and not (node.value is None or _is_narrowing(node.value))
+                 for node in ast.walk(stmt)):
+            return False
+    return True
+
+
+def _is_indexable(ie):
+    from .common import InfoExtractor
+
+    if ie._match_valid_url.__func__ is not InfoExtractor._match_valid_url.__func__:
+        return False
+    for klass in ie.__mro__:
+        if klass is InfoExtractor:
+            return True
+        elif 'suitable' in klass.__dict__ and not _only_narrows_valid_url(klass.suitable.__func__):
+            return False
+    return False
+
+
+def build_url_index(ie_classes):
+    """
+    Build the URL index for the given extractor classes
+
+    Returns a dict mapping tokens to the keys of the extractors that may match URLs
+    containing them, and the set of keys of all extractors that are covered by the index
+    """
+    all_token_sets = {}
+    for ie in ie_classes:
+        if not _is_indexable(ie):
+            continue
+        token_sets = [] if ie._VALID_URL is False else valid_url_tokens(ie._VALID_URL)
+        if token_sets is not None:
+            all_token_sets[ie.ie_key()] = token_sets
+
+    # Index each way of matching by its least common token
+    frequency = collections.Counter(
+        token for token_sets in all_token_sets.values() for token in set().union(*token_sets))
+    index = collections.defaultdict(set)
+    for ie_key, token_sets in all_token_sets.items():
+        for tokens in token_sets:
+            index[min(tokens, key=lambda token: (frequency[token], token))].add(ie_key)
+    return {token: sorted(keys) for token, keys in sorted(index.items())}, set(all_token_sets)
+
+
+class URLIndex:
+    def __init__(self, index, indexed_keys):
+        self._index = index
+        self._indexed_keys = indexed_keys
+        self._orderings = {}
+
+    def _get_ordering(self, ie_keys):
+        """Positions of the given extractor keys and the ones among them that are not indexed"""
+        if ie_keys not in self._orderings:
+            if len(self._orderings) > 8:
+                self._orderings.clear()
+            self._orderings[ie_keys] = (
+                {key: position for position, key in enumerate(ie_keys)},
+                [key for key in ie_keys if key not in self._indexed_keys])
+        return self._orderings[ie_keys]
+
+    def candidate_keys(self, url, ie_keys):
+        """Filter the extractor keys down to the ones that may be suitable for the URL, keeping their order"""
+        ie_keys = tuple(ie_keys)
+        tokens = url_tokens(url)
+        if tokens is None:
+            return list(ie_keys)
+        positions, unindexed_keys = self._get_ordering(ie_keys)
+        candidates = {key for token in tokens for key in self._index.get(token, ()) if key in positions}
+        candidates.update(unindexed_keys)
+        return sorted(candidates, key=positions.__getitem__)
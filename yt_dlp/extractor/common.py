@@ -44,6 +44,7 @@
     NO_DEFAULT,
     ExtractorError,
     FormatSorter,
+    FragmentSequence,
     GeoRestrictedError,
     GeoUtils,
     LenientJSONDecoder,
@@ -90,6 +91,7 @@
     unescapeHTML,
     unified_strdate,
     unified_timestamp,
+    update_url_query,
     url_basename,
     url_or_none,
     urlhandle_detect_ext,
@@ -189,7 +191,8 @@ class InfoExtractor:
                                  Base URL for fragments. Each fragment's path
                                  value (if present) will be relative to
                                  this URL.
-                    * fragments  A list of fragments of a fragmented media.
+                    * fragments  A list of fragments of a fragmented media,
+                                 or a FragmentSequence that generates them.
                                  Each fragment entry must contain either an url
                                  or a path. If an url is present it should be
                                  considered by a client. Otherwise both path and
@@ -2048,6 +2051,10 @@ def _extract_m3u8_formats_and_subtitles(
             return [], {}
 
         m3u8_doc, urlh = res
+        # Media playlists are downloaded again by HlsFD
+        if self._downloader and data is None and '#EXT-X-TARGETDURATION' in m3u8_doc:
+            self._downloader._cache_manifest({urlh.url, *(
+                [update_url_query(m3u8_url, query)] if isinstance(m3u8_url, str) else [])}, m3u8_doc, urlh.url)
         m3u8_url = urlh.url
 
         return self._parse_m3u8_formats_and_subtitles(
@@ -2656,7 +2663,7 @@ def _merge_mpd_periods(self, periods):
                 if format_key not in formats:
                     formats[format_key] = f
                 elif 'fragments' in f:
-                    formats[format_key].setdefault('fragments', []).extend(f['fragments'])
+                    formats[format_key].setdefault('fragments', FragmentSequence()).extend(f['fragments'])
 
             if subtitles and period['subtitles']:
                 self.report_warning(bug_reports_message(
@@ -2748,6 +2755,10 @@ def extract_Initialization(source):
             return ms_info
 
         mpd_duration = parse_duration(mpd_doc.get('mediaPresentationDuration'))
+        # Segments of live streams are available from this time on [1, 5.3.9.5.3]
+        availability_start_time = (
+            parse_iso8601(mpd_doc.get('availabilityStartTime')) if mpd_doc.get('type') == 'dynamic' else None)
+        time_shift_buffer_depth = parse_duration(mpd_doc.get('timeShiftBufferDepth'))
         stream_numbers = collections.defaultdict(int)
         for period_idx, period in enumerate(mpd_doc.findall(_add_ns('Period'))):
             period_entry = {
@@ -2756,6 +2767,7 @@ def extract_Initialization(source):
                 'subtitles': collections.defaultdict(list),
             }
             period_duration = parse_duration(period.get('duration')) or mpd_duration
+            period_start = parse_duration(period.get('start')) or 0
             period_ms_info = extract_multisegment_info(period, {
                 'start_number': 1,
                 'timescale': 1,
@@ -2902,47 +2914,40 @@ def location_key(location):
                             segment_duration = None
                             if 'total_number' not in representation_ms_info and 'segment_duration' in representation_ms_info:
                                 segment_duration = float_or_none(representation_ms_info['segment_duration'], representation_ms_info['timescale'])
-                                representation_ms_info['total_number'] = int(math.ceil(
-                                    float_or_none(period_duration, segment_duration, default=0)))
-                            representation_ms_info['fragments'] = [{
-                                media_location_key: media_template % {
-                                    'Number': segment_number,
-                                    'Bandwidth': bandwidth,
-                                },
-                                'duration': segment_duration,
-                            } for segment_number in range(
-                                representation_ms_info['start_number'],
-                                representation_ms_info['total_number'] + representation_ms_info['start_number'])]
+                                if availability_start_time is not None and not period_duration and segment_duration:
+                                    # Only the segments that have been completed and are still in the time shift buffer
+                                    available = max(int(
+                                        (time.time() - availability_start_time - period_start) // segment_duration), 0)
+                                    first = 0
+                                    if time_shift_buffer_depth:
+                                        first = max(available - math.ceil(time_shift_buffer_depth / segment_duration), 0)
+                                    representation_ms_info['start_number'] += first
+                                    representation_ms_info['total_number'] = available - first
+                                else:
+                                    representation_ms_info['total_number'] = int(math.ceil(
+                                        float_or_none(period_duration, segment_duration, default=0)))
+                            representation_ms_info['fragments'] = FragmentSequence()
+                            representation_ms_info['fragments'].extend_template(
+                                media_location_key, media_template, {'Bandwidth': bandwidth},
+                                representation_ms_info['total_number'], segment_duration,
+                                number=representation_ms_info['start_number'])
                         else:
                             # $Number*$ or $Time$ in media template with S list available
                             # Example $Number*$: http://www.svtplay.se/klipp/9023742/stopptid-om-bjorn-borg
                             # Example $Time$: https://play.arkena.com/embed/avp/v2/player/media/b41dda37-d8e7-4d3f-b1b5-9a9db578bdfe/1/129411
-                            representation_ms_info['fragments'] = []
+                            representation_ms_info['fragments'] = FragmentSequence()
                             segment_time = 0
-                            segment_d = None
                             segment_number = representation_ms_info['start_number']
-
-                            def add_segment_url():
-                                segment_url = media_template % {
-                                    'Time': segment_time,
-                                    'Bandwidth': bandwidth,
-                                    'Number': segment_number,
-                                }
-                                representation_ms_info['fragments'].append({
-                                    media_location_key: segment_url,
-                                    'duration': float_or_none(segment_d, representation_ms_info['timescale']),
-                                })
-
                             for s in representation_ms_info['s']:
                                 segment_time = s.get('t') or segment_time
                                 segment_d = s['d']
-                                add_segment_url()
-                                segment_number += 1
-                                for _ in range(s.get('r', 0)):
-                                    segment_time += segment_d
-                                    add_segment_url()
-                                    segment_number += 1
-                                segment_time += segment_d
+                                segment_count = max(s.get('r', 0), 0) + 1
+                                representation_ms_info['fragments'].extend_template(
+                                    media_location_key, media_template, {'Bandwidth': bandwidth}, segment_count,
+                                    float_or_none(segment_d, representation_ms_info['timescale']),
+                                    number=segment_number, time=segment_time, time_step=segment_d)
+                                segment_number += segment_count
+                                segment_time += segment_count * segment_d
                     elif 'segment_urls' in representation_ms_info and 's' in representation_ms_info:
                         # No media template,
                         # e.g. https://www.youtube.com/watch?v=iXZV5uAYMJI
@@ -2985,7 +2990,7 @@ def add_segment_url():
                             # NB: mpd_url may be empty when MPD manifest is parsed from a string
                             'url': mpd_url or base_url,
                             'fragment_base_url': base_url,
-                            'fragments': [],
+                            'fragments': FragmentSequence(),
                             'protocol': 'http_dash_segments' if mime_type != 'image/jpeg' else 'mhtml',
                         })
                         if 'initialization_url' in representation_ms_info:
@@ -7,11 +7,14 @@
 _PLUGIN_CLASSES = load_plugins('extractor', 'IE')
 
 _LAZY_LOADER = False
+_URL_INDEX = _URL_INDEXED_IES = None
 if not os.environ.get('YTDLP_NO_LAZY_EXTRACTORS'):
     with contextlib.suppress(ImportError):
         from .lazy_extractors import *  # noqa: F403
         from .lazy_extractors import _ALL_CLASSES
         _LAZY_LOADER = True
+        with contextlib.suppress(ImportError):
+            from .lazy_extractors import _URL_INDEX, _URL_INDEXED_IES  # noqa: F401
 
 if not _LAZY_LOADER:
     from ._extractors import *  # noqa: F403
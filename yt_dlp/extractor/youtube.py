@@ -1,6 +1,7 @@
 import base64
 import calendar
 import collections
+import concurrent.futures
 import copy
 import datetime as dt
 import enum
@@ -711,6 +712,27 @@ def generate_api_headers(
             headers['X-Origin'] = origin
         return filter_dict(headers)
 
+    # The client configs, the player URL and the signature timestamps are the same for all the videos.
+    # So they are shared by the extractors of the process, and kept in the cache dir between runs
+    _SHARED_DATA_TTL = 60 * 60
+    _shared_data = {}
+    _shared_data_lock = threading.Lock()
+
+    def _load_shared_data(self, key, max_age=None):
+        with self._shared_data_lock:
+            if key not in self._shared_data:
+                self._shared_data[key] = self.cache.load('youtube-shared', key)
+            timestamp, data = self._shared_data[key] or (0, None)
+        if time.time() - timestamp > (self._SHARED_DATA_TTL if max_age is None else max_age):
+            return None
+        return copy.deepcopy(data)
+
+    def _store_shared_data(self, key, data):
+        entry = [time.time(), data]
+        with self._shared_data_lock:
+            self._shared_data[key] = entry
+        self.cache.store('youtube-shared', key, entry)
+
     def _download_ytcfg(self, client, video_id):
         url = {
             'web': 'https://www.youtube.com',
@@ -719,9 +741,16 @@ def _download_ytcfg(self, client, video_id):
         }.get(client)
         if not url:
             return {}
-        webpage = self._download_webpage(
-            url, video_id, fatal=False, note=f'Downloading {client.replace("_", " ").strip()} client config')
-        return self.extract_ytcfg(video_id, webpage) or {}
+        # The configs of logged-in users hold their session, so they are not shared
+        cache_key = not self.is_authenticated and f'ytcfg-{client}'
+        ytcfg = cache_key and self._load_shared_data(cache_key)
+        if not ytcfg:
+            webpage = self._download_webpage(
+                url, video_id, fatal=False, note=f'Downloading {client.replace("_", " ").strip()} client config')
+            ytcfg = self.extract_ytcfg(video_id, webpage) or {}
+            if cache_key and ytcfg:
+                self._store_shared_data(cache_key, ytcfg)
+        return ytcfg
 
     @staticmethod
     def _build_api_continuation_query(continuation, ctp=None):
@@ -1175,6 +1204,8 @@ class YoutubeIE(YoutubeBaseInfoExtractor):
             \s[^>]*\bclass="[^"]*\blazy-load-youtube''',
     ]
     _RETURN_TYPE = 'video'  # XXX: How to handle multifeed?
+    # Number of clients whose player responses are requested concurrently
+    _PLAYER_RESPONSE_WORKERS = 4
 
     _PLAYER_INFO_RE = (
         r'/s/player/(?P<id>[a-zA-Z0-9_-]{8,})/player',
@@ -1291,6 +1322,8 @@ class YoutubeIE(YoutubeBaseInfoExtractor):
         '401': {'ext': 'mp4', 'height': 2160, 'format_note': 'DASH video', 'vcodec': 'av01.0.12M.08'},
     }
     _SUBTITLE_FORMATS = ('json3', 'srv1', 'srv2', 'srv3', 'ttml', 'vtt')
+    # Number of decrypted nsig values that are kept in the cache per player
+    _NSIG_RESULTS_CACHE_SIZE = 1000
 
     _GEO_BYPASS = False
 
@@ -2782,6 +2815,12 @@ def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._code_cache = {}
         self._player_cache = {}
+        self._nsig_results = {}
+        # The player responses of the clients are extracted concurrently
+        self._code_cache_lock = threading.Lock()
+        # Videos can be extracted concurrently (--concurrent-entries), but the functions extracted
+        # by JSInterpreter keep their arguments in a shared scope, so their calls must not overlap
+        self._player_cache_lock = threading.RLock()
 
     def _prepare_live_from_start_formats(self, formats, video_id, live_start_time, url, webpage_url, smuggled_data, is_live):
         lock = threading.Lock()
@@ -2976,13 +3015,14 @@ def _extract_player_info(cls, player_url):
 
     def _load_player(self, video_id, player_url, fatal=True):
         player_id = self._extract_player_info(player_url)
-        if player_id not in self._code_cache:
-            code = self._download_webpage(
-                player_url, video_id, fatal=fatal,
-                note='Downloading player ' + player_id,
-                errnote=f'Download of {player_url} failed')
-            if code:
-                self._code_cache[player_id] = code
+        with self._code_cache_lock:
+            if player_id not in self._code_cache:
+                code = self._download_webpage(
+                    player_url, video_id, fatal=fatal,
+                    note='Downloading player ' + player_id,
+                    errnote=f'Download of {player_url} failed')
+                if code:
+                    self._code_cache[player_id] = code
         return self._code_cache.get(player_id)
 
     def _extract_signature_function(self, video_id, player_url, example_sig):
@@ -3065,19 +3105,24 @@ def _parse_sig_js(self, jscode):
 
         jsi = JSInterpreter(jscode)
         initial_function = jsi.extract_function(funcname)
-        return lambda s: initial_function([s])
+
+        def decrypt_sig(s):
+            with self._player_cache_lock:
+                return initial_function([s])
+        return decrypt_sig
 
     def _cached(self, func, *cache_id):
         def inner(*args, **kwargs):
-            if cache_id not in self._player_cache:
-                try:
-                    self._player_cache[cache_id] = func(*args, **kwargs)
-                except ExtractorError as e:
-                    self._player_cache[cache_id] = e
-                except Exception as e:
-                    self._player_cache[cache_id] = ExtractorError(traceback.format_exc(), cause=e)
+            with self._player_cache_lock:
+                if cache_id not in self._player_cache:
+                    try:
+                        self._player_cache[cache_id] = func(*args, **kwargs)
+                    except ExtractorError as e:
+                        self._player_cache[cache_id] = e
+                    except Exception as e:
+                        self._player_cache[cache_id] = ExtractorError(traceback.format_exc(), cause=e)
+                ret = self._player_cache[cache_id]
 
-            ret = self._player_cache[cache_id]
             if isinstance(ret, Exception):
                 raise ret
             return ret
@@ -3097,16 +3142,24 @@ def _decrypt_nsig(self, s, video_id, player_url):
             raise ExtractorError('Cannot decrypt nsig without player_url')
         player_url = urljoin('https://www.youtube.com', player_url)
 
+        print_sig_code = self.get_param('youtube_print_sig_code')
+        nsig_results = self._load_nsig_results(player_url)
+        # NB: Another thread may evict the result at any time
+        cached_result = nsig_results.get(s)
+        if cached_result is not None and not print_sig_code:
+            self.write_debug(f'Decrypted nsig {s} => {cached_result} (cached)')
+            return cached_result
+
         try:
             jsi, player_id, func_code = self._extract_n_function_code(video_id, player_url)
         except ExtractorError as e:
             raise ExtractorError('Unable to extract nsig function code', cause=e)
-        if self.get_param('youtube_print_sig_code'):
+        if print_sig_code:
             self.to_screen(f'Extracted nsig function from {player_id}:\n{func_code[1]}\n')
 
         try:
             extract_nsig = self._cached(self._extract_n_function_from_code, 'nsig func', player_url)
-            ret = extract_nsig(jsi, func_code)(s)
+            ret = extract_nsig(jsi, func_code, player_id)(s)
         except JSInterpreter.Exception as e:
             try:
                 jsi = PhantomJSwrapper(self, timeout=5000)
@@ -3123,8 +3176,29 @@ def _decrypt_nsig(self, s, video_id, player_url):
                 video_id=video_id, note='Executing signature code').strip()
 
         self.write_debug(f'Decrypted nsig {s} => {ret}')
+        self._store_nsig_result(player_url, s, ret)
         return ret
 
+    def _load_nsig_results(self, player_url):
+        """Previously decrypted nsig values for the player, shared between processes through the cache"""
+        player_id = self._extract_player_info(player_url)
+        with self._player_cache_lock:
+            if player_id not in self._nsig_results:
+                self._nsig_results[player_id] = self.cache.load(
+                    'youtube-nsig-results', player_id, min_ver='2024.05.27') or {}
+            return self._nsig_results[player_id]
+
+    def _store_nsig_result(self, player_url, s, ret):
+        with self._player_cache_lock:
+            nsig_results = self._load_nsig_results(player_url)
+            if nsig_results.get(s) == ret:
+                return
+            nsig_results[s] = ret
+            # Keep only the most recent results
+            for key in list(nsig_results)[:-self._NSIG_RESULTS_CACHE_SIZE]:
+                del nsig_results[key]
+            self.cache.store('youtube-nsig-results', self._extract_player_info(player_url), nsig_results)
+
     def _extract_n_function_name(self, jscode):
         funcname, idx = self._search_regex(
             r'\.get\("n"\)\)&&\(b=(?P<nfunc>[a-zA-Z0-9$]+)(?:\[(?P<idx>\d+)\])?\([a-zA-Z0-9]\)',
@@ -3162,12 +3236,22 @@ def _extract_n_function_code(self, video_id, player_url):
         self.cache.store('youtube-nsig', player_id, func_code)
         return jsi, player_id, func_code
 
-    def _extract_n_function_from_code(self, jsi, func_code):
-        func = jsi.extract_function_from_code(*func_code)
+    def _extract_n_function_from_code(self, jsi, func_code, player_id=None):
+        # The compiled form skips parsing the function code again. It is stored with
+        # a hash of the function code, so that it is rebuilt if the code is re-extracted
+        code_hash = hashlib.sha256(func_code[1].encode()).hexdigest()
+        cached = player_id and self.cache.load('youtube-nsig-compiled', player_id, min_ver='2024.05.27')
+        compiled = cached[1] if cached and cached[0] == code_hash else None
+        if not compiled or compiled[0] != list(func_code[0]):
+            compiled = jsi.compile_function_code(*func_code)
+            if player_id:
+                self.cache.store('youtube-nsig-compiled', player_id, [code_hash, compiled])
+        func = jsi.build_compiled_function(compiled)
 
         def extract_nsig(s):
             try:
-                ret = func([s])
+                with self._player_cache_lock:
+                    ret = func([s])
             except JSInterpreter.Exception:
                 raise
             except Exception as e:
@@ -3196,11 +3280,17 @@ def _extract_signature_timestamp(self, video_id, player_url, ytcfg=None, fatal=F
                     raise ExtractorError(error_msg)
                 self.report_warning(error_msg)
                 return
-            code = self._load_player(video_id, player_url, fatal=fatal)
-            if code:
-                sts = int_or_none(self._search_regex(
-                    r'(?:signatureTimestamp|sts)\s*:\s*(?P<sts>[0-9]{5})', code,
-                    'JS player signature timestamp', group='sts', fatal=fatal))
+            # The signature timestamp of a player never changes
+            cache_key = f'sts-{self._extract_player_info(player_url)}'
+            sts = self._load_shared_data(cache_key, max_age=float('inf'))
+            if not sts:
+                code = self._load_player(video_id, player_url, fatal=fatal)
+                if code:
+                    sts = int_or_none(self._search_regex(
+                        r'(?:signatureTimestamp|sts)\s*:\s*(?P<sts>[0-9]{5})', code,
+                        'JS player signature timestamp', group='sts', fatal=fatal))
+                if sts:
+                    self._store_shared_data(cache_key, sts)
         return sts
 
     def _mark_watched(self, video_id, player_responses):
@@ -3720,8 +3810,43 @@ def _extract_player_responses(self, clients, video_id, webpage, master_ytcfg, sm
             # See: https://github.com/yt-dlp/yt-dlp/issues/501
             prs.append({**initial_pr, 'streamingData': None})
 
+        tried_iframe_fallback = False
+        player_url = None
+        lock = threading.Lock()
+
+        def fetch_player_response(client):
+            nonlocal player_url, tried_iframe_fallback
+            player_ytcfg = master_ytcfg if client == 'web' else {}
+            if 'configs' not in self._configuration_arg('player_skip') and client != 'web':
+                player_ytcfg = self._download_ytcfg(client, video_id) or player_ytcfg
+
+            with lock:
+                player_url = player_url or self._extract_player_url(master_ytcfg, player_ytcfg, webpage=webpage)
+                require_js_player = self._get_default_ytcfg(client).get('REQUIRE_JS_PLAYER')
+                if 'js' in self._configuration_arg('player_skip'):
+                    require_js_player = False
+                    player_url = None
+
+                if not player_url and not tried_iframe_fallback and require_js_player:
+                    # The player URL of an earlier video saves the request to the iframe API
+                    player_url = self._load_shared_data('player_url') or self._download_player_url(video_id)
+                    tried_iframe_fallback = True
+                client_player_url = player_url if require_js_player else None
+
+            return initial_pr if client == 'web' and initial_pr else self._extract_player_response(
+                client, video_id, player_ytcfg or master_ytcfg, player_ytcfg, client_player_url, initial_pr, smuggled_data)
+
+        # The requests of the clients are independent, so they are all started at once. But their
+        # responses are still handled in order, since that decides the fallback clients and the
+        # priority of the formats. The fallback clients are handled right after the client they replace
+        executor = concurrent.futures.ThreadPoolExecutor(
+            min(len(clients), self._PLAYER_RESPONSE_WORKERS), thread_name_prefix='yt-dlp-player')
+
+        def submit(client_name):
+            return client_name, executor.submit(fetch_player_response, _split_innertube_client(client_name)[0])
+
         all_clients = set(clients)
-        clients = clients[::-1]
+        clients = [submit(client_name) for client_name in clients][::-1]
 
         def append_client(*client_names):
             """ Append the first client name that exists but not already used """
@@ -3729,55 +3854,45 @@ def append_client(*client_names):
                 actual_client = _split_innertube_client(client_name)[0]
                 if actual_client in INNERTUBE_CLIENTS:
                     if actual_client not in all_clients:
-                        clients.append(client_name)
+                        clients.append(submit(client_name))
                         all_clients.add(actual_client)
                         return
 
-        tried_iframe_fallback = False
-        player_url = None
         skipped_clients = {}
-        while clients:
-            client, base_client, variant = _split_innertube_client(clients.pop())
-            player_ytcfg = master_ytcfg if client == 'web' else {}
-            if 'configs' not in self._configuration_arg('player_skip') and client != 'web':
-                player_ytcfg = self._download_ytcfg(client, video_id) or player_ytcfg
-
-            player_url = player_url or self._extract_player_url(master_ytcfg, player_ytcfg, webpage=webpage)
-            require_js_player = self._get_default_ytcfg(client).get('REQUIRE_JS_PLAYER')
-            if 'js' in self._configuration_arg('player_skip'):
-                require_js_player = False
-                player_url = None
-
-            if not player_url and not tried_iframe_fallback and require_js_player:
-                player_url = self._download_player_url(video_id)
-                tried_iframe_fallback = True
-
-            try:
-                pr = initial_pr if client == 'web' and initial_pr else self._extract_player_response(
-                    client, video_id, player_ytcfg or master_ytcfg, player_ytcfg, player_url if require_js_player else None, initial_pr, smuggled_data)
-            except ExtractorError as e:
-                self.report_warning(e)
-                continue
+        try:
+            while clients:
+                client_name, future = clients.pop()
+                client, base_client, variant = _split_innertube_client(client_name)
+                try:
+                    pr = future.result()
+                except ExtractorError as e:
+                    self.report_warning(e)
+                    continue
 
-            if pr_id := self._invalid_player_response(pr, video_id):
-                skipped_clients[client] = pr_id
-            elif pr:
-                # Save client name for introspection later
-                name = short_client_name(client)
-                sd = traverse_obj(pr, ('streamingData', {dict})) or {}
-                sd[STREAMING_DATA_CLIENT_NAME] = name
-                for f in traverse_obj(sd, (('formats', 'adaptiveFormats'), ..., {dict})):
-                    f[STREAMING_DATA_CLIENT_NAME] = name
-                prs.append(pr)
-
-            # creator clients can bypass AGE_VERIFICATION_REQUIRED if logged in
-            if variant == 'embedded' and self._is_unplayable(pr) and self.is_authenticated:
-                append_client(f'{base_client}_creator')
-            elif self._is_agegated(pr):
-                if variant == 'tv_embedded':
-                    append_client(f'{base_client}_embedded')
-                elif not variant:
-                    append_client(f'tv_embedded.{base_client}', f'{base_client}_embedded')
+                if pr_id := self._invalid_player_response(pr, video_id):
+                    skipped_clients[client] = pr_id
+                elif pr:
+                    # Save client name for introspection later
+                    name = short_client_name(client)
+                    sd = traverse_obj(pr, ('streamingData', {dict})) or {}
+                    sd[STREAMING_DATA_CLIENT_NAME] = name
+                    for f in traverse_obj(sd, (('formats', 'adaptiveFormats'), ..., {dict})):
+                        f[STREAMING_DATA_CLIENT_NAME] = name
+                    prs.append(pr)
+
+                # creator clients can bypass AGE_VERIFICATION_REQUIRED if logged in
+                if variant == 'embedded' and self._is_unplayable(pr) and self.is_authenticated:
+                    append_client(f'{base_client}_creator')
+                elif self._is_agegated(pr):
+                    if variant == 'tv_embedded':
+                        append_client(f'{base_client}_embedded')
+                    elif not variant:
+                        append_client(f'tv_embedded.{base_client}', f'{base_client}_embedded')
+        finally:
+            # The requests that are no longer needed, e.g. after an error, are not started
+            for _, future in clients:
+                future.cancel()
+            executor.shutdown()
 
         if skipped_clients:
             self.report_warning(
@@ -3788,6 +3903,8 @@ def append_client(*client_names):
                     'All player responses are invalid. Your IP is likely being blocked by Youtube', expected=True)
         elif not prs:
             raise ExtractorError('Failed to extract any player response')
+        if player_url and player_url != self._load_shared_data('player_url'):
+            self._store_shared_data('player_url', player_url)
         return prs, player_url
 
     def _needs_live_processing(self, live_status, duration):
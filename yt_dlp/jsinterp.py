@@ -1,5 +1,6 @@
 import collections
 import contextlib
+import functools
 import itertools
 import json
 import math
@@ -212,9 +213,12 @@ class JSInterpreter:
         'y': 4096,  # Perform a "sticky" search that matches starting at the current position in the target string
     }
 
-    def __init__(self, code, objects=None):
+    def __init__(self, code, objects=None, *, compile_statements=True):
         self.code, self._functions = code, {}
         self._objects = {} if objects is None else objects
+        # Function bodies are parsed once into closures, unless the statements are to be interpreted directly
+        self._compile_statements = compile_statements
+        self._compiled_code = {}
 
     class Exception(ExtractorError):  # noqa: A001
         def __init__(self, msg, expr=None, *args, **kwargs):
@@ -222,11 +226,15 @@ def __init__(self, msg, expr=None, *args, **kwargs):
                 msg = f'{msg.rstrip()} in: {truncate_string(expr, 50, 50)}'
             super().__init__(msg, *args, **kwargs)
 
-    def _named_object(self, namespace, obj):
+    def _next_object_id(self):
         self.__named_object_counter += 1
-        name = f'__yt_dlp_jsinterp_obj{self.__named_object_counter}'
+        return self.__named_object_counter
+
+    def _named_object(self, namespace, obj):
+        obj_id = self._next_object_id()
+        name = f'__yt_dlp_jsinterp_obj{obj_id}'
         if callable(obj) and not isinstance(obj, function_with_repr):
-            obj = function_with_repr(obj, f'F<{self.__named_object_counter}>')
+            obj = function_with_repr(obj, f'F<{obj_id}>')
         namespace[name] = obj
         return name
 
@@ -324,6 +332,108 @@ def _dump(self, obj, namespace):
         except TypeError:
             return self._named_object(namespace, obj)
 
+    def _get_object(self, variable, local_vars, nullish=False):
+        types = {
+            'String': str,
+            'Math': float,
+        }
+        obj = local_vars.get(variable, types.get(variable, NO_DEFAULT))
+        if obj is NO_DEFAULT:
+            if variable not in self._objects:
+                try:
+                    self._objects[variable] = self.extract_object(variable)
+                except self.Exception:
+                    if not nullish:
+                        raise
+            obj = self._objects.get(variable, JS_Undefined)
+        return obj
+
+    def _call_method(self, obj, member, argvals, expr, allow_recursion):
+        def assertion(cndn, msg):
+            """ assert, but without risk of getting optimized out """
+            if not cndn:
+                raise self.Exception(f'{member} {msg}', expr)
+
+        if obj == str:
+            if member == 'fromCharCode':
+                assertion(argvals, 'takes one or more arguments')
+                return ''.join(map(chr, argvals))
+            raise self.Exception(f'Unsupported String method {member}', expr)
+        elif obj == float:
+            if member == 'pow':
+                assertion(len(argvals) == 2, 'takes two arguments')
+                return argvals[0] ** argvals[1]
+            raise self.Exception(f'Unsupported Math method {member}', expr)
+
+        if member == 'split':
+            assertion(argvals, 'takes one or more arguments')
+            assertion(len(argvals) == 1, 'with limit argument is not implemented')
+            return obj.split(argvals[0]) if argvals[0] else list(obj)
+        elif member == 'join':
+            assertion(isinstance(obj, list), 'must be applied on a list')
+            assertion(len(argvals) == 1, 'takes exactly one argument')
+            return argvals[0].join(obj)
+        elif member == 'reverse':
+            assertion(not argvals, 'does not take any arguments')
+            obj.reverse()
+            return obj
+        elif member == 'slice':
+            assertion(isinstance(obj, list), 'must be applied on a list')
+            assertion(len(argvals) == 1, 'takes exactly one argument')
+            return obj[argvals[0]:]
+        elif member == 'splice':
+            assertion(isinstance(obj, list), 'must be applied on a list')
+            assertion(argvals, 'takes one or more arguments')
+            index, how_many = map(int, ([*argvals, len(obj)])[:2])
+            if index < 0:
+                index += len(obj)
+            add_items = argvals[2:]
+            res = []
+            for _ in range(index, min(index + how_many, len(obj))):
+                res.append(obj.pop(index))
+            for i, item in enumerate(add_items):
+                obj.insert(index + i, item)
+            return res
+        elif member == 'unshift':
+            assertion(isinstance(obj, list), 'must be applied on a list')
+            assertion(argvals, 'takes one or more arguments')
+            for item in reversed(argvals):
+                obj.insert(0, item)
+            return obj
+        elif member == 'pop':
+            assertion(isinstance(obj, list), 'must be applied on a list')
+            assertion(not argvals, 'does not take any arguments')
+            if not obj:
+                return
+            return obj.pop()
+        elif member == 'push':
+            assertion(argvals, 'takes one or more arguments')
+            obj.extend(argvals)
+            return obj
+        elif member == 'forEach':
+            assertion(argvals, 'takes one or more arguments')
+            assertion(len(argvals) <= 2, 'takes at-most 2 arguments')
+            f, this = ([*argvals, ''])[:2]
+            return [f((item, idx, obj), {'this': this}, allow_recursion) for idx, item in enumerate(obj)]
+        elif member == 'indexOf':
+            assertion(argvals, 'takes one or more arguments')
+            assertion(len(argvals) <= 2, 'takes at-most 2 arguments')
+            idx, start = ([*argvals, 0])[:2]
+            try:
+                return obj.index(idx, start)
+            except ValueError:
+                return -1
+        elif member == 'charCodeAt':
+            assertion(isinstance(obj, str), 'must be applied on a string')
+            assertion(len(argvals) == 1, 'takes exactly one argument')
+            idx = argvals[0] if isinstance(argvals[0], int) else 0
+            if idx >= len(obj):
+                return None
+            return ord(obj[idx])
+
+        idx = int(member) if isinstance(obj, list) else member
+        return obj[idx](argvals, allow_recursion=allow_recursion)
+
     @Debugger.wrap_interpreter
     def interpret_statement(self, stmt, local_vars, allow_recursion=100):
         if allow_recursion < 0:
@@ -515,7 +625,7 @@ def dict_item(key, val):
                     try:
                         ret, should_abort = self.interpret_statement(stmt, local_vars, allow_recursion)
                         if should_abort:
-                            return ret
+                            return ret, True
                     except JS_Break:
                         break
                 if matched:
@@ -630,31 +740,13 @@ def dict_item(key, val):
             else:
                 arg_str, remaining = None, arg_str
 
-            def assertion(cndn, msg):
-                """ assert, but without risk of getting optimized out """
-                if not cndn:
-                    raise self.Exception(f'{member} {msg}', expr)
-
             def eval_method():
                 if (variable, member) == ('console', 'debug'):
                     if Debugger.ENABLED:
                         Debugger.write(self.interpret_expression(f'[{arg_str}]', local_vars, allow_recursion))
                     return
 
-                types = {
-                    'String': str,
-                    'Math': float,
-                }
-                obj = local_vars.get(variable, types.get(variable, NO_DEFAULT))
-                if obj is NO_DEFAULT:
-                    if variable not in self._objects:
-                        try:
-                            self._objects[variable] = self.extract_object(variable)
-                        except self.Exception:
-                            if not nullish:
-                                raise
-                    obj = self._objects.get(variable, JS_Undefined)
-
+                obj = self._get_object(variable, local_vars, nullish)
                 if nullish and obj is JS_Undefined:
                     return JS_Undefined
 
@@ -666,86 +758,7 @@ def eval_method():
                 argvals = [
                     self.interpret_expression(v, local_vars, allow_recursion)
                     for v in self._separate(arg_str)]
-
-                if obj == str:
-                    if member == 'fromCharCode':
-                        assertion(argvals, 'takes one or more arguments')
-                        return ''.join(map(chr, argvals))
-                    raise self.Exception(f'Unsupported String method {member}', expr)
-                elif obj == float:
-                    if member == 'pow':
-                        assertion(len(argvals) == 2, 'takes two arguments')
-                        return argvals[0] ** argvals[1]
-                    raise self.Exception(f'Unsupported Math method {member}', expr)
-
-                if member == 'split':
-                    assertion(argvals, 'takes one or more arguments')
-                    assertion(len(argvals) == 1, 'with limit argument is not implemented')
-                    return obj.split(argvals[0]) if argvals[0] else list(obj)
-                elif member == 'join':
-                    assertion(isinstance(obj, list), 'must be applied on a list')
-                    assertion(len(argvals) == 1, 'takes exactly one argument')
-                    return argvals[0].join(obj)
-                elif member == 'reverse':
-                    assertion(not argvals, 'does not take any arguments')
-                    obj.reverse()
-                    return obj
-                elif member == 'slice':
-                    assertion(isinstance(obj, list), 'must be applied on a list')
-                    assertion(len(argvals) == 1, 'takes exactly one argument')
-                    return obj[argvals[0]:]
-                elif member == 'splice':
-                    assertion(isinstance(obj, list), 'must be applied on a list')
-                    assertion(argvals, 'takes one or more arguments')
-                    index, how_many = map(int, ([*argvals, len(obj)])[:2])
-                    if index < 0:
-                        index += len(obj)
-                    add_items = argvals[2:]
-                    res = []
-                    for _ in range(index, min(index + how_many, len(obj))):
-                        res.append(obj.pop(index))
-                    for i, item in enumerate(add_items):
-                        obj.insert(index + i, item)
-                    return res
-                elif member == 'unshift':
-                    assertion(isinstance(obj, list), 'must be applied on a list')
-                    assertion(argvals, 'takes one or more arguments')
-                    for item in reversed(argvals):
-                        obj.insert(0, item)
-                    return obj
-                elif member == 'pop':
-                    assertion(isinstance(obj, list), 'must be applied on a list')
-                    assertion(not argvals, 'does not take any arguments')
-                    if not obj:
-                        return
-                    return obj.pop()
-                elif member == 'push':
-                    assertion(argvals, 'takes one or more arguments')
-                    obj.extend(argvals)
-                    return obj
-                elif member == 'forEach':
-                    assertion(argvals, 'takes one or more arguments')
-                    assertion(len(argvals) <= 2, 'takes at-most 2 arguments')
-                    f, this = ([*argvals, ''])[:2]
-                    return [f((item, idx, obj), {'this': this}, allow_recursion) for idx, item in enumerate(obj)]
-                elif member == 'indexOf':
-                    assertion(argvals, 'takes one or more arguments')
-                    assertion(len(argvals) <= 2, 'takes at-most 2 arguments')
-                    idx, start = ([*argvals, 0])[:2]
-                    try:
-                        return obj.index(idx, start)
-                    except ValueError:
-                        return -1
-                elif member == 'charCodeAt':
-                    assertion(isinstance(obj, str), 'must be applied on a string')
-                    assertion(len(argvals) == 1, 'takes exactly one argument')
-                    idx = argvals[0] if isinstance(argvals[0], int) else 0
-                    if idx >= len(obj):
-                        return None
-                    return ord(obj[idx])
-
-                idx = int(member) if isinstance(obj, list) else member
-                return obj[idx](argvals, allow_recursion=allow_recursion)
+                return self._call_method(obj, member, argvals, expr, allow_recursion)
 
             if remaining:
                 ret, should_abort = self.interpret_statement(
@@ -774,6 +787,508 @@ def interpret_expression(self, expr, local_vars, allow_recursion):
             raise self.Exception('Cannot return from an expression', expr)
         return ret
 
+    def _compile_statement(self, stmt):
+        """
+        Parse the statement once into a tree of closures
+
+        The result is called with (local_vars, allow_recursion) and returns the same as interpret_statement.
+        Anything that cannot be compiled is left to interpret_statement at run time
+        """
+        try:
+            return self._compile_statement_strict(stmt)
+        except Exception:
+            return functools.partial(self.interpret_statement, stmt)
+
+    def _compile_expression(self, expr):
+        compiled = self._compile_statement(expr)
+
+        def compiled_expression(local_vars, allow_recursion):
+            ret, should_return = compiled(local_vars, allow_recursion)
+            if should_return:
+                raise self.Exception('Cannot return from an expression', expr)
+            return ret
+        return compiled_expression
+
+    def _compile_statement_strict(self, stmt):
+        sub_statements = list(self._separate(stmt, ';')) or ['']
+        expr = stmt = sub_statements.pop().strip()
+        sub_statements = [self._compile_statement(sub_stmt) for sub_stmt in sub_statements]
+
+        should_return = False
+        m = re.match(r'(?P<var>(?:var|const|let)\s)|return(?:\s+|(?=["\'])|$)|(?P<throw>throw\s+)', stmt)
+        if m:
+            expr = stmt[len(m.group(0)):].strip()
+            should_return = not m.group('var')
+        if m and m.group('throw'):
+            thrown = self._compile_expression(expr)
+
+            def compiled(local_vars, allow_recursion):
+                raise JS_Throw(thrown(local_vars, allow_recursion))
+        else:
+            compiled = self._compile_clause(expr, stmt, should_return)
+
+        def compiled_statement(local_vars, allow_recursion):
+            if allow_recursion < 0:
+                raise self.Exception('Recursion limit reached')
+            allow_recursion -= 1
+            for sub_stmt in sub_statements:
+                ret, should_abort = sub_stmt(local_vars, allow_recursion)
+                if should_abort:
+                    return ret, should_abort
+            return compiled(local_vars, allow_recursion)
+        return compiled_statement
+
+    def _compile_continuation(self, outer, stmt, should_return):
+        """Compile the rest of an expression that follows a value. The value must be assigned to the returned name"""
+        name = f'__yt_dlp_jsinterp_tmp{self._next_object_id()}'
+        return name, self._compile_clause(name + outer, stmt, should_return)
+
+    def _compile_block(self, inner, outer, stmt, should_return):
+        inner = self._compile_statement(inner)
+        if not outer:
+            def compiled(local_vars, allow_recursion):
+                ret, should_abort = inner(local_vars, allow_recursion)
+                return ret, should_abort or should_return
+            return compiled
+
+        name, rest = self._compile_continuation(outer, stmt, should_return)
+
+        def compiled(local_vars, allow_recursion):
+            ret, should_abort = inner(local_vars, allow_recursion)
+            if should_abort:
+                return ret, True
+            local_vars[name] = ret
+            return rest(local_vars, allow_recursion)
+        return compiled
+
+    def _compile_operator(self, op, right_expr, expr):
+        """Compile the right side of the operator, see _operator"""
+        if op == '?':
+            branches = [self._compile_expression(branch) for branch in self._separate(right_expr, ':', 1)]
+            if not branches:
+                raise self.Exception('Missing ternary branches', expr)
+            if_true, if_false = (*branches, self._compile_expression(''))[:2]
+        else:
+            if_true = if_false = self._compile_expression(right_expr)
+        opfunc = _OPERATORS.get(op)
+
+        def operate(left_val, local_vars, allow_recursion):
+            if op in ('||', '&&'):
+                if (op == '&&') ^ _js_ternary(left_val):
+                    return left_val  # short circuiting
+            elif op == '??':
+                if left_val not in (None, JS_Undefined):
+                    return left_val
+
+            right = _js_ternary(left_val, if_true, if_false) if op == '?' else if_true
+            right_val = right(local_vars, allow_recursion)
+            if not opfunc:
+                return right_val
+            try:
+                return opfunc(left_val, right_val)
+            except Exception as e:
+                raise self.Exception(f'Failed to evaluate {left_val!r} {op} {right_val!r}', expr, cause=e)
+        return operate
+
+    def _compile_clause(self, expr, stmt, should_return, allow_update=True):
+        """Compile an expression of a statement, following the same steps as interpret_statement"""
+        def result(value):
+            return lambda local_vars, allow_recursion: (value, should_return)
+
+        if not expr:
+            return result(None)
+
+        if expr[0] in _QUOTES:
+            inner, outer = self._separate(expr, expr[0], 1)
+            if expr[0] == '/':
+                flags, outer = self._regex_flags(outer)
+                inner = f'{inner}/{flags}'
+            else:
+                inner = json.loads(js_to_json(f'{inner}{expr[0]}', strict=True))
+            if not outer:
+                return result(inner)
+            name, rest = self._compile_continuation(outer, stmt, should_return)
+
+            def compiled(local_vars, allow_recursion):
+                local_vars[name] = inner
+                return rest(local_vars, allow_recursion)
+            return compiled
+
+        if expr.startswith('new '):
+            obj = expr[4:]
+            if not obj.startswith('Date('):
+                raise self.Exception(f'Unsupported object {obj}', expr)
+            left, right = self._separate_at_paren(obj[4:])
+            date_expr = self._compile_expression(left)
+            name, rest = self._compile_continuation(right, stmt, should_return)
+
+            def compiled(local_vars, allow_recursion):
+                date = unified_timestamp(date_expr(local_vars, allow_recursion), False)
+                if date is None:
+                    raise self.Exception(f'Failed to parse date {left!r}', expr)
+                local_vars[name] = int(date * 1000)
+                return rest(local_vars, allow_recursion)
+            return compiled
+
+        if expr.startswith('void '):
+            void_expr = self._compile_expression(expr[5:])
+
+            def compiled(local_vars, allow_recursion):
+                void_expr(local_vars, allow_recursion)
+                return None, should_return
+            return compiled
+
+        if expr.startswith('{'):
+            inner, outer = self._separate_at_paren(expr)
+            # try for object expression (Map)
+            sub_expressions = [list(self._separate(sub_expr.strip(), ':', 1)) for sub_expr in self._separate(inner)]
+            if all(len(sub_expr) == 2 for sub_expr in sub_expressions):
+                items = [(key if re.match(_NAME_RE, key) else self._compile_expression(key), self._compile_expression(val))
+                         for key, val in sub_expressions]
+
+                def compiled(local_vars, allow_recursion):
+                    obj = {}
+                    for key, val in items:
+                        val = val(local_vars, allow_recursion)
+                        obj[key if isinstance(key, str) else key(local_vars, allow_recursion)] = val
+                    return obj, should_return
+                return compiled
+            return self._compile_block(inner, outer, stmt, should_return)
+
+        if expr.startswith('('):
+            return self._compile_block(*self._separate_at_paren(expr), stmt, should_return)
+
+        if expr.startswith('['):
+            inner, outer = self._separate_at_paren(expr)
+            items = [self._compile_expression(item) for item in self._separate(inner)]
+            if not outer:
+                return lambda local_vars, allow_recursion: (
+                    [item(local_vars, allow_recursion) for item in items], should_return)
+            name, rest = self._compile_continuation(outer, stmt, should_return)
+
+            def compiled(local_vars, allow_recursion):
+                local_vars[name] = [item(local_vars, allow_recursion) for item in items]
+                return rest(local_vars, allow_recursion)
+            return compiled
+
+        m = re.match(r'''(?x)
+                (?P<try>try)\s*\{|
+                (?P<if>if)\s*\(|
+                (?P<switch>switch)\s*\(|
+                (?P<for>for)\s*\(
+                ''', expr)
+        if m:
+            return self._compile_control_flow(m, expr, stmt, should_return)
+
+        # Comma separated statements
+        sub_expressions = list(self._separate(expr))
+        if len(sub_expressions) > 1:
+            sub_expressions = [self._compile_statement(sub_expr) for sub_expr in sub_expressions]
+
+            def compiled(local_vars, allow_recursion):
+                for sub_expr in sub_expressions:
+                    ret, should_abort = sub_expr(local_vars, allow_recursion)
+                    if should_abort:
+                        return ret, True
+                return ret, False
+            return compiled
+
+        if allow_update:
+            updates = list(re.finditer(rf'''(?x)
+                    (?P<pre_sign>\+\+|--)(?P<var1>{_NAME_RE})|
+                    (?P<var2>{_NAME_RE})(?P<post_sign>\+\+|--)''', expr))
+            if len(updates) > 1:
+                raise self.Exception('Multiple increments are not compiled', expr)
+            elif updates:
+                m = updates[0]
+                var = m.group('var1') or m.group('var2')
+                start, end = m.span()
+                is_pre = bool(m.group('pre_sign'))
+                step = 1 if (m.group('pre_sign') or m.group('post_sign'))[0] == '+' else -1
+                name = f'__yt_dlp_jsinterp_tmp{self._next_object_id()}'
+                rest = self._compile_clause(expr[:start] + name + expr[end:], stmt, should_return, allow_update=False)
+
+                def compiled(local_vars, allow_recursion):
+                    ret = local_vars[var]
+                    local_vars[var] += step
+                    if is_pre:
+                        ret = local_vars[var]
+                    local_vars[name] = ret
+                    return rest(local_vars, allow_recursion)
+                return compiled
+
+        m = re.match(fr'''(?x)
+            (?P<assign>
+                (?P<out>{_NAME_RE})(?:\[(?P<index>[^\]]+?)\])?\s*
+                (?P<op>{"|".join(map(re.escape, set(_OPERATORS) - _COMP_OPERATORS))})?
+                =(?!=)(?P<expr>.*)$
+            )|(?P<return>
+                (?!if|return|true|false|null|undefined|NaN)(?P<name>{_NAME_RE})$
+            )|(?P<indexing>
+                (?P<in>{_NAME_RE})\[(?P<idx>.+)\]$
+            )|(?P<attribute>
+                (?P<var>{_NAME_RE})(?:(?P<nullish>\?)?\.(?P<member>[^(]+)|\[(?P<member2>[^\]]+)\])\s*
+            )|(?P<function>
+                (?P<fname>{_NAME_RE})\((?P<args>.*)\)$
+            )''', expr)
+        if m and m.group('assign'):
+            out, index = m.group('out', 'index')
+            operate = self._compile_operator(m.group('op'), m.group('expr'), expr)
+            if not index:
+                def compiled(local_vars, allow_recursion):
+                    local_vars[out] = operate(local_vars.get(out), local_vars, allow_recursion)
+                    return local_vars[out], should_return
+                return compiled
+
+            index = self._compile_expression(index)
+
+            def compiled(local_vars, allow_recursion):
+                left_val = local_vars.get(out)
+                if left_val in (None, JS_Undefined):
+                    raise self.Exception(f'Cannot index undefined variable {out}', expr)
+                idx = index(local_vars, allow_recursion)
+                if not isinstance(idx, (int, float)):
+                    raise self.Exception(f'List index {idx} must be integer', expr)
+                idx = int(idx)
+                left_val[idx] = operate(self._index(left_val, idx), local_vars, allow_recursion)
+                return left_val[idx], should_return
+            return compiled
+
+        elif expr.isdigit():
+            return result(int(expr))
+
+        elif expr == 'break':
+            def compiled(local_vars, allow_recursion):
+                raise JS_Break
+            return compiled
+        elif expr == 'continue':
+            def compiled(local_vars, allow_recursion):
+                raise JS_Continue
+            return compiled
+        elif expr == 'undefined':
+            return result(JS_Undefined)
+        elif expr == 'NaN':
+            return result(float('NaN'))
+
+        elif m and m.group('return'):
+            name = m.group('name')
+            return lambda local_vars, allow_recursion: (local_vars.get(name, JS_Undefined), should_return)
+
+        with contextlib.suppress(ValueError):
+            json_expr = js_to_json(expr, strict=True)
+            value = json.loads(json_expr)
+            if not isinstance(value, (dict, list)):
+                return result(value)
+            # Mutable values must not be shared between evaluations
+            return lambda local_vars, allow_recursion: (json.loads(json_expr), should_return)
+
+        if m and m.group('indexing'):
+            var, idx = m.group('in'), self._compile_expression(m.group('idx'))
+            return lambda local_vars, allow_recursion: (
+                self._index(local_vars[var], idx(local_vars, allow_recursion)), should_return)
+
+        for op in _OPERATORS:
+            separated = list(self._separate(expr, op))
+            right_expr = separated.pop()
+            while True:
+                if op in '?<>*-' and len(separated) > 1 and not separated[-1].strip():
+                    separated.pop()
+                elif not (separated and op == '?' and right_expr.startswith('.')):
+                    break
+                right_expr = f'{op}{right_expr}'
+                if op != '-':
+                    right_expr = f'{separated.pop()}{op}{right_expr}'
+            if not separated:
+                continue
+            left = self._compile_expression(op.join(separated))
+            operate = self._compile_operator(op, right_expr, expr)
+            return lambda local_vars, allow_recursion: (
+                operate(left(local_vars, allow_recursion), local_vars, allow_recursion), should_return)
+
+        if m and m.group('attribute'):
+            variable, member, nullish = m.group('var', 'member', 'nullish')
+            member_expr = None if member else self._compile_expression(m.group('member2'))
+            arg_str = expr[m.end():]
+            if arg_str.startswith('('):
+                arg_str, remaining = self._separate_at_paren(arg_str)
+            else:
+                arg_str, remaining = None, arg_str
+            args = None if arg_str is None else [self._compile_expression(v) for v in self._separate(arg_str)]
+
+            def eval_method(local_vars, allow_recursion):
+                member_name = member or member_expr(local_vars, allow_recursion)
+                if (variable, member_name) == ('console', 'debug'):
+                    return
+
+                obj = self._get_object(variable, local_vars, nullish)
+                if nullish and obj is JS_Undefined:
+                    return JS_Undefined
+
+                # Member access
+                if args is None:
+                    return self._index(obj, member_name, nullish)
+
+                # Function call
+                argvals = [arg(local_vars, allow_recursion) for arg in args]
+                return self._call_method(obj, member_name, argvals, expr, allow_recursion)
+
+            if not remaining:
+                return lambda local_vars, allow_recursion: (eval_method(local_vars, allow_recursion), should_return)
+
+            name, rest = self._compile_continuation(remaining, stmt, False)
+
+            def compiled(local_vars, allow_recursion):
+                local_vars[name] = eval_method(local_vars, allow_recursion)
+                ret, should_abort = rest(local_vars, allow_recursion)
+                return ret, should_return or should_abort
+            return compiled
+
+        elif m and m.group('function'):
+            fname = m.group('fname')
+            args = [self._compile_expression(v) for v in self._separate(m.group('args'))]
+
+            def compiled(local_vars, allow_recursion):
+                argvals = [arg(local_vars, allow_recursion) for arg in args]
+                if fname in local_vars:
+                    return local_vars[fname](argvals, allow_recursion=allow_recursion), should_return
+                elif fname not in self._functions:
+                    self._functions[fname] = self.extract_function(fname)
+                return self._functions[fname](argvals, allow_recursion=allow_recursion), should_return
+            return compiled
+
+        raise self.Exception(
+            f'Unsupported JS expression {truncate_string(expr, 20, 20) if expr != stmt else ""}', stmt)
+
+    def _compile_control_flow(self, m, expr, stmt, should_return):
+        """Compile a statement that starts with try, if, switch or for, see interpret_statement"""
+        if m.group('if'):
+            cndn, expr = self._separate_at_paren(expr[m.end() - 1:])
+            if_expr, expr = self._separate_at_paren(expr.lstrip())
+            # TODO: "else if" is not handled
+            else_expr = None
+            else_m = re.match(r'else\s*{', expr)
+            if else_m:
+                else_expr, expr = self._separate_at_paren(expr[else_m.end() - 1:])
+            cndn = self._compile_expression(cndn)
+            if_stmt, else_stmt = self._compile_statement(if_expr), self._compile_statement(else_expr)
+
+            def run(local_vars, allow_recursion):
+                ret, should_abort = (if_stmt if _js_ternary(cndn(local_vars, allow_recursion)) else else_stmt)(
+                    local_vars, allow_recursion)
+                if should_abort:
+                    return ret, True
+
+        elif m.group('try'):
+            try_expr, expr = self._separate_at_paren(expr[m.end() - 1:])
+            try_stmt = self._compile_statement(try_expr)
+            catch_stmt = err_name = finally_stmt = None
+            catch_m = re.match(fr'catch\s*(?P<err>\(\s*{_NAME_RE}\s*\))?\{{', expr)
+            if catch_m:
+                sub_expr, expr = self._separate_at_paren(expr[catch_m.end() - 1:])
+                catch_stmt, err_name = self._compile_statement(sub_expr), catch_m.group('err')
+            finally_m = re.match(r'finally\s*\{', expr)
+            if finally_m:
+                sub_expr, expr = self._separate_at_paren(expr[finally_m.end() - 1:])
+                finally_stmt = self._compile_statement(sub_expr)
+
+            def run(local_vars, allow_recursion):
+                err = None
+                try:
+                    ret, should_abort = try_stmt(local_vars, allow_recursion)
+                    if should_abort:
+                        return ret, True
+                except Exception as e:
+                    err = e
+
+                pending = (None, False)
+                if catch_stmt and err:
+                    catch_vars = {}
+                    if err_name:
+                        catch_vars[err_name] = err.error if isinstance(err, JS_Throw) else err
+                    err, pending = None, catch_stmt(local_vars.new_child(catch_vars), allow_recursion)
+
+                if finally_stmt:
+                    ret, should_abort = finally_stmt(local_vars, allow_recursion)
+                    if should_abort:
+                        return ret, True
+
+                ret, should_abort = pending
+                if should_abort:
+                    return ret, True
+
+                if err:
+                    raise err
+
+        elif m.group('for'):
+            constructor, remaining = self._separate_at_paren(expr[m.end() - 1:])
+            if remaining.startswith('{'):
+                body, expr = self._separate_at_paren(remaining)
+            else:
+                switch_m = re.match(r'switch\s*\(', remaining)  # FIXME: ?
+                if switch_m:
+                    switch_val, remaining = self._separate_at_paren(remaining[switch_m.end() - 1:])
+                    body, expr = self._separate_at_paren(remaining, '}')
+                    body = 'switch(%s){%s}' % (switch_val, body)
+                else:
+                    body, expr = remaining, ''
+            start, cndn, increment = map(self._compile_expression, self._separate(constructor, ';'))
+            body = self._compile_statement(body)
+
+            def run(local_vars, allow_recursion):
+                start(local_vars, allow_recursion)
+                while True:
+                    if not _js_ternary(cndn(local_vars, allow_recursion)):
+                        break
+                    try:
+                        ret, should_abort = body(local_vars, allow_recursion)
+                        if should_abort:
+                            return ret, True
+                    except JS_Break:
+                        break
+                    except JS_Continue:
+                        pass
+                    increment(local_vars, allow_recursion)
+
+        elif m.group('switch'):
+            switch_val, remaining = self._separate_at_paren(expr[m.end() - 1:])
+            switch_val = self._compile_expression(switch_val)
+            body, expr = self._separate_at_paren(remaining, '}')
+            items = []
+            for item in body.replace('default:', 'case default:').split('case ')[1:]:
+                case, case_stmt = (i.strip() for i in self._separate(item, ':', 1))
+                items.append((case, case != 'default' and self._compile_expression(case),
+                              self._compile_statement(case_stmt)))
+
+            def run(local_vars, allow_recursion):
+                value = switch_val(local_vars, allow_recursion)
+                for default in (False, True):
+                    matched = False
+                    for case, case_expr, case_stmt in items:
+                        if default:
+                            matched = matched or case == 'default'
+                        elif not matched:
+                            matched = bool(case_expr) and value == case_expr(local_vars, allow_recursion)
+                        if not matched:
+                            continue
+                        try:
+                            ret, should_abort = case_stmt(local_vars, allow_recursion)
+                            if should_abort:
+                                return ret, True
+                        except JS_Break:
+                            break
+                    if matched:
+                        break
+
+        rest = self._compile_statement(expr)
+
+        def compiled(local_vars, allow_recursion):
+            aborted = run(local_vars, allow_recursion)
+            if aborted:
+                return aborted
+            ret, should_abort = rest(local_vars, allow_recursion)
+            return ret, should_abort or should_return
+        return compiled
+
     def extract_object(self, objname):
         _FUNC_NAME_RE = r'''(?:[a-zA-Z$0-9]+|"[a-zA-Z$0-9]+"|'[a-zA-Z$0-9]+')'''
         obj = {}
@@ -823,31 +1338,59 @@ def extract_function(self, funcname):
             f'F<{funcname}>')
 
     def extract_function_from_code(self, argnames, code, *global_stack):
-        local_vars = {}
+        return self.build_compiled_function(self.compile_function_code(argnames, code), *global_stack)
+
+    def compile_function_code(self, argnames, code):
+        """
+        Hoist the nested function expressions out of the function code
+
+        @returns    [argnames, code, [[name, compiled_function], ...]]
+                    This is JSON-serializable, so that it can be cached and loaded
+                    again with build_compiled_function without re-parsing the code
+        """
+        functions = []
         while True:
             mobj = re.search(r'function\((?P<args>[^)]*)\)\s*{', code)
             if mobj is None:
                 break
             start, body_start = mobj.span()
             body, remaining = self._separate_at_paren(code[body_start - 1:])
-            name = self._named_object(local_vars, self.extract_function_from_code(
-                [x.strip() for x in mobj.group('args').split(',')],
-                body, local_vars, *global_stack))
+            # NB: Must not clash with the names given by _named_object while interpreting
+            name = f'__yt_dlp_jsinterp_func{self._next_object_id()}'
+            functions.append([name, self.compile_function_code(
+                [x.strip() for x in mobj.group('args').split(',')], body)])
             code = code[:start] + name + remaining
+        return [list(argnames), code, functions]
+
+    def build_compiled_function(self, compiled, *global_stack):
+        argnames, code, functions = compiled
+        local_vars = {}
+        for name, compiled_function in functions:
+            local_vars[name] = function_with_repr(
+                self.build_compiled_function(compiled_function, local_vars, *global_stack),
+                f'F<{name.rpartition("func")[2]}>')
         return self.build_function(argnames, code, local_vars, *global_stack)
 
     def call_function(self, funcname, *args):
         return self.extract_function(funcname)(args)
 
+    def _get_compiled_code(self, code):
+        if not self._compile_statements or Debugger.ENABLED:
+            return functools.partial(self.interpret_statement, code)
+        if code not in self._compiled_code:
+            self._compiled_code[code] = self._compile_statement(code)
+        return self._compiled_code[code]
+
     def build_function(self, argnames, code, *global_stack):
         global_stack = list(global_stack) or [{}]
         argnames = tuple(argnames)
+        code = code.replace('\n', ' ')
 
         def resf(args, kwargs={}, allow_recursion=100):
             global_stack[0].update(itertools.zip_longest(argnames, args, fillvalue=None))
             global_stack[0].update(kwargs)
             var_stack = LocalNameSpace(*global_stack)
-            ret, should_abort = self.interpret_statement(code.replace('\n', ' '), var_stack, allow_recursion - 1)
+            ret, should_abort = self._get_compiled_code(code)(var_stack, allow_recursion - 1)
             if should_abort:
                 return ret
         return resf
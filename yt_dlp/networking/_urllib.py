@@ -312,6 +312,17 @@ def read(self, amt=None):
             handle_response_read_exceptions(e)
             raise e
 
+    def readinto(self, b):
+        try:
+            n = self.fp.readinto(b)
+            # Unlike read(), HTTPResponse.readinto() returns 0 instead of raising if the body is cut short
+            if not n and len(b) and getattr(self.fp, 'length', None):
+                raise http.client.IncompleteRead(b'', self.fp.length)
+            return n
+        except Exception as e:
+            handle_response_read_exceptions(e)
+            raise e
+
 
 def handle_sslerror(e: ssl.SSLError):
     if not isinstance(e, ssl.SSLError):
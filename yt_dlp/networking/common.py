@@ -535,6 +535,14 @@ def read(self, amt: int | None = None) -> bytes:
         except Exception as e:
             raise TransportError(cause=e) from e
 
+    def readinto(self, b) -> int:
+        """Read up to len(b) bytes into the writable buffer b and return the number of bytes read"""
+        # Subclasses should redefine this method to read into the buffer directly, if possible.
+        # This fallback maps errors through read()
+        data = self.read(len(b))
+        memoryview(b)[:len(data)] = data
+        return len(data)
+
     def close(self):
         self.fp.close()
         return super().close()
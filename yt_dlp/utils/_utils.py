@@ -1,5 +1,6 @@
 import base64
 import binascii
+import bisect
 import calendar
 import codecs
 import collections
@@ -728,9 +729,17 @@ def expand_path(s):
     return os.path.expandvars(compat_expanduser(s))
 
 
-def orderedSet(iterable, *, lazy=False):
-    """Remove all duplicates from the input iterable"""
+def orderedSet(iterable, *, lazy=False, key=None):
+    """Remove all duplicates from the input iterable, comparing them by the hashable key(item) if given"""
     def _iter():
+        if key is not None:
+            seen = set()
+            for x in iterable:
+                k = key(x)
+                if k not in seen:
+                    seen.add(k)
+                    yield x
+            return
         seen = []  # Do not use set since the items can be unhashable
         for x in iterable:
             if x not in seen:
@@ -2244,6 +2253,94 @@ def __str__(self):
         return repr(self.exhaust())
 
 
+class FragmentSequence(collections.abc.Sequence):
+    """
+    Compact sequence of the fragments of a format
+
+    Runs of fragments that follow a URL template are stored as the template and
+    the first segment number and time, and their dicts are only built when accessed.
+    Slices are lists of fragment dicts
+    """
+
+    class _TemplateRun(collections.abc.Sequence):
+        def __init__(self, location_key, template, fields, count, duration, number, time, time_step):
+            self.location_key, self.template, self.fields = location_key, template, fields
+            self.count, self.duration = count, duration
+            self.number, self.time, self.time_step = number, time, time_step
+
+        def __len__(self):
+            return self.count
+
+        def __getitem__(self, idx):
+            if not 0 <= idx < self.count:
+                raise IndexError(idx)
+            fields = {**self.fields, 'Number': self.number + idx}
+            if self.time is not None:
+                fields['Time'] = self.time + idx * self.time_step
+            return {self.location_key: self.template % fields, 'duration': self.duration}
+
+    def __init__(self, fragments=()):
+        self._parts, self._ends = [], []
+        self.extend(fragments)
+
+    def _add_part(self, part):
+        if not len(part):
+            return
+        if isinstance(part, list) and self._parts and isinstance(self._parts[-1], list):
+            self._parts[-1].extend(part)
+            self._ends[-1] += len(part)
+            return
+        self._parts.append(part)
+        self._ends.append(len(self) + len(part))
+
+    def append(self, fragment):
+        self._add_part([fragment])
+
+    def extend(self, fragments):
+        if isinstance(fragments, FragmentSequence):
+            for part in fragments._parts:
+                # Lists are copied since they are extended in place
+                self._add_part(list(part) if isinstance(part, list) else part)
+        else:
+            self._add_part(list(fragments))
+
+    def extend_template(self, location_key, template, fields, count, duration=None, *, number, time=None, time_step=0):
+        """
+        Add count fragments whose location is template % {**fields, 'Number': ..., 'Time': ...}
+
+        Number starts at number and Time (if given) at time, and they
+        increase by 1 and time_step respectively for each fragment
+        """
+        self._add_part(self._TemplateRun(location_key, template, fields, count, duration, number, time, time_step))
+
+    def __len__(self):
+        return self._ends[-1] if self._ends else 0
+
+    def __iter__(self):
+        for part in self._parts:
+            yield from part
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        elif not isinstance(idx, int):
+            raise TypeError('indices must be integers or slices')
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError('FragmentSequence index out of range')
+        part_idx = bisect.bisect_right(self._ends, idx)
+        return self._parts[part_idx][idx - (self._ends[part_idx - 1] if part_idx else 0)]
+
+    def __eq__(self, other):
+        if not isinstance(other, (list, tuple, FragmentSequence)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self):
+        return f'<{type(self).__name__} of {len(self)} fragments>'
+
+
 class PagedList:
 
     class IndexError(IndexError):  # noqa: A001
@@ -2358,8 +2455,26 @@ class PlaylistEntries:
     MissingEntry = object()
     is_exhausted = False
 
+    class _EntryStream:
+        """Forward-only view of an iterable of entries that only holds the last accessed entry"""
+
+        def __init__(self, iterable):
+            self._iterable = iter(iterable)
+            self._index, self._entry = -1, None
+
+        def __getitem__(self, idx):
+            if idx < self._index:
+                raise ValueError(f'Entry {idx + 1} of the playlist stream has already been discarded')
+            elif idx > self._index:
+                self._entry = next(itertools.islice(self._iterable, idx - self._index - 1, None), PlaylistEntries.MissingEntry)
+                self._index = idx
+            if self._entry is PlaylistEntries.MissingEntry:
+                raise LazyList.IndexError(idx)
+            return self._entry
+
     def __init__(self, ydl, info_dict):
         self.ydl = ydl
+        self.is_streamed = ydl.params.get('lazy_playlist') == 'stream'
 
         # _entries must be assigned now since infodict can change during iteration
         entries = info_dict.get('entries')
@@ -2377,6 +2492,8 @@ def __init__(self, ydl, info_dict):
                 self._entries[i - 1] = entry
         elif isinstance(entries, (list, PagedList, LazyList)):
             self._entries = entries
+        elif self.is_streamed:
+            self._entries = self._EntryStream(entries)
         else:
             self._entries = LazyList(entries)
 
@@ -2387,6 +2504,16 @@ def __init__(self, ydl, info_dict):
             (?::(?P<step>[+-]?\d+))?
         )?''')
 
+    @staticmethod
+    def _is_increasing(playlist_items):
+        last = 1
+        for item in playlist_items:
+            start, stop, step = (item, item, 1) if isinstance(item, int) else (item.start or 1, item.stop, item.step or 1)
+            if start < last or step < 0 or (stop is not None and stop < start):
+                return False
+            last = float('inf') if stop is None else stop
+        return True
+
     @classmethod
     def parse_playlist_items(cls, string):
         for segment in string.split(','):
@@ -2412,21 +2539,37 @@ def get_requested_items(self):
         elif playlist_start != 1 or playlist_end:
             self.ydl.report_warning('Ignoring playliststart and playlistend because playlistitems was given', only_once=True)
 
-        for index in self.parse_playlist_items(playlist_items):
+        playlist_items = list(self.parse_playlist_items(playlist_items))
+        # The entries only need to be matched here if that can stop the iteration
+        may_break = any(self.ydl.params.get(key) for key in ('break_on_existing', 'break_on_reject', 'match_filter'))
+        if isinstance(self._entries, self._EntryStream) and not self._is_increasing(playlist_items):
+            self.ydl.report_warning(
+                'The playlist cannot be streamed since the requested items are not in increasing order', only_once=True)
+            self._entries = LazyList(self._entries._iterable)
+
+        for index in playlist_items:
             for i, entry in self[index]:
                 yield i, entry
                 if not entry:
                     continue
                 try:
                     # The item may have just been added to archive. Don't break due to it
-                    if not self.ydl.params.get('lazy_playlist'):
+                    if not self.ydl.params.get('lazy_playlist') and may_break:
                         # TODO: Add auto-generated fields
                         self.ydl._match_entry(entry, incomplete=True, silent=True)
                 except (ExistingVideoReached, RejectedVideoReached):
                     return
 
+    @property
+    def page_size(self):
+        """Number of entries in each page of a paged playlist, or None"""
+        if isinstance(self._entries, PagedList):
+            return self._entries._pagesize
+
     def get_full_count(self):
-        if self.is_exhausted and not self.is_incomplete:
+        if isinstance(self._entries, self._EntryStream):
+            return self._entries._index if self.is_exhausted else None
+        elif self.is_exhausted and not self.is_incomplete:
             return len(self)
         elif isinstance(self._entries, InAdvancePagedList):
             if self._entries._pagesize == 1:
@@ -2447,6 +2590,11 @@ def get_entry(i):
                 return entry
         else:
             def get_entry(i):
+                if self.is_streamed and isinstance(self._entries, PagedList):
+                    # Only keep the page that is being processed
+                    pagenum = i // self._entries._pagesize
+                    for cached_pagenum in [n for n in self._entries._cache if n != pagenum]:
+                        del self._entries._cache[cached_pagenum]
                 try:
                     return type(self.ydl)._handle_extraction_exceptions(lambda _, i: self._entries[i])(self.ydl, i)
                 except (LazyList.IndexError, PagedList.IndexError):
@@ -5225,9 +5373,11 @@ class FormatSorter:
     def __init__(self, ydl, field_preference):
         self.ydl = ydl
         self._order = []
+        self._order_resolvers = {}
         self.evaluate_params(self.ydl.params, field_preference)
         if ydl.params.get('verbose'):
             self.print_verbose_info(self.ydl.write_debug)
+        self._sort_plan = [self._compile_field_preference(field) for field in self._order]
 
     def _get_field_setting(self, field, key):
         if field not in self.settings:
@@ -5264,17 +5414,10 @@ def _resolve_field_value(self, field, value, convert_none=False):
         elif conversion == 'bytes':
             return parse_bytes(value)
         elif conversion == 'order':
-            order_list = (self._use_free_order and self._get_field_setting(field, 'order_free')) or self._get_field_setting(field, 'order')
-            use_regex = self._get_field_setting(field, 'regex')
-            list_length = len(order_list)
-            empty_pos = order_list.index('') if '' in order_list else list_length + 1
-            if use_regex and value is not None:
-                for i, regex in enumerate(order_list):
-                    if regex and re.match(regex, value):
-                        return list_length - i
-                return list_length - empty_pos  # not in list
-            else:  # not regex or  value = None
-                return list_length - (order_list.index(value) if value in order_list else empty_pos)
+            resolver = self._order_resolvers.get(field)
+            if resolver is None:
+                resolver = self._order_resolvers[field] = self._compile_order(field)
+            return resolver(value)
         else:
             if value.isnumeric():
                 return float(value)
@@ -5282,6 +5425,27 @@ def _resolve_field_value(self, field, value, convert_none=False):
                 self.settings[field]['convert'] = 'string'
                 return value
 
+    def _compile_order(self, field):
+        """Return a memoized function giving the position of a (lowercase) value in the order of the field"""
+        order_list = (self._use_free_order and self._get_field_setting(field, 'order_free')) or self._get_field_setting(field, 'order')
+        list_length = len(order_list)
+        empty_pos = order_list.index('') if '' in order_list else list_length + 1
+        regexes = self._get_field_setting(field, 'regex') and [
+            (list_length - i, re.compile(regex)) for i, regex in enumerate(order_list) if regex]
+        cache = {}
+
+        def resolve(value):
+            if value in cache:
+                return cache[value]
+            if regexes and value is not None:
+                result = next((pos for pos, regex in regexes if regex.match(value)), list_length - empty_pos)
+            else:  # not regex or value = None
+                result = list_length - (order_list.index(value) if value in order_list else empty_pos)
+            cache[value] = result
+            return result
+
+        return resolve
+
     def evaluate_params(self, params, sort_extractor):
         self._use_free_order = params.get('prefer_free_formats', False)
         self._sort_user = params.get('format_sort', [])
@@ -5392,6 +5556,57 @@ def _calculate_field_preference(self, format_, field):
             value = get_value(field)
         return self._calculate_field_preference_from_value(format_, field, type_, value)
 
+    def _compile_field_preference(self, field):
+        """Return a function computing the same value as _calculate_field_preference for the field
+
+        The settings of the field are looked up once, instead of for every format
+        """
+        setting = functools.partial(self._get_field_setting, field)
+        type_ = setting('type')
+        if type_ == 'multiple':
+            type_ = 'field'
+            function = setting('function')
+            keys = [self._get_field_setting(f, 'field') for f in setting('field')]
+            get_value = lambda format_: function(format_.get(key) for key in keys)
+        else:
+            key = setting('field')
+            get_value = lambda format_: format_.get(key)
+
+        if type_ == 'extractor':
+            maximum = setting('max')
+            convert = lambda value: -1 if value is None or (maximum is not None and value >= maximum) else value
+        elif type_ == 'boolean':
+            in_list, not_in_list = setting('in_list'), setting('not_in_list')
+            convert = lambda value: 0 if (
+                (in_list is None or value in in_list) and (not_in_list is None or value not in not_in_list)) else -1
+        elif type_ == 'ordered':
+            convert = lambda value: self._resolve_field_value(field, value, True)
+        else:
+            convert = None
+
+        reverse, closest, limit = setting('reverse'), setting('closest'), setting('limit')
+        default, is_string = setting('default'), setting('convert') == 'string'
+
+        def preference(format_):
+            value = get_value(format_)
+            if convert:
+                value = convert(value)
+
+            # try to convert to number
+            val_num = float_or_none(value, default=default)
+            is_num = not is_string and val_num is not None
+            if is_num:
+                value = val_num
+
+            return ((-10, 0) if value is None
+                    else (1, value, 0) if not is_num  # if a field has mixed strings and numbers, strings are sorted higher
+                    else (0, -abs(value - limit), value - limit if reverse else limit - value) if closest
+                    else (0, value, 0) if not reverse and (limit is None or value <= limit)
+                    else (0, -value, 0) if limit is None or (reverse and value == limit) or value > limit
+                    else (-1, value, 0))
+
+        return preference
+
     def calculate_preference(self, format):
         # Determine missing protocol
         if not format.get('protocol'):
@@ -5427,7 +5642,7 @@ def calculate_preference(self, format):
         if not format.get('tbr'):
             format['tbr'] = try_call(lambda: format['vbr'] + format['abr']) or None
 
-        return tuple(self._calculate_field_preference(format, field) for field in self._order)
+        return tuple(preference(format) for preference in self._sort_plan)
 
 
 def filesize_from_tbr(tbr, duration):